@@ -0,0 +1,199 @@
+"""
+Load benchmark of the hot endpoints against a file-backed SQLite database.
+
+    python -m benchmarks.run --scale 1 --requests 500 --concurrency 16 \
+        --output bench.json
+
+The app from create_app() is driven in-process through httpx's ASGI
+transport, so the numbers cover routing, validation, the ORM and SQLite
+but not the network or an ASGI server. The JSON report is meant to be
+diffed between commits run with the same arguments.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = ("feed", "search", "vote", "comment", "verify")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    to_ms = 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * to_ms, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * to_ms, 3),
+        "p95_ms": round(percentile(latencies, 95) * to_ms, 3),
+        "p99_ms": round(percentile(latencies, 99) * to_ms, 3),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_requests(name: str, rng: random.Random, counts: dict, tokens: dict):
+    """Deterministic list of (method, url, kwargs) for one scenario."""
+    from benchmarks.seed import BENCH_PASSWORD, WORDS, student_name
+
+    def auth(student_id):
+        return {"Authorization": f"Bearer {tokens[student_id]}"}
+
+    student_ids = list(tokens)
+    requests = []
+    for _ in range(counts["requests"]):
+        student_id = rng.choice(student_ids)
+        if name == "feed":
+            requests.append(("GET", f"/api/students/{student_id}/feed", {}))
+        elif name == "search":
+            requests.append(("GET", "/api/posts/search",
+                             {"params": {"query": rng.choice(WORDS)}}))
+        elif name == "vote":
+            requests.append(("POST", f"/api/posts/{rng.randint(1, counts['posts'])}/votes",
+                             {"json": {"vote_value": rng.choice((1, -1, 0))},
+                              "headers": auth(student_id)}))
+        elif name == "comment":
+            requests.append(("POST", "/api/comments/",
+                             {"json": {"post_id": rng.randint(1, counts["posts"]),
+                                       "content": "benchmark comment"},
+                              "headers": auth(student_id)}))
+        elif name == "verify":
+            requests.append(("POST", "/api/students/verify",
+                             {"json": {"name": student_name(student_id),
+                                       "email": f"student{student_id}@bench.campus",
+                                       "password": BENCH_PASSWORD}}))
+    return requests
+
+
+async def drive(client, requests: list, concurrency: int) -> dict:
+    """Run the requests with a fixed number of concurrent workers."""
+    queue = iter(requests)
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for method, url, kwargs in queue:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_benchmarks(args, counts: dict) -> dict:
+    import httpx
+    from campus.auth import issue_token
+    from campus.main import create_app
+
+    app = create_app()
+    rng = random.Random(args.seed)
+    tokens = {student_id: issue_token(student_id)
+              for student_id in range(1, counts["students"] + 1)}
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport does not send lifespan events, run the app's lifespan
+    # so the process pools and buffers start and stop as in production
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                requests = build_requests(name, rng, {**counts, "requests": args.requests}, tokens)
+                # warm caches and pools without measuring
+                await drive(client, requests[:args.warmup], args.concurrency)
+                results[name] = await drive(client, requests, args.concurrency)
+                print(f"{name:>8}: {json.dumps(results[name])}", file=sys.stderr)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scale", type=int, default=1,
+                        help="dataset size multiplier (1 = 200 students, 2000 posts)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=500,
+                        help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20,
+                        help="unmeasured requests before each scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "campus-bench.db"),
+                        help="SQLite file, recreated on every run")
+    parser.add_argument("--bcrypt-rounds", type=int, default=None,
+                        help="override BCRYPT_ROUNDS for the run")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # campus reads its configuration at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.database)}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    if os.path.exists(args.database):
+        os.remove(args.database)
+
+    from campus.database import engine
+    from benchmarks.seed import seed_database
+
+    started = time.perf_counter()
+    counts = seed_database(engine, args.scale, args.seed)
+    seed_seconds = time.perf_counter() - started
+    engine.dispose()
+
+    results = asyncio.run(run_benchmarks(args, counts))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "bcrypt_rounds": int(os.environ.get("BCRYPT_ROUNDS", 12)),
+            "dataset": counts,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+
+
+# the password hashing pool spawns fresh interpreters that import __main__
+if __name__ == "__main__":
+    main()
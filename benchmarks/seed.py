@@ -0,0 +1,121 @@
+"""
+Deterministic synthetic dataset for the benchmarks.
+
+The same scale and seed always produce the same rows, so reports taken on
+different commits measure the code and not the data.
+"""
+import random
+from datetime import datetime, timedelta
+
+# rows per unit of scale
+STUDENTS = 200
+GROUPS = 10
+POSTS = 2000
+COMMENTS = 5000
+POST_VOTES = 10000
+GROUPS_PER_STUDENT = 3
+
+BENCH_PASSWORD = "bench-pass1!"
+START = datetime(2024, 1, 1)
+
+WORDS = ("exam", "library", "lecture", "housing", "football", "robotics",
+         "coffee", "internship", "hackathon", "music", "chemistry", "parking",
+         "scholarship", "thesis", "cafeteria", "volunteer", "gym", "startup")
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def student_name(i: int) -> str:
+    # names may only hold letters and spaces
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return "Student " + "".join(letters[int(d)] for d in str(i))
+
+
+def seed_database(engine, scale: int = 1, seed: int = 42) -> dict:
+    """Create the schema on an empty database and fill it; returns the row counts."""
+    from sqlalchemy import insert
+
+    from campus.database import Base
+    from campus.passwords import hash_password
+    from campus.models.studentModel import StudentModel
+    from campus.models.groupModel import GroupModel
+    from campus.models.postModel import PostModel
+    from campus.models.commentModel import CommentModel
+    from campus.models.studentGroupModel import StudentGroupModel
+    from campus.models.studentPostVoteModel import StudentPostVoteModel
+    from campus.models.studentCommentVoteModel import StudentCommentVoteModel  # noqa: F401
+    from campus.models.reportModel import ReportModel  # noqa: F401
+    import campus.search  # noqa: F401  registers the SQLite FTS tables
+
+    rng = random.Random(seed)
+    n_students, n_groups = STUDENTS * scale, GROUPS * scale
+    n_posts, n_comments = POSTS * scale, COMMENTS * scale
+
+    Base.metadata.create_all(engine)
+
+    # one hash shared by every student keeps seeding fast
+    password = hash_password(BENCH_PASSWORD)
+    students = [
+        {"student_id": i, "name": student_name(i),
+         "email": f"student{i}@bench.campus", "password": password}
+        for i in range(1, n_students + 1)
+    ]
+    groups = [
+        {"group_id": i, "name": f"group {i}", "description": sentence(rng, 6),
+         "is_default": i == 1}
+        for i in range(1, n_groups + 1)
+    ]
+    memberships = [
+        {"student_id": student_id, "group_id": group_id, "is_subscribed": True}
+        for student_id in range(1, n_students + 1)
+        for group_id in rng.sample(range(1, n_groups + 1),
+                                   min(GROUPS_PER_STUDENT, n_groups))
+    ]
+
+    post_votes = {}
+    while len(post_votes) < min(POST_VOTES * scale, n_students * n_posts):
+        key = (rng.randint(1, n_students), rng.randint(1, n_posts))
+        post_votes[key] = rng.choice((1, 1, 1, -1))
+    vote_counts = [0] * (n_posts + 1)
+    for (_, post_id), value in post_votes.items():
+        vote_counts[post_id] += value
+
+    posts = [
+        {"post_id": i, "student_id": rng.randint(1, n_students),
+         "group_id": rng.randint(1, n_groups),
+         "description": sentence(rng, 8), "details": sentence(rng, 30),
+         "vote_count": vote_counts[i], "comment_count": 0,
+         "created_at": START + timedelta(minutes=i)}
+        for i in range(1, n_posts + 1)
+    ]
+    comments = []
+    for i in range(1, n_comments + 1):
+        # a third of the comments reply to an earlier one
+        parent = rng.randint(1, i - 1) if i > 1 and rng.random() < 0.33 else None
+        post_id = comments[parent - 1]["post_id"] if parent else rng.randint(1, n_posts)
+        comments.append({
+            "comment_id": i, "student_id": rng.randint(1, n_students),
+            "post_id": post_id, "parent_comment_id": parent,
+            "content": sentence(rng, 12), "vote_count": 0,
+            "created_at": START + timedelta(minutes=i),
+        })
+        posts[post_id - 1]["comment_count"] += 1
+
+    with engine.begin() as conn:
+        conn.execute(insert(StudentModel), students)
+        conn.execute(insert(GroupModel), groups)
+        conn.execute(insert(StudentGroupModel), memberships)
+        conn.execute(insert(PostModel), posts)
+        conn.execute(insert(CommentModel), comments)
+        conn.execute(insert(StudentPostVoteModel), [
+            {"student_id": student_id, "post_id": post_id, "vote_value": value}
+            for (student_id, post_id), value in post_votes.items()
+        ])
+
+    return {
+        "students": n_students, "groups": n_groups, "posts": n_posts,
+        "comments": n_comments, "post_votes": len(post_votes),
+        "memberships": len(memberships),
+    }
@@ -0,0 +1,80 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+
+from fastapi import Depends
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from .config import SECRET_KEY, ACCESS_TOKEN_TTL, MODERATOR_IDS
+from .exceptions import InvalidTokenException, ModeratorRequiredException
+
+logger = logging.getLogger(__name__)
+
+if SECRET_KEY:
+    _secret = SECRET_KEY.encode("utf-8")
+else:
+    logger.warning("SECRET_KEY is not set, access tokens are only valid "
+                   "in this process")
+    _secret = secrets.token_bytes(32)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_token(student_id: int, ttl: int = ACCESS_TOKEN_TTL) -> str:
+    """Create an HMAC-SHA256 signed token for a student, valid for ttl seconds."""
+    claims = {"sub": student_id, "exp": int(time.time()) + ttl}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def decode_token(token: str) -> int:
+    """Check the signature and expiry of a token and return its student id."""
+    try:
+        payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(payload)):
+            raise ValueError("bad signature")
+        claims = json.loads(_b64decode(payload))
+        student_id, expires = claims["sub"], claims["exp"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidTokenException()
+    if not isinstance(student_id, int) or expires < time.time():
+        raise InvalidTokenException()
+    return student_id
+
+
+async def get_current_student_id(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+) -> int:
+    """
+    Identity of the caller from the Authorization: Bearer token.
+
+    Validation is a single HMAC, no database access or bcrypt involved.
+    """
+    if credentials is None:
+        raise InvalidTokenException("Not authenticated")
+    return decode_token(credentials.credentials)
+
+
+async def get_current_moderator_id(
+    student_id: int = Depends(get_current_student_id)
+) -> int:
+    """Identity of the caller, who has to be one of MODERATOR_IDS."""
+    if student_id not in MODERATOR_IDS:
+        raise ModeratorRequiredException()
+    return student_id
@@ -0,0 +1,194 @@
+import json
+import logging
+import time
+import uuid
+
+from .config import CACHE_BACKEND, CACHE_URL
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional, only needed for CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# how long invalidate() remembers a key's new generation; longer than any
+# loader takes, so a load that started before the invalidation sees it
+GENERATION_TTL = 3600
+
+
+def generation_key(key: str) -> str:
+    return f"generation:{key}"
+
+
+class MemoryBackend:
+    """Per-process dict of key -> (expires_at, value)."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._entries = {}
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisBackend:
+    """Shared backend, values are stored as JSON with a server side TTL."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "campus:"):
+        if redis is None:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the redis package")
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+
+    @property
+    def client(self):
+        # created lazily so the connection pool binds to the serving loop
+        if self._client is None:
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def get(self, key: str):
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value, ttl: float) -> None:
+        await self.client.set(self.prefix + key, json.dumps(value),
+                              px=max(int(ttl * 1000), 1))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    def size(self):
+        return None
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class Cache:
+    """
+    Read-through cache with hit/miss counters.
+
+    Values must be JSON serialisable so both backends behave the same.
+    A backend failure is logged and treated as a miss, the cache never
+    takes a request down with it.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str):
+        """Cached value or None, counting the hit or miss."""
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            logger.exception("cache read of %s failed", key)
+            self.errors += 1
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value, ttl: float) -> None:
+        try:
+            await self.backend.set(key, value, ttl)
+        except Exception:
+            logger.exception("cache write of %s failed", key)
+            self.errors += 1
+
+    async def get_or_load(self, key: str, loader, ttl: float):
+        """
+        Cached value, or the loader's result, cached for ttl seconds.
+
+        The key's generation is read before loading and checked again
+        around the write: when an invalidate() lands while the loader runs,
+        its possibly stale result is returned to this caller only, and is
+        never left in the cache.
+        """
+        value = await self.get(key)
+        if value is None:
+            generation = await self._generation(key)
+            value = await loader()
+            if await self._generation(key) == generation:
+                await self.set(key, value, ttl)
+                # an invalidation between the check and the write
+                if await self._generation(key) != generation:
+                    await self.invalidate(key)
+        return value
+
+    async def _generation(self, key: str):
+        try:
+            return await self.backend.get(generation_key(key))
+        except Exception:
+            logger.exception("cache read of the generation of %s failed", key)
+            self.errors += 1
+            return None
+
+    async def invalidate(self, *keys: str) -> None:
+        try:
+            # new generations first, so loads racing with the delete notice
+            for key in keys:
+                await self.backend.set(generation_key(key), uuid.uuid4().hex,
+                                       GENERATION_TTL)
+            await self.backend.delete(*keys)
+        except Exception:
+            logger.exception("cache invalidation of %s failed", keys)
+            self.errors += 1
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "size": self.backend.size(),
+        }
+
+
+def _make_backend():
+    if CACHE_BACKEND == "redis":
+        return RedisBackend(CACHE_URL)
+    return MemoryBackend()
+
+
+cache = Cache(_make_backend())
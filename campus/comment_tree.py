@@ -0,0 +1,84 @@
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models.commentModel import CommentModel
+from .pagination import encode_cursor, decode_cursor
+
+TREE_COLUMNS = (
+    CommentModel.comment_id,
+    CommentModel.student_id,
+    CommentModel.post_id,
+    CommentModel.parent_comment_id,
+    CommentModel.content,
+    CommentModel.vote_count,
+    CommentModel.created_at,
+    CommentModel.updated_at,
+)
+
+
+async def load_post_comments(db: AsyncSession, post_id: int):
+    """
+    All comments of a post in one query, already in sibling order.
+
+    The (post_id, vote_count, comment_id) index serves both the filter and
+    the ORDER BY, so building the tree never has to sort.
+    """
+    result = await db.execute(
+        select(*TREE_COLUMNS)
+        .where(CommentModel.post_id == post_id)
+        .order_by(CommentModel.vote_count.desc(), CommentModel.comment_id.desc())
+    )
+    return result.mappings().all()
+
+
+def build_comment_tree(rows, parent_comment_id: int = None,
+                       cursor: str = None, max_depth: int = 3,
+                       replies_limit: int = 10):
+    """
+    Assemble the discussion below parent_comment_id (None for the post).
+
+    Rows are grouped by parent in a single pass; siblings keep the row
+    order. Each level shows at most replies_limit comments and the tree
+    stops after max_depth levels; cut-off nodes carry has_more_replies and,
+    when cut by the limit, a replies_cursor to resume from. Returns the
+    top-level nodes and the cursor of their next page.
+    """
+    ids = {row["comment_id"] for row in rows}
+    children = defaultdict(list)
+    for row in rows:
+        parent = row["parent_comment_id"]
+        # replies to deleted comments are shown at the top level
+        children[parent if parent in ids else None].append(row)
+
+    def page(siblings, after):
+        start = 0
+        if after:
+            value, row_id = decode_cursor(after, CommentModel.vote_count)
+            while start < len(siblings) and \
+                    (siblings[start]["vote_count"], siblings[start]["comment_id"]) >= (value, row_id):
+                start += 1
+        shown = siblings[start:start + replies_limit]
+        next_cursor = None
+        if start + replies_limit < len(siblings):
+            last = shown[-1]
+            next_cursor = encode_cursor(CommentModel.vote_count.key,
+                                        last["vote_count"], last["comment_id"])
+        return shown, next_cursor
+
+    def node(row, depth):
+        replies = children.get(row["comment_id"], [])
+        item = dict(row, reply_count=len(replies), replies=[],
+                    has_more_replies=False, replies_cursor=None)
+        if replies and depth >= max_depth:
+            item["has_more_replies"] = True
+        elif replies:
+            shown, replies_cursor = page(replies, None)
+            item["replies"] = [node(reply, depth + 1) for reply in shown]
+            item["has_more_replies"] = replies_cursor is not None
+            item["replies_cursor"] = replies_cursor
+        return item
+
+    shown, next_cursor = page(children.get(parent_comment_id, []), cursor)
+    return [node(row, 1) for row in shown], next_cursor
@@ -0,0 +1,176 @@
+import os
+from urllib.parse import quote_plus
+
+from sqlalchemy.engine import make_url
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Database connection
+DB_HOST = os.getenv("DB_HOST", "127.0.0.1")
+DB_PORT = os.getenv("DB_PORT", "3306")
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "campusdb")
+
+# DATABASE_URL wins over the individual DB_* settings when it is set
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"mysql+pymysql://{quote_plus(DB_USER)}:{quote_plus(DB_PASSWORD)}"
+    f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+
+def _require_password(url: str) -> None:
+    """There is no default MySQL password; refuse to start without one."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "mysql" and not parsed.password:
+        raise RuntimeError(
+            f"No password for MySQL user {parsed.username!r}: set DB_PASSWORD "
+            "or a DATABASE_URL that includes the credentials")
+
+
+_require_password(DATABASE_URL)
+
+
+def _async_url(url: str) -> str:
+    """Swap the blocking DBAPI of a database url for its asyncio driver."""
+    drivers = {
+        "mysql+pymysql://": "mysql+aiomysql://",
+        "mysql://": "mysql+aiomysql://",
+        "sqlite+pysqlite://": "sqlite+aiosqlite://",
+        "sqlite://": "sqlite+aiosqlite://",
+    }
+    for sync_prefix, async_prefix in drivers.items():
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+# aiomysql against MySQL, aiosqlite for a local SQLite stand-in
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# Connection pool (sized per engine)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 20)
+DB_POOL_TIMEOUT = _env_float("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+# Write-behind vote counting: merge vote_count deltas in memory and flush
+# them in batches instead of row-locking the post/comment on every vote
+VOTE_BUFFER_ENABLED = _env_bool("VOTE_BUFFER_ENABLED", False)
+VOTE_BUFFER_FLUSH_INTERVAL = _env_float("VOTE_BUFFER_FLUSH_INTERVAL", 0.5)
+VOTE_BUFFER_MAX_PENDING = _env_int("VOTE_BUFFER_MAX_PENDING", 1000)
+
+# Password hashing runs in a dedicated process pool
+BCRYPT_ROUNDS = _env_int("BCRYPT_ROUNDS", 12)
+PASSWORD_WORKERS = _env_int("PASSWORD_WORKERS", os.cpu_count() or 1)
+# hashes queued or running before new requests are turned away with 503
+PASSWORD_MAX_PENDING = _env_int("PASSWORD_MAX_PENDING", 64)
+
+# Signed access tokens. Set SECRET_KEY in production: the random fallback
+# differs per process, so tokens would not survive restarts or be
+# accepted by other workers.
+SECRET_KEY = os.getenv("SECRET_KEY", "")
+ACCESS_TOKEN_TTL = _env_int("ACCESS_TOKEN_TTL", 3600)
+
+# Student ids (comma separated) allowed to work the report queue and to
+# export whole tables; nobody is a moderator unless listed here
+MODERATOR_IDS = frozenset(int(student_id) for student_id in os.getenv("MODERATOR_IDS", "").split(",")
+                          if student_id.strip())
+
+# Read-through cache for rarely changing catalogs such as the group list.
+# "memory" keeps entries per process; "redis" (needs the redis package)
+# shares them, and their invalidation, between workers.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+GROUP_CACHE_TTL = _env_float("GROUP_CACHE_TTL", 300)
+
+# Bulk student import: rows hashed and inserted per batch, the number of
+# per-row errors echoed back in the response, and the longest line (in
+# characters) read before the line is skipped as an error
+BULK_IMPORT_BATCH_SIZE = _env_int("BULK_IMPORT_BATCH_SIZE", 500)
+BULK_IMPORT_MAX_ERRORS = _env_int("BULK_IMPORT_MAX_ERRORS", 100)
+BULK_IMPORT_MAX_LINE_LENGTH = _env_int("BULK_IMPORT_MAX_LINE_LENGTH", 8192)
+
+# Bulk group membership: pairs accepted per request and rows per commit
+BULK_MEMBERSHIP_MAX_PAIRS = _env_int("BULK_MEMBERSHIP_MAX_PAIRS", 10000)
+BULK_MEMBERSHIP_CHUNK_SIZE = _env_int("BULK_MEMBERSHIP_CHUNK_SIZE", 1000)
+
+# NDJSON exports fetch rows from a server-side cursor this many at a time
+EXPORT_BATCH_SIZE = _env_int("EXPORT_BATCH_SIZE", 1000)
+
+# Opt-in fast JSON path for list endpoints (cached TypeAdapters + orjson);
+# set to false to fall back to FastAPI's response_model serialisation
+FAST_JSON_ENABLED = _env_bool("FAST_JSON_ENABLED", True)
+
+# Per-student home feed cache; entries are dropped as soon as one of the
+# student's groups gets a new post, and after FEED_CACHE_TTL seconds to
+# pick up subscription changes
+FEED_CACHE_ENABLED = _env_bool("FEED_CACHE_ENABLED", False)
+FEED_CACHE_TTL = _env_float("FEED_CACHE_TTL", 60)
+
+# Per-request query statistics (count, DB time, repeated statements)
+QUERY_STATS_ENABLED = _env_bool("QUERY_STATS_ENABLED", True)
+# add a Server-Timing header with the numbers to every response
+QUERY_STATS_HEADER = _env_bool("QUERY_STATS_HEADER", False)
+# log a warning for requests above these budgets (0 disables a check)
+QUERY_COUNT_BUDGET = _env_int("QUERY_COUNT_BUDGET", 20)
+QUERY_TIME_BUDGET_MS = _env_float("QUERY_TIME_BUDGET_MS", 0)
+# the same statement this many times in one request looks like an N+1
+QUERY_REPEAT_THRESHOLD = _env_int("QUERY_REPEAT_THRESHOLD", 5)
+
+# Prometheus metrics at /metrics. Under several workers, point
+# PROMETHEUS_MULTIPROC_DIR at an empty directory shared by them.
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+
+# Read replicas: comma separated database urls (same form as DATABASE_URL).
+# GET handlers read from them; writes always go to DATABASE_URL.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+                         if url.strip()]
+for _replica_url in DATABASE_REPLICA_URLS:
+    _require_password(_replica_url)
+# "round_robin" or "least_connections"
+REPLICA_STRATEGY = os.getenv("REPLICA_STRATEGY", "round_robin")
+# replicas further behind than this many seconds are skipped
+REPLICA_MAX_LAG = _env_float("REPLICA_MAX_LAG", 5)
+REPLICA_CHECK_INTERVAL = _env_float("REPLICA_CHECK_INTERVAL", 5)
+# after a write the client reads from the primary for this many seconds;
+# the pin is a cookie, so clients without a cookie jar are not pinned
+READ_YOUR_WRITES_WINDOW = _env_int("READ_YOUR_WRITES_WINDOW", 5)
+
+# Report moderation: reports per claim or bulk update, and how long a
+# claim holds before another moderator may take the report
+MAX_REPORT_BATCH = _env_int("MAX_REPORT_BATCH", 500)
+REPORT_CLAIM_TIMEOUT = _env_int("REPORT_CLAIM_TIMEOUT", 300)
+
+# "Hot" post ranking (sort=hot) and trending groups, kept in memory per
+# process and refreshed in the background from the newest votes and posts
+TRENDING_ENABLED = _env_bool("TRENDING_ENABLED", True)
+TRENDING_REFRESH_INTERVAL = _env_float("TRENDING_REFRESH_INTERVAL", 30)
+# posts older than this many days leave the hot ranking
+TRENDING_WINDOW_DAYS = _env_int("TRENDING_WINDOW_DAYS", 7)
+# seconds of freshness worth ten times the votes
+HOT_SCORE_DECAY = _env_float("HOT_SCORE_DECAY", 45000)
+# half-life in seconds of a vote or post in a group's trending score
+TRENDING_GROUP_HALF_LIFE = _env_float("TRENDING_GROUP_HALF_LIFE", 21600)
+
+# Uploaded post images, stored once per content hash under IMAGE_STORE_DIR
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "media/images")
+MAX_IMAGE_BYTES = _env_int("MAX_IMAGE_BYTES", 10 * 1024 * 1024)
+# threads for image file IO, kept apart from the request threadpool
+IMAGE_IO_THREADS = _env_int("IMAGE_IO_THREADS", 4)
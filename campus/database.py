@@ -1,24 +1,41 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
+from .config import (DATABASE_URL, ASYNC_DATABASE_URL, DB_POOL_SIZE,
+                     DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+                     DB_POOL_PRE_PING)
+from .metrics import TimedQueuePool, TimedAsyncAdaptedQueuePool
 
-hostname = "127.0.0.1"
-port = "3306"
-username = "root"
-password = "raghu"
-database = "campusdb"
 
-DATABASE_URL = f"mysql+pymysql://{username}:{password}@{hostname}:{port}/{database}"
+pool_options = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
+
+connect_args = {}
+if DATABASE_URL.startswith("sqlite"):
+    # connections are handed between threadpool workers
+    connect_args["check_same_thread"] = False
 
 engine = create_engine(
     DATABASE_URL,
-    connect_args={},
-    poolclass=StaticPool
+    connect_args=connect_args,
+    poolclass=TimedQueuePool,
+    **pool_options
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# asyncio engine used by the async routers
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=TimedAsyncAdaptedQueuePool, **pool_options)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -28,3 +45,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status(bind=engine) -> dict:
+    """Snapshot of the connection pool counters of an engine."""
+    pool = bind.pool
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout": DB_POOL_TIMEOUT,
+        "recycle": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING,
+    }
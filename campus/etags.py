@@ -0,0 +1,70 @@
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .exceptions import NotModifiedException
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given values."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match comparison, which RFC 9110 defines as the weak one."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+async def collection_version(db: AsyncSession, model, *criteria):
+    """
+    Row count, newest updated_at and highest id of the rows matching the
+    criteria. Every insert, update or delete moves at least one of them,
+    and with an index on (filter column, updated_at) the query never
+    reads the table itself.
+
+    updated_at only has second resolution, so while the newest change is
+    from the current second another write could still land without moving
+    it. Such a collection has no version yet (None) and is not tagged.
+    """
+    id_column = model.__mapper__.primary_key[0]
+    count, updated_at, last_id, now = (await db.execute(
+        select(func.count(), func.max(model.updated_at), func.max(id_column),
+               func.now())
+        .where(*criteria)
+    )).one()
+    if updated_at is None:
+        return count, None, last_id
+    if updated_at >= now.replace(microsecond=0):
+        return None
+    return count, updated_at.isoformat(), last_id
+
+
+def check_etag(request: Request, response: Response, *version) -> str:
+    """
+    Tag the response with an ETag for this collection version and the
+    request's query string, and short-circuit with 304 Not Modified when
+    the client already holds it.
+    """
+    etag = make_etag(request.url.path, sorted(request.query_params.multi_items()), *version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise NotModifiedException(etag)
+    response.headers["ETag"] = etag
+    # clients may keep the body but must revalidate before reusing it
+    response.headers["Cache-Control"] = "no-cache"
+    return etag
+
+
+async def check_collection_etag(request: Request, response: Response,
+                                db: AsyncSession, model, *criteria):
+    version = await collection_version(db, model, *criteria)
+    if version is None:
+        return None
+    return check_etag(request, response, *version)
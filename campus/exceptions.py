@@ -10,8 +10,8 @@ class StudentNotFoundException(HTTPException):
 
 
 class CommentNotFound(HTTPException):
-    def __init__(self, status_code, detail="Comment not found"):
-        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    def __init__(self, status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"):
+        super().__init__(status_code=status_code, detail=detail)
 
 
 class InvalidCredentialsException(HTTPException):
@@ -20,3 +20,86 @@ class InvalidCredentialsException(HTTPException):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=detail
         )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+
+
+class PasswordQueueFullException(HTTPException):
+    def __init__(self, detail: str = "Too many password operations in progress, retry shortly"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": "1"}
+        )
+
+
+class InvalidTokenException(HTTPException):
+    def __init__(self, detail: str = "Invalid or expired access token"):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=detail,
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+class ModeratorRequiredException(HTTPException):
+    def __init__(self, detail: str = "Only moderators can do this"):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
+
+
+class UnsupportedImportFormatException(HTTPException):
+    def __init__(self, detail: str = "Upload text/csv or application/x-ndjson"):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=detail
+        )
+
+
+class RankingUnavailableException(HTTPException):
+    def __init__(self, detail: str = "The hot ranking is not available yet, retry shortly"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": "5"}
+        )
+
+
+class NotModifiedException(HTTPException):
+    def __init__(self, etag: str):
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
+
+
+class ImageTooLargeException(HTTPException):
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Images are limited to {max_bytes} bytes"
+        )
+
+
+class UnsupportedImageFormatException(HTTPException):
+    def __init__(self, detail: str = "Upload a JPEG, PNG, GIF or WebP image as multipart/form-data"):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=detail
+        )
+
+
+class InvalidUploadException(HTTPException):
+    def __init__(self, detail: str = "Malformed upload"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
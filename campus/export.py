@@ -0,0 +1,81 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from sqlalchemy import select
+
+from .config import EXPORT_BATCH_SIZE
+from .database import AsyncSessionLocal
+from .models.postModel import PostModel
+from .models.commentModel import CommentModel
+from .models.studentPostVoteModel import StudentPostVoteModel
+from .models.reportModel import ReportModel
+
+
+class ExportEntity(str, Enum):
+    posts = "posts"
+    comments = "comments"
+    student_post_votes = "student_post_votes"
+    reports = "reports"
+
+
+EXPORT_MODELS = {
+    ExportEntity.posts: PostModel,
+    ExportEntity.comments: CommentModel,
+    ExportEntity.student_post_votes: StudentPostVoteModel,
+    ExportEntity.reports: ReportModel,
+}
+
+
+def in_group(entity: ExportEntity, group_id: int):
+    """Filter restricting an export to the rows that belong to one group."""
+    group_posts = select(PostModel.post_id).where(PostModel.group_id == group_id)
+    if entity is ExportEntity.posts:
+        return PostModel.group_id == group_id
+    if entity is ExportEntity.comments:
+        return CommentModel.post_id.in_(group_posts)
+    if entity is ExportEntity.student_post_votes:
+        return StudentPostVoteModel.post_id.in_(group_posts)
+    group_comments = select(CommentModel.comment_id).where(
+        CommentModel.post_id.in_(group_posts))
+    return ReportModel.post_id.in_(group_posts) | ReportModel.comment_id.in_(group_comments)
+
+
+def export_query(entity: ExportEntity, since: datetime = None,
+                 until: datetime = None, group_id: int = None):
+    """Plain column SELECT of one table in primary key order."""
+    model = EXPORT_MODELS[entity]
+    table = model.__table__
+    stmt = select(table).order_by(*table.primary_key.columns)
+    if since:
+        stmt = stmt.where(table.c.created_at >= since)
+    if until:
+        stmt = stmt.where(table.c.created_at < until)
+    if group_id:
+        stmt = stmt.where(in_group(entity, group_id))
+    return stmt
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def stream_ndjson(stmt, session_factory=AsyncSessionLocal,
+                       batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Yield NDJSON, one chunk per batch of rows.
+
+    The session lives inside the generator so it stays open for as long as
+    the response is streaming, and rows come from a server-side cursor so
+    only one batch is in memory at a time. Rows skip the ORM and Pydantic.
+    """
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.mappings().partitions():
+            yield "".join(
+                json.dumps(dict(row), default=json_default) + "\n" for row in rows)
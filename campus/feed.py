@@ -0,0 +1,94 @@
+import uuid
+
+from sqlalchemy import select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import cache
+from .config import FEED_CACHE_TTL
+from .database import AsyncSessionLocal
+from .models.postModel import PostModel
+from .models.studentGroupModel import StudentGroupModel
+from .pagination import paginate
+from .schemas.postSchema import PostPage
+from .serialization import type_adapter
+
+
+def subscribed_group_ids(student_id: int):
+    return (
+        select(StudentGroupModel.group_id)
+        .where(StudentGroupModel.student_id == student_id,
+               StudentGroupModel.is_subscribed == true())
+    )
+
+
+def feed_query(student_id: int, load_options=(), group_ids=None):
+    """Posts of the student's subscribed groups (or of group_ids)."""
+    if group_ids is None:
+        group_ids = subscribed_group_ids(student_id)
+    return (
+        select(PostModel)
+        .options(*load_options)
+        .where(PostModel.group_id.in_(group_ids))
+    )
+
+
+async def get_feed(db: AsyncSession, student_id: int, load_options,
+                   cursor: str = None, limit: int = 20, group_ids=None) -> dict:
+    """
+    Newest posts across the student's subscribed groups, keyset paginated.
+
+    One query: the memberships come from uq_student_group and each group's
+    posts from idx_posts_group_created.
+    """
+    query = feed_query(student_id, load_options, group_ids)
+    items, next_cursor = await paginate(
+        db, query, PostModel.created_at, PostModel.post_id, cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def feed_key(student_id: int, cursor: str, limit: int) -> str:
+    return f"feed:{student_id}:{limit}:{cursor or ''}"
+
+
+def group_version_key(group_id: int) -> str:
+    return f"feed-version:{group_id}"
+
+
+async def group_versions(group_ids) -> dict:
+    return {str(group_id): await cache.get(group_version_key(group_id))
+            for group_id in group_ids}
+
+
+async def bump_group_feed(group_id: int) -> None:
+    """Invalidate every cached feed page that includes this group."""
+    await cache.set(group_version_key(group_id), uuid.uuid4().hex, FEED_CACHE_TTL)
+
+
+async def get_cached_feed(student_id: int, load_options,
+                          cursor: str = None, limit: int = 20) -> dict:
+    """
+    get_feed through the cache, as a JSON ready dict.
+
+    A cached page remembers the version of each of the student's groups at
+    the time it was built, and is only served while none of them has been
+    bumped by a new post. Versions are read before the posts, so a post
+    racing with the rebuild leaves a page that is already out of date.
+
+    Pages are rebuilt from the primary. Built from a lagging replica, a
+    page could miss the post whose bump invalidated it and still be
+    served as current.
+    """
+    key = feed_key(student_id, cursor, limit)
+    entry = await cache.get(key)
+    if entry is not None and await group_versions(entry["versions"]) == entry["versions"]:
+        return entry["page"]
+
+    async with AsyncSessionLocal() as db:
+        group_ids = (await db.scalars(subscribed_group_ids(student_id))).all()
+        versions = await group_versions(group_ids)
+        page = await get_feed(db, student_id, load_options, cursor, limit, group_ids)
+    adapter = type_adapter(PostPage)
+    page = adapter.dump_python(
+        adapter.validate_python(page, from_attributes=True), mode="json")
+    await cache.set(key, {"versions": versions, "page": page}, FEED_CACHE_TTL)
+    return page
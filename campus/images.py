@@ -0,0 +1,226 @@
+import hashlib
+import os
+import re
+import uuid
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+import anyio
+import anyio.to_thread
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from .config import IMAGE_STORE_DIR, MAX_IMAGE_BYTES, IMAGE_IO_THREADS
+from .exceptions import (ImageTooLargeException, UnsupportedImageFormatException,
+                         InvalidUploadException)
+
+MEDIA_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+IMAGE_NAME = re.compile(r"^[0-9a-f]{64}\.(jpg|png|gif|webp)$")
+# bytes needed to tell the formats apart
+SNIFF_BYTES = 12
+# multipart boundaries and part headers on top of the image itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def sniff_image(head: bytes) -> Optional[str]:
+    """Extension of the image format the file starts with, if supported."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def image_url(name: str) -> str:
+    return f"/api/images/{name}"
+
+
+class ImageUpload:
+    """Temporary file receiving one uploaded image, hashed as it is written."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.head = b""
+        self.file = None
+
+    def write(self, data: bytes) -> None:
+        # runs in a worker thread; hashlib releases the GIL on large chunks
+        if self.file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, "wb")
+        self.digest.update(data)
+        self.file.write(data)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+    def discard(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+class ImageStore:
+    """
+    Content-addressed image files: an image is stored once as
+    <sha256>.<ext> under root, sharded by the first two hex digits, however
+    many posts use it.
+
+    Disk IO runs in worker threads behind the store's own CapacityLimiter,
+    so large or slow uploads never hold threads of the default pool that
+    serves the sync endpoints.
+    """
+
+    def __init__(self, root: str, max_bytes: int, io_threads: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.io_threads = io_threads
+        self._limiter = None
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        # created on first use, inside the running event loop
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.io_threads)
+        return self._limiter
+
+    async def run(self, func, *args, **kwargs):
+        return await anyio.to_thread.run_sync(
+            partial(func, *args, **kwargs), limiter=self.limiter)
+
+    def path(self, name: str) -> Optional[Path]:
+        """Location of a stored image, or None for names the store never makes."""
+        if not IMAGE_NAME.match(name):
+            return None
+        return self.root / name[:2] / name
+
+    async def exists(self, name: str) -> bool:
+        path = self.path(name)
+        return path is not None and await self.run(path.is_file)
+
+    async def remove(self, name: str) -> None:
+        """Delete a stored image; the caller checks that no post uses it."""
+        path = self.path(name)
+        if path is not None:
+            await self.run(path.unlink, missing_ok=True)
+
+    def _commit(self, upload: ImageUpload, name: str) -> None:
+        upload.close()
+        path = self.path(name)
+        if path.exists():
+            # already stored by an earlier upload
+            upload.discard()
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(upload.path, path)
+
+    async def save_upload(self, headers, stream, field: str = "file") -> str:
+        """
+        Stream the image in the multipart field `field` into the store and
+        return its name.
+
+        Each body chunk is parsed as it arrives and the image bytes in it
+        are written straight to a temporary file, so at most one chunk is
+        held in memory. The format is checked from the first bytes and the
+        size as the bytes come in, so bad uploads are cut off early. The
+        finished file is renamed to its hash, or dropped when that hash is
+        already stored.
+        """
+        content_type, options = parse_options_header(headers.get("content-type"))
+        boundary = options.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise UnsupportedImageFormatException()
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_bytes + MULTIPART_OVERHEAD:
+            raise ImageTooLargeException(self.max_bytes)
+
+        target = field.encode("utf-8")
+        state = {"header": b"", "value": b"", "disposition": b"",
+                 "in_file": False, "found": False}
+        pending = []
+
+        def on_part_begin():
+            state["disposition"] = b""
+            state["in_file"] = False
+
+        def on_header_field(data, start, end):
+            state["header"] += data[start:end]
+
+        def on_header_value(data, start, end):
+            state["value"] += data[start:end]
+
+        def on_header_end():
+            if state["header"].lower() == b"content-disposition":
+                state["disposition"] = state["value"]
+            state["header"] = state["value"] = b""
+
+        def on_headers_finished():
+            _, part_options = parse_options_header(state["disposition"])
+            if part_options.get(b"name") == target and b"filename" in part_options \
+                    and not state["found"]:
+                state["in_file"] = state["found"] = True
+
+        def on_part_data(data, start, end):
+            # only the image is kept; other fields are skipped, not buffered
+            if state["in_file"]:
+                pending.append(data[start:end])
+
+        def on_part_end():
+            state["in_file"] = False
+
+        parser = MultipartParser(boundary, {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        })
+
+        upload = ImageUpload(self.root / "tmp" / uuid.uuid4().hex)
+        try:
+            async for chunk in stream:
+                try:
+                    parser.write(chunk)
+                except Exception as e:
+                    raise InvalidUploadException(f"Malformed multipart body: {e}")
+                if not pending:
+                    continue
+                data = b"".join(pending)
+                pending.clear()
+                upload.size += len(data)
+                if upload.size > self.max_bytes:
+                    raise ImageTooLargeException(self.max_bytes)
+                if len(upload.head) < SNIFF_BYTES:
+                    upload.head = (upload.head + data)[:SNIFF_BYTES]
+                    if len(upload.head) == SNIFF_BYTES and sniff_image(upload.head) is None:
+                        raise UnsupportedImageFormatException()
+                await self.run(upload.write, data)
+            parser.finalize()
+
+            if not state["found"] or not upload.size:
+                raise InvalidUploadException(f"Missing image file in field '{field}'")
+            extension = sniff_image(upload.head)
+            if extension is None:
+                raise UnsupportedImageFormatException()
+            name = f"{upload.digest.hexdigest()}.{extension}"
+            await self.run(self._commit, upload, name)
+            return name
+        except BaseException:
+            await self.run(upload.discard)
+            raise
+
+
+image_store = ImageStore(IMAGE_STORE_DIR, MAX_IMAGE_BYTES, IMAGE_IO_THREADS)
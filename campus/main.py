@@ -1,16 +1,71 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import Base, engine
+from .config import (VOTE_BUFFER_ENABLED, QUERY_STATS_ENABLED, METRICS_ENABLED,
+                     TRENDING_ENABLED)
+from .database import Base, engine, async_engine
+from .vote_buffer import vote_buffer
+from .passwords import password_hasher
+from .cache import cache
+from .query_stats import QueryStatsMiddleware, install_query_events, remove_query_events
+from .metrics import MetricsMiddleware, install_metrics_events, mark_process_dead
+from .replicas import replica_set, ReadYourWritesMiddleware
+from .trending import trending
 from .routers.studentRouter import router as student_router
 from .routers.groupRouter import router as group_router
 from .routers.postRouter import router as post_router
 from .routers.commentRouter import router as comment_router
 from .routers.studentGroupRouter import router as student_group_router
+from .routers.healthRouter import router as health_router
+from .routers.exportRouter import router as export_router
+from .routers.metricsRouter import router as metrics_router
+from .routers.reportRouter import router as report_router
+from .routers.imageRouter import router as image_router
+
+logger = logging.getLogger(__name__)
+
+
+def query_stats_engines() -> list:
+    return [engine, async_engine.sync_engine,
+            *(replica.engine.sync_engine for replica in replica_set.replicas)]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # query count / DB time per request, while the app is serving
+    if QUERY_STATS_ENABLED:
+        for sync_engine in query_stats_engines():
+            install_query_events(sync_engine)
+    if VOTE_BUFFER_ENABLED:
+        vote_buffer.start()
+    replica_set.start()
+    if TRENDING_ENABLED:
+        trending.start()
+    yield
+    await trending.stop()
+    # write buffered vote counts back before the pools go away; a failed
+    # drain must not keep the rest of the shutdown from running
+    try:
+        await vote_buffer.stop()
+    except Exception:
+        logger.exception("Vote buffer drain failed, %d vote count rows lost",
+                         vote_buffer.pending_count())
+    password_hasher.shutdown()
+    await cache.close()
+    # close pooled connections so workers exit without leaking them
+    engine.dispose()
+    await async_engine.dispose()
+    await replica_set.stop()
+    for sync_engine in query_stats_engines():
+        remove_query_events(sync_engine)
+    mark_process_dead()
 
 
 def create_app():
-    app = FastAPI(title="Student Management API")
+    app = FastAPI(title="Student Management API", lifespan=lifespan)
 
     # Database setup
     # Base.metadata.create_all(bind=engine)
@@ -24,12 +79,33 @@ def create_app():
         allow_headers=["*"],
     )
 
+    # Query count / DB time per request
+    if QUERY_STATS_ENABLED:
+        app.add_middleware(QueryStatsMiddleware)
+
+    # Prometheus metrics, served at /metrics
+    if METRICS_ENABLED:
+        install_metrics_events(engine, "sync")
+        install_metrics_events(async_engine.sync_engine, "async")
+        for replica in replica_set.replicas:
+            install_metrics_events(replica.engine.sync_engine, replica.label)
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+
+    # GET handlers read from replicas, pin writers to the primary briefly
+    if replica_set:
+        app.add_middleware(ReadYourWritesMiddleware)
+
     # Include routers
     app.include_router(student_router)
     app.include_router(group_router)
     app.include_router(post_router)
     app.include_router(comment_router)
     app.include_router(student_group_router)
+    app.include_router(health_router)
+    app.include_router(export_router)
+    app.include_router(report_router)
+    app.include_router(image_router)
 
     return app
 
@@ -0,0 +1,119 @@
+from sqlalchemy import select, delete, tuple_, literal, true, and_
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import BULK_MEMBERSHIP_CHUNK_SIZE
+from .models.studentGroupModel import StudentGroupModel
+from .models.studentModel import StudentModel
+from .models.groupModel import GroupModel
+
+MEMBERSHIP_COLUMNS = ("student_id", "group_id", "is_subscribed")
+
+
+def insert_memberships(dialect_name: str):
+    """INSERT into student_groups that skips pairs which already exist."""
+    if dialect_name == "mysql":
+        stmt = mysql.insert(StudentGroupModel)
+        # a no-op update rather than INSERT IGNORE, which would also
+        # swallow foreign key errors
+        return stmt.on_duplicate_key_update(student_id=stmt.inserted.student_id)
+    return sqlite.insert(StudentGroupModel).on_conflict_do_nothing(
+        index_elements=["student_id", "group_id"])
+
+
+def pair_in(pairs: list[tuple[int, int]]):
+    # SQLite does not look a row value IN list up in uq_student_group; the
+    # plain IN on its leading column does, and the pairs filter what it finds
+    student_ids = sorted({student_id for student_id, _ in pairs})
+    return and_(
+        StudentGroupModel.student_id.in_(student_ids),
+        tuple_(StudentGroupModel.student_id, StudentGroupModel.group_id).in_(pairs),
+    )
+
+
+def chunks(items: list, size: int = BULK_MEMBERSHIP_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def existing_ids(db: AsyncSession, id_column, ids: set) -> set:
+    if not ids:
+        return set()
+    return set((await db.scalars(select(id_column).where(id_column.in_(ids)))).all())
+
+
+async def add_memberships(db: AsyncSession, pairs: list[tuple[int, int]],
+                          is_subscribed: bool = True) -> dict:
+    """
+    Add many (student_id, group_id) memberships.
+
+    Students and groups are checked with one IN query each; pairs naming
+    a missing one are skipped and reported. Memberships that already exist
+    are left alone by the upsert, and rows are committed in chunks.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    student_ids = await existing_ids(
+        db, StudentModel.student_id, {student_id for student_id, _ in pairs})
+    group_ids = await existing_ids(
+        db, GroupModel.group_id, {group_id for _, group_id in pairs})
+    valid_pairs = [(student_id, group_id) for student_id, group_id in pairs
+                   if student_id in student_ids and group_id in group_ids]
+
+    stmt = insert_memberships(db.bind.dialect.name)
+    added = 0
+    for chunk in chunks(valid_pairs):
+        # the row count of an upsert is not comparable across drivers, so
+        # count the new pairs up front; the upsert still covers races
+        current = set((await db.execute(
+            select(StudentGroupModel.student_id, StudentGroupModel.group_id)
+            .where(pair_in(chunk))
+        )).tuples().all())
+        new_pairs = [pair for pair in chunk if pair not in current]
+        if new_pairs:
+            await db.execute(stmt, [
+                {"student_id": student_id, "group_id": group_id,
+                 "is_subscribed": is_subscribed}
+                for student_id, group_id in new_pairs
+            ])
+        added += len(new_pairs)
+        await db.commit()
+
+    return {
+        "added": added,
+        "already_members": len(valid_pairs) - added,
+        "missing_students": sorted({s for s, _ in pairs} - student_ids),
+        "missing_groups": sorted({g for _, g in pairs} - group_ids),
+    }
+
+
+async def remove_memberships(db: AsyncSession, pairs: list[tuple[int, int]]) -> dict:
+    """Delete many (student_id, group_id) memberships, one DELETE per chunk."""
+    pairs = list(dict.fromkeys(pairs))
+    removed = 0
+    for chunk in chunks(pairs):
+        result = await db.execute(
+            delete(StudentGroupModel)
+            .where(pair_in(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        removed += result.rowcount
+        await db.commit()
+    return {"removed": removed, "not_members": len(pairs) - removed}
+
+
+async def enroll_in_default_groups(db: AsyncSession, emails: list[str]) -> None:
+    """
+    Subscribe the students with these emails to every is_default group.
+
+    A single INSERT ... SELECT, the caller commits.
+    """
+    if not emails:
+        return
+    memberships = (
+        select(StudentModel.student_id, GroupModel.group_id, literal(True))
+        .select_from(StudentModel)
+        .join(GroupModel, GroupModel.is_default == true())
+        .where(StudentModel.email.in_(emails))
+    )
+    stmt = insert_memberships(db.bind.dialect.name)
+    await db.execute(stmt.from_select(MEMBERSHIP_COLUMNS, memberships))
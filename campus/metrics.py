@@ -0,0 +1,164 @@
+import os
+import time
+
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram,
+                               REGISTRY, generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .075, .1, .25, .5, .75, 1, 2.5, 5, 10)
+DB_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5)
+
+REQUEST_LATENCY = Histogram(
+    "campus_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+REQUESTS_IN_FLIGHT = Gauge(
+    "campus_http_requests_in_flight", "HTTP requests being handled",
+    multiprocess_mode="livesum")
+
+DB_QUERY_LATENCY = Histogram(
+    "campus_db_query_duration_seconds", "Database statement latency",
+    ["engine"], buckets=DB_BUCKETS)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "campus_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, including new connects",
+    ["engine"], buckets=DB_BUCKETS)
+DB_POOL_CHECKED_OUT = Gauge(
+    "campus_db_pool_checked_out", "Connections currently checked out",
+    ["engine"], multiprocess_mode="livesum")
+DB_POOL_OPEN = Gauge(
+    "campus_db_pool_connections", "Open database connections, pooled or in use",
+    ["engine"], multiprocess_mode="livesum")
+
+WRITES = Counter(
+    "campus_writes_total", "Rows written by the API", ["entity"])
+
+
+class CheckoutTimingMixin:
+    """Records how long each pool checkout waited."""
+
+    engine_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.engine_label).observe(
+                time.perf_counter() - started)
+
+
+class TimedQueuePool(CheckoutTimingMixin, QueuePool):
+    engine_label = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+_labelled_pools = {}
+
+
+def timed_async_pool(label: str) -> type:
+    """
+    TimedAsyncAdaptedQueuePool reporting under its own engine label. The
+    label lives on the class because dispose() rebuilds the pool from it.
+    """
+    if label not in _labelled_pools:
+        _labelled_pools[label] = type(f"TimedAsyncAdaptedQueuePool_{label}",
+                                      (TimedAsyncAdaptedQueuePool,),
+                                      {"engine_label": label})
+    return _labelled_pools[label]
+
+
+_instrumented_engines = set()
+
+
+def install_metrics_events(sync_engine, label: str) -> None:
+    """Statement latency and pool gauges for one engine, installed once."""
+    if sync_engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(sync_engine)
+    query_latency = DB_QUERY_LATENCY.labels(label)
+    checked_out = DB_POOL_CHECKED_OUT.labels(label)
+    open_connections = DB_POOL_OPEN.labels(label)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # one statement at a time per connection; the start of a failed
+        # statement is overwritten by the next one instead of piling up
+        conn.info["metrics_start_time"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_latency.observe(time.perf_counter() - conn.info["metrics_start_time"])
+
+    pool = sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        open_connections.inc()
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        open_connections.dec()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+
+def multiprocess_enabled() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def render_metrics() -> bytes:
+    """Exposition text; merges the files of every worker in multiprocess mode."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared files on shutdown."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """Per-route latency histogram and in-flight gauge for HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # the route template keeps the label set small; unmatched paths
+            # share one label
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - started)
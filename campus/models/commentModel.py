@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, func, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -11,7 +11,7 @@ class CommentModel(Base):
     post_id = Column(Integer, ForeignKey("posts.post_id"), nullable=False)
     parent_comment_id = Column(Integer, nullable=True)
     content = Column(Text, nullable=False)
-    vote_count = Column(Integer, default=0)
+    vote_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(),
                         onupdate=func.now())
@@ -21,3 +21,16 @@ class CommentModel(Base):
     student_comment_votes = relationship(
         "StudentCommentVoteModel", back_populates="comments")
     reports = relationship("ReportModel", back_populates="comments")
+
+    __table_args__ = (
+        # keyset pagination of all comments, newest or most voted first
+        Index('idx_comments_created', 'created_at', 'comment_id'),
+        Index('idx_comments_votes', 'vote_count', 'comment_id'),
+        # keyset pagination of a post's comments, newest or most voted first
+        Index('idx_comments_post_created', 'post_id', 'created_at', 'comment_id'),
+        Index('idx_comments_post_votes', 'post_id', 'vote_count', 'comment_id'),
+        # count/max(updated_at) of a post's comments for the list ETag
+        Index('idx_comments_post_updated', 'post_id', 'updated_at'),
+        # a student's comments, newest first
+        Index('idx_comments_student_created', 'student_id', 'created_at', 'comment_id'),
+    )
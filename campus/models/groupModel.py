@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, func, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -17,3 +17,9 @@ class GroupModel(Base):
     posts = relationship("PostModel", back_populates="groups")
     student_groups = relationship(
         "StudentGroupModel", back_populates="groups")
+
+    # full-text search; SQLite uses the groups_fts table (campus/search.py)
+    __table_args__ = (
+        Index('ft_groups_text', 'name', 'description',
+              mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
@@ -13,7 +13,9 @@ class PostModel(Base):
     description = Column(String(1000), nullable=False)
     details = Column(Text, nullable=True)  # Using Text for longer content
     image = Column(String(255), nullable=True)  # image url
-    vote_count = Column(Integer, default=0)
+    vote_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # kept in step by create_comment/delete_comment, never counted on read
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(),
                         onupdate=func.now())
@@ -26,6 +28,18 @@ class PostModel(Base):
     reports = relationship("ReportModel", back_populates="posts")
     # Optional: Add an index for frequently queried columns
     __table_args__ = (
-        Index('idx_student_id', 'student_id'),
         Index('idx_group_id', 'group_id'),
+        # a student's posts, newest first; also backs the student foreign key
+        Index('idx_posts_student_created', 'student_id', 'created_at', 'post_id'),
+        # keyset pagination of all posts, newest or most voted first
+        Index('idx_posts_created', 'created_at', 'post_id'),
+        Index('idx_posts_votes', 'vote_count', 'post_id'),
+        # keyset pagination of a group's posts, newest or most voted first
+        Index('idx_posts_group_created', 'group_id', 'created_at', 'post_id'),
+        Index('idx_posts_group_votes', 'group_id', 'vote_count', 'post_id'),
+        # count/max(updated_at) of a group's posts for the list ETag
+        Index('idx_posts_group_updated', 'group_id', 'updated_at'),
+        # full-text search; SQLite uses the posts_fts table (campus/search.py)
+        Index('ft_posts_text', 'description', 'details',
+              mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
     )
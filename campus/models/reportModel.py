@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Index
 from ..database import Base
 from datetime import datetime
 from sqlalchemy.orm import relationship
@@ -13,6 +13,9 @@ class ReportModel(Base):
     entity_type: str = Column(String(255))  # if it is a post or comment
     reason: str = Column(String(1000))
     status: str = Column(String(255), default="pending")
+    # moderator (student_id) working on the report, see campus/moderation.py
+    claimed_by: int = Column(Integer, nullable=True)
+    claimed_at: datetime = Column(DateTime, nullable=True)
     created_at: datetime = Column(DateTime, server_default=func.now())
     updated_at: datetime = Column(
         DateTime, server_default=func.now(), onupdate=func.now())
@@ -20,3 +23,8 @@ class ReportModel(Base):
     posts = relationship("PostModel", back_populates="reports")
     comments = relationship("CommentModel", back_populates="reports")
     students = relationship("StudentModel", back_populates="reports")
+
+    # moderation queue, oldest reports of a status first
+    __table_args__ = (
+        Index('idx_reports_status_created', 'status', 'created_at', 'report_id'),
+    )
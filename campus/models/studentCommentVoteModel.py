@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, func, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -22,3 +22,10 @@ class StudentCommentVoteModel(Base):
         "StudentModel", back_populates="student_comment_votes")
     comments = relationship(
         "CommentModel", back_populates="student_comment_votes")
+
+    # one vote per student per comment, the target of the vote upsert
+    __table_args__ = (
+        UniqueConstraint('student_id', 'comment_id', name='uq_student_comment_vote'),
+        # the votes of a comment, for recounts
+        Index('idx_student_comment_votes_comment', 'comment_id', 'student_id'),
+    )
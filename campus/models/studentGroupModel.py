@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, func, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Boolean, func, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, Session
 from fastapi import Depends
 from ..database import Base
@@ -17,3 +17,10 @@ class StudentGroupModel(Base):
 
     students = relationship("StudentModel", back_populates="student_groups")
     groups = relationship("GroupModel", back_populates="student_groups")
+
+    # one membership per student per group, the target of the bulk upserts
+    __table_args__ = (
+        UniqueConstraint('student_id', 'group_id', name='uq_student_group'),
+        # the members of a group
+        Index('idx_student_groups_group', 'group_id', 'student_id'),
+    )
@@ -1,7 +1,7 @@
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, func
 from sqlalchemy.orm import relationship
-import bcrypt
 from ..database import Base
+from ..passwords import hash_password, check_password
 
 
 class StudentModel(Base):
@@ -27,16 +27,9 @@ class StudentModel(Base):
     reports = relationship("ReportModel", back_populates="students")
 
     def set_password(self, raw_password: str) -> None:
-        """Hash and set the password."""
-        # Convert password to bytes
-        raw_password_bytes = raw_password.encode(
-            'utf-8')  # Encode the password string to bytes
-        hashed = bcrypt.hashpw(raw_password_bytes, bcrypt.gensalt())
-        # Store the hash as a string in the database
-        self.password = hashed.decode('utf-8')
+        """Hash and set the password (blocking, prefer password_hasher)."""
+        self.password = hash_password(raw_password)
 
     def check_password(self, raw_password: str) -> bool:
-        """Verify the provided password against the stored hash."""
-        # Convert password to bytes and compare
-        raw_password_bytes = raw_password.encode('utf-8')  # Encode to bytes
-        return bcrypt.checkpw(raw_password_bytes, self.password.encode('utf-8'))
+        """Verify the provided password against the stored hash (blocking)."""
+        return check_password(raw_password, self.password)
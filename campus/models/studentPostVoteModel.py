@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, func, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -20,3 +20,10 @@ class StudentPostVoteModel(Base):
     students = relationship(
         "StudentModel", back_populates="student_post_votes")
     posts = relationship("PostModel", back_populates="student_post_votes")
+
+    # one vote per student per post, the target of the vote upsert
+    __table_args__ = (
+        UniqueConstraint('student_id', 'post_id', name='uq_student_post_vote'),
+        # the votes of a post, for recounts and exports
+        Index('idx_student_post_votes_post', 'post_id', 'student_id'),
+    )
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import REPORT_CLAIM_TIMEOUT
+from .models.reportModel import ReportModel
+
+PENDING = "pending"
+QUEUE_ORDER = (ReportModel.created_at, ReportModel.report_id)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def claimable(now: datetime):
+    """Pending reports nobody holds, or whose claim has timed out."""
+    expired = now - timedelta(seconds=REPORT_CLAIM_TIMEOUT)
+    return (
+        (ReportModel.status == PENDING)
+        & or_(ReportModel.claimed_at.is_(None), ReportModel.claimed_at < expired)
+    )
+
+
+def queue_query(now: datetime, limit: int):
+    return (
+        select(ReportModel)
+        .where(claimable(now))
+        .order_by(*QUEUE_ORDER)
+        .limit(limit)
+    )
+
+
+async def claim_reports(db: AsyncSession, moderator_id: int, limit: int) -> list:
+    """
+    Claim the oldest claimable reports for one moderator.
+
+    On MySQL the rows are picked with FOR UPDATE SKIP LOCKED, so
+    moderators claiming at the same time get disjoint batches instead of
+    waiting on each other. SQLite has no row locks; there a single
+    UPDATE ... RETURNING claims the batch, which is atomic because SQLite
+    runs one writer at a time.
+    """
+    now = utcnow()
+    claim = {"claimed_by": moderator_id, "claimed_at": now}
+
+    if db.bind.dialect.name == "sqlite":
+        batch = select(ReportModel.report_id).where(claimable(now)) \
+            .order_by(*QUEUE_ORDER).limit(limit)
+        result = await db.scalars(
+            update(ReportModel)
+            .where(ReportModel.report_id.in_(batch))
+            .values(**claim)
+            .returning(ReportModel)
+            .execution_options(synchronize_session=False)
+        )
+        reports = sorted(result.all(), key=lambda report: (report.created_at, report.report_id))
+        await db.commit()
+        return reports
+
+    reports = (await db.scalars(
+        queue_query(now, limit).with_for_update(skip_locked=True)
+    )).all()
+    if reports:
+        await db.execute(
+            update(ReportModel)
+            .where(ReportModel.report_id.in_([report.report_id for report in reports]))
+            .values(**claim)
+            .execution_options(synchronize_session=False)
+        )
+        for report in reports:
+            report.claimed_by, report.claimed_at = moderator_id, now
+    await db.commit()
+    return reports
+
+
+async def close_reports(db: AsyncSession, moderator_id: int, report_ids: list[int],
+                        status: str) -> int:
+    """
+    Resolve or dismiss many pending reports with one UPDATE. Only reports
+    the moderator holds the claim on are closed; once a claim has timed
+    out and someone else claimed the report, it is theirs to close.
+    """
+    result = await db.execute(
+        update(ReportModel)
+        .where(ReportModel.report_id.in_(report_ids),
+               ReportModel.status == PENDING,
+               ReportModel.claimed_by == moderator_id)
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def report_counts(db: AsyncSession, limit: int) -> dict:
+    """Most reported posts and comments among the pending reports."""
+    counts = {}
+    for key, column in (("posts", ReportModel.post_id),
+                        ("comments", ReportModel.comment_id)):
+        report_count = func.count().label("report_count")
+        rows = await db.execute(
+            select(column, report_count)
+            .where(ReportModel.status == PENDING, column.is_not(None))
+            .group_by(column)
+            .order_by(report_count.desc(), column)
+            .limit(limit)
+        )
+        counts[key] = rows.mappings().all()
+    return counts
@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, and_, or_, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+from .exceptions import InvalidCursorException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(sort_key: str, value, row_id: int) -> str:
+    """Encode the last row of a page as an opaque, url-safe cursor."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_key, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column):
+    """Decode a cursor produced by encode_cursor for the given sort column."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_key != sort_column.key or not isinstance(row_id, int) \
+                or isinstance(row_id, bool):
+            raise ValueError(cursor)
+        if isinstance(sort_column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif isinstance(sort_column.type, Integer):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(cursor)
+        elif not isinstance(value, sort_column.type.python_type):
+            raise ValueError(cursor)
+    except (ValueError, TypeError, NotImplementedError):
+        raise InvalidCursorException()
+    return value, row_id
+
+
+class SortableDateTime(TypeDecorator):
+    """
+    Binds a cursor's datetime the way the column stores it.
+
+    SQLite keeps datetimes as text and compares them as strings. Rows get
+    created_at from CURRENT_TIMESTAMP ('YYYY-MM-DD HH:MM:SS'), while the
+    DateTime type would bind '... HH:MM:SS.000000', which sorts after every
+    row of that second and makes the same page come back forever.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != "sqlite" or value is None:
+            return value
+        if value.microsecond:
+            return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Opaque cursor for result sets ranked by a computed score."""
+    return encode_cursor("offset", offset, 0)
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, offset, _ = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_key != "offset" or not isinstance(offset, int) or offset < 0:
+            raise ValueError(cursor)
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
+    return offset
+
+
+def keyset_query(stmt, sort_column, id_column, cursor: str = None,
+                 limit: int = DEFAULT_PAGE_SIZE):
+    """The statement for one page after cursor, with one extra row to detect more."""
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_column)
+        if isinstance(sort_column.type, DateTime):
+            value = type_coerce(value, SortableDateTime())
+        stmt = stmt.where(or_(
+            sort_column < value,
+            and_(sort_column == value, id_column < row_id)
+        ))
+    return stmt.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+async def paginate(db, stmt, sort_column, id_column, cursor: str = None,
+                   limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Apply keyset pagination on (sort_column, id_column), both descending.
+
+    Returns the rows of the page and the cursor of the next page, which is
+    None once the last page has been reached.
+    """
+    stmt = keyset_query(stmt, sort_column, id_column, cursor, limit)
+    rows = (await db.scalars(stmt)).unique().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_column.key,
+                                    getattr(last, sort_column.key),
+                                    getattr(last, id_column.key))
+    return rows, next_cursor
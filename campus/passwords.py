@@ -0,0 +1,95 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from .config import BCRYPT_ROUNDS, PASSWORD_WORKERS, PASSWORD_MAX_PENDING
+from .exceptions import PasswordQueueFullException
+
+
+def hash_password(raw_password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """Hash a password with bcrypt at the configured work factor."""
+    hashed = bcrypt.hashpw(raw_password.encode('utf-8'), bcrypt.gensalt(rounds))
+    return hashed.decode('utf-8')
+
+
+def hash_passwords(raw_passwords: list[str], rounds: int = BCRYPT_ROUNDS) -> list[str]:
+    """Hash a batch of passwords in one call, in order."""
+    return [hash_password(raw_password, rounds) for raw_password in raw_passwords]
+
+
+def check_password(raw_password: str, hashed_password: str) -> bool:
+    """Verify a password against a stored bcrypt hash."""
+    return bcrypt.checkpw(raw_password.encode('utf-8'),
+                          hashed_password.encode('utf-8'))
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool off the event loop.
+
+    Each hash costs hundreds of milliseconds of CPU; running it in worker
+    processes spreads a login burst across cores and keeps the request
+    threadpool and the event loop free for everything else. Once
+    max_pending operations are queued, further calls fail fast with 503.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads
+            # is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise PasswordQueueFullException()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, raw_password: str) -> str:
+        return await self._run(hash_password, raw_password)
+
+    async def hash_many(self, raw_passwords: list[str]) -> list[str]:
+        """Hash a batch, split into one chunk per worker process."""
+        if not raw_passwords:
+            return []
+        chunk_size = -(-len(raw_passwords) // self.workers)
+        chunks = [raw_passwords[i:i + chunk_size]
+                  for i in range(0, len(raw_passwords), chunk_size)]
+        hashed_chunks = await asyncio.gather(
+            *(self._run(hash_passwords, chunk) for chunk in chunks))
+        return [hashed for chunk in hashed_chunks for hashed in chunk]
+
+    async def verify(self, raw_password: str, hashed_password: str) -> bool:
+        return await self._run(check_password, raw_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rounds": BCRYPT_ROUNDS,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(PASSWORD_WORKERS, PASSWORD_MAX_PENDING)
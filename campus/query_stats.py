@@ -0,0 +1,128 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from .config import (QUERY_STATS_HEADER, QUERY_COUNT_BUDGET,
+                     QUERY_TIME_BUDGET_MS, QUERY_REPEAT_THRESHOLD)
+
+logger = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)" and multi-row VALUES differ only in their length
+PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+REPEATED_ROWS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with placeholder lists and whitespace collapsed."""
+    statement = REPEATED_ROWS.sub("(?)", PLACEHOLDER_LIST.sub("(?)", statement))
+    return WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryStats:
+    """Queries run while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_time * 1000
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> list:
+        return [(statement, count)
+                for statement, count in self.fingerprints.most_common()
+                if count >= threshold]
+
+    def over_budget(self) -> bool:
+        return bool(
+            (QUERY_COUNT_BUDGET and self.count > QUERY_COUNT_BUDGET)
+            or (QUERY_TIME_BUDGET_MS and self.total_ms > QUERY_TIME_BUDGET_MS)
+            or self.repeated()
+        )
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+
+
+# the middleware puts a fresh QueryStats here; copies of the context made
+# for the threadpool or for SQLAlchemy's greenlets share the same object
+current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # one statement at a time per connection; a statement that fails is
+    # simply overwritten by the next one
+    conn.info["query_start_time"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - conn.info["query_start_time"])
+
+
+def install_query_events(sync_engine) -> None:
+    """Time every statement of an engine (pass async_engine.sync_engine for asyncio)."""
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def remove_query_events(sync_engine) -> None:
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Collects QueryStats for every HTTP request.
+
+    Adds a Server-Timing header when QUERY_STATS_HEADER is set and logs a
+    warning once a request goes over the query count or time budget, or
+    repeats a statement QUERY_REPEAT_THRESHOLD times. Queries run while a
+    streaming body is sent are logged but miss the header.
+    """
+
+    def __init__(self, app, header: bool = QUERY_STATS_HEADER):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if self.header and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            if stats.over_budget():
+                logger.warning(
+                    "%s %s ran %d queries in %.1f ms; repeated: %s",
+                    scope["method"], scope["path"], stats.count, stats.total_ms,
+                    stats.repeated() or "none")
@@ -0,0 +1,198 @@
+import asyncio
+import itertools
+import logging
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from .config import (_async_url, DATABASE_REPLICA_URLS, REPLICA_STRATEGY,
+                     REPLICA_MAX_LAG, REPLICA_CHECK_INTERVAL,
+                     READ_YOUR_WRITES_WINDOW)
+from .database import AsyncSessionLocal, pool_options
+from .metrics import timed_async_pool
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "campus_read_primary"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class Replica:
+    def __init__(self, url: str, label: str = "replica"):
+        self.url = url
+        # engine label of this replica's pool and query metrics
+        self.label = label
+        self.engine = create_async_engine(
+            _async_url(url), poolclass=timed_async_pool(label), **pool_options)
+        self.sessionmaker = async_sessionmaker(
+            self.engine, autoflush=False, expire_on_commit=False)
+        self.lag = None
+        # unused until the first lag check passes
+        self.healthy = False
+        self.selected = 0
+
+    def in_use(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()
+
+    async def measure_lag(self) -> float:
+        """Seconds behind the primary; raises when replication is broken."""
+        async with self.engine.connect() as conn:
+            if conn.dialect.name != "mysql":
+                # SQLite files used as stand-ins have no replication
+                await conn.execute(text("SELECT 1"))
+                return 0.0
+            try:
+                status = (await conn.execute(text("SHOW REPLICA STATUS"))).mappings().first()
+                column = "Seconds_Behind_Source"
+            except Exception:
+                # MySQL before 8.0.22
+                status = (await conn.execute(text("SHOW SLAVE STATUS"))).mappings().first()
+                column = "Seconds_Behind_Master"
+        if status is None:
+            return 0.0
+        if status[column] is None:
+            raise RuntimeError("replication is not running")
+        return float(status[column])
+
+
+class ReplicaSet:
+    """
+    Picks the replica for read-only sessions.
+
+    A background task measures every replica's lag each check_interval
+    seconds; replicas that lag more than max_lag, or cannot be reached,
+    are skipped until they recover, and none is used before its first
+    check. With no usable replica, reads go to the primary.
+    """
+
+    def __init__(self, urls: list[str], strategy: str, max_lag: float,
+                 check_interval: float):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unknown REPLICA_STRATEGY {strategy!r}")
+        self.replicas = [Replica(url, f"replica{number}")
+                         for number, url in enumerate(urls)]
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary_fallbacks = 0
+        self._turns = itertools.count()
+        self._task = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self):
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            self.primary_fallbacks += 1
+            return None
+        if self.strategy == "least_connections":
+            replica = min(healthy, key=Replica.in_use)
+        else:
+            replica = healthy[next(self._turns) % len(healthy)]
+        replica.selected += 1
+        return replica
+
+    async def check(self) -> None:
+        for replica in self.replicas:
+            try:
+                replica.lag = await replica.measure_lag()
+                healthy = replica.lag <= self.max_lag
+            except Exception:
+                replica.lag = None
+                healthy = False
+            if healthy != replica.healthy:
+                logger.warning("replica %s is now %s (lag %s)", self.safe_url(replica),
+                               "in use" if healthy else "skipped", replica.lag)
+            replica.healthy = healthy
+
+    def start(self) -> None:
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    @staticmethod
+    def safe_url(replica: Replica) -> str:
+        return make_url(replica.url).render_as_string(hide_password=True)
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "max_lag": self.max_lag,
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [
+                {"url": self.safe_url(replica), "healthy": replica.healthy,
+                 "lag": replica.lag, "in_use": replica.in_use(),
+                 "selected": replica.selected}
+                for replica in self.replicas
+            ],
+        }
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS, REPLICA_STRATEGY,
+                         REPLICA_MAX_LAG, REPLICA_CHECK_INTERVAL)
+
+
+def read_sessionmaker(request: Request):
+    """Session factory for a read-only request: a replica unless pinned."""
+    if not replica_set or request.cookies.get(PIN_COOKIE):
+        return AsyncSessionLocal
+    replica = replica_set.choose()
+    return replica.sessionmaker if replica else AsyncSessionLocal
+
+
+async def get_read_db(request: Request):
+    """get_async_db for GET handlers that can tolerate replication lag."""
+    async with read_sessionmaker(request)() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a client to the primary for a short window after it writes.
+
+    Every successful non-GET response sets a cookie that expires after
+    READ_YOUR_WRITES_WINDOW seconds; read_sessionmaker uses the primary
+    while it is present, so a client always sees its own writes.
+
+    The pin lives only in the cookie. Clients that do not keep cookies
+    (scripts, most HTTP libraries without a cookie jar) are never pinned,
+    and may read from a replica that has not caught up with their write
+    yet, up to REPLICA_MAX_LAG seconds behind.
+    """
+
+    def __init__(self, app, window: int = READ_YOUR_WRITES_WINDOW):
+        self.app = app
+        self.cookie = (f"{PIN_COOKIE}=1; Max-Age={window}; Path=/; HttpOnly; "
+                       "SameSite=Lax").encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", self.cookie))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
@@ -1,91 +1,154 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import desc
-from ..database import get_db
-from ..schemas.commentSchema import CommentCreate, CommentUpdate, CommentResponse
+from sqlalchemy import select, update
+from ..database import get_async_db
+from ..replicas import get_read_db
+from ..auth import get_current_student_id
+from ..pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..voting import apply_comment_vote, VOTE_VALUES
+from typing import Optional
+from ..schemas.commentSchema import CommentCreate, CommentUpdate, CommentResponse, CommentPage
 from ..models.commentModel import CommentModel
-from ..models.studentCommentVoteModel import StudentCommentVoteModel
-from ..schemas.studentCommentVoteSchema import StudentCommentVoteBase, StudentCommentVoteResponse
+from ..models.postModel import PostModel
+from ..schemas.studentCommentVoteSchema import StudentCommentVoteCreate, StudentCommentVoteResponse
 from ..models.reportModel import ReportModel
-from ..schemas.reportSchema import ReportBase, ReportResponse
+from ..schemas.reportSchema import ReportCreate, ReportResponse
 from ..exceptions import CommentNotFound
+from ..serialization import fast_json
+from ..etags import check_collection_etag
+from ..metrics import WRITES
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/comments", tags=["comments"])
 
 
-@router.get("/", response_model=list[CommentResponse])
-def get_comments(db: Session = Depends(get_db),
-                 student_id: int = Query(
+def comment_load_options():
+    # CommentResponse nests the author and the post (with its author and group)
+    return (
+        joinedload(CommentModel.students),
+        joinedload(CommentModel.posts).joinedload(PostModel.students),
+        joinedload(CommentModel.posts).joinedload(PostModel.groups),
+    )
+
+
+async def get_comment_or_none(db: AsyncSession, comment_id: int):
+    return await db.scalar(
+        select(CommentModel)
+        .options(*comment_load_options())
+        .where(CommentModel.comment_id == comment_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def add_to_comment_count(db: AsyncSession, post_id: int, delta: int) -> None:
+    """
+    One in-database increment, safe against concurrent comments. Adding
+    doubles as the check that the post exists: when no row matched, the
+    transaction is rolled back and the request ends with 404, so no
+    comment is written for a missing post.
+    """
+    result = await db.execute(
+        update(PostModel)
+        .where(PostModel.post_id == post_id)
+        .values(comment_count=PostModel.comment_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    if delta > 0 and not result.rowcount:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Post with id {post_id} not found")
+
+
+@router.get("/", response_model=CommentPage)
+async def get_comments(request: Request, response: Response,
+                       db: AsyncSession = Depends(get_read_db),
+                       student_id: int = Query(
         None, description="ID of the student to fetch comments for"),
         post_id: int = Query(
         None, description="ID of the post to fetch comments for"),
-        sort_by_votes: bool = Query(False, description="Sort comments by votes in descending order")):
-    if student_id and post_id:
-        query = db.query(CommentModel).filter(
-            CommentModel.student_id == student_id and CommentModel.post_id == post_id
-        )
-
-    elif student_id:
-        query = db.query(CommentModel).filter(
-            CommentModel.student_id == student_id and CommentModel.post_id == post_id
-        )
-    elif post_id:
-        query = db.query(CommentModel).filter(
-            CommentModel.student_id == student_id and CommentModel.post_id == post_id
-        )
-    else:
-        query = db.query(CommentModel).options(joinedload(
-            CommentModel.students), joinedload(CommentModel.posts))
-
-    if sort_by_votes:
-        query = query.order_by(desc(CommentModel.vote_count))
-    all_comments = query.all()
-    if not all_comments:
+        sort_by_votes: bool = Query(False, description="Sort comments by votes in descending order"),
+        cursor: Optional[str] = Query(
+        None, description="next_cursor returned by the previous page"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+                           description="Maximum number of comments to return")):
+    # pollers of a post's comments revalidate against
+    # idx_comments_post_updated instead of running the page query
+    if post_id:
+        await check_collection_etag(request, response, db, CommentModel,
+                                    CommentModel.post_id == post_id)
+
+    query = select(CommentModel).options(*comment_load_options())
+    if student_id:
+        query = query.where(CommentModel.student_id == student_id)
+    if post_id:
+        query = query.where(CommentModel.post_id == post_id)
+
+    sort_column = CommentModel.vote_count if sort_by_votes else CommentModel.created_at
+    all_comments, next_cursor = await paginate(
+        db, query, sort_column, CommentModel.comment_id, cursor, limit)
+    if not all_comments and not cursor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="No comments found")
-    return all_comments
+    return fast_json(CommentPage, {"items": all_comments, "next_cursor": next_cursor},
+                     headers=response.headers)
 
 
 @router.post("/", response_model=CommentResponse)
-def create_comment(comment: CommentUpdate, db: Session = Depends(get_db)):
+async def create_comment(comment: CommentCreate, db: AsyncSession = Depends(get_async_db),
+                         student_id: int = Depends(get_current_student_id)):
     new_comment = CommentModel(
-        student_id=comment.student_id,
+        student_id=student_id,
         post_id=comment.post_id,
         parent_comment_id=comment.parent_comment_id,
         content=comment.content
     )
 
+    await add_to_comment_count(db, comment.post_id, 1)
     try:
         db.add(new_comment)
-        db.commit()
-        db.refresh(new_comment)
-        return new_comment
-    except Exception as e:
-        db.rollback()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        logger.exception("Error creating comment on post %s", comment.post_id)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Error creating comment: {str(e)}")
+                            detail="Error creating comment")
+
+    WRITES.labels("comment").inc()
+    return await get_comment_or_none(db, new_comment.comment_id)
 
 
 @router.patch("/{comment_id}", response_model=CommentResponse)
-def update_comment(comment_id: int, comment: CommentUpdate, db: Session = Depends(get_db)):
-    existing_comment = db.query(CommentModel).filter(
-        CommentModel.comment_id == comment_id
-    ).first()
+async def update_comment(comment_id: int, comment: CommentUpdate, db: AsyncSession = Depends(get_async_db),
+                         student_id: int = Depends(get_current_student_id)):
+    existing_comment = await db.get(CommentModel, comment_id)
 
     if not existing_comment:
         raise CommentNotFound()
+    if existing_comment.student_id != student_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN,
+                            detail="Only the author can edit the comment")
 
     update_comment = comment.model_dump(exclude_unset=True)
 
+    # moving a comment moves it between the two posts' counts
+    new_post_id = update_comment.get("post_id")
+    if new_post_id is not None and new_post_id != existing_comment.post_id:
+        await add_to_comment_count(db, new_post_id, 1)
+        await add_to_comment_count(db, existing_comment.post_id, -1)
+
     for key, value in update_comment.items():
         setattr(existing_comment, key, value)
 
     try:
-        db.commit()
-        db.refresh(existing_comment)
-        return existing_comment
+        await db.commit()
+        return await get_comment_or_none(db, comment_id)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Update failed. Possibly duplicate comment."
@@ -93,100 +156,74 @@ def update_comment(comment_id: int, comment: CommentUpdate, db: Session = Depend
 
 
 @router.delete("/{comment_id}")
-def delete_comment(comment_id: int, db: Session = Depends(get_db)):
-    existing_comment = db.query(CommentModel).filter(
-        CommentModel.comment_id == comment_id
-    ).first()
+async def delete_comment(comment_id: int, db: AsyncSession = Depends(get_async_db),
+                         student_id: int = Depends(get_current_student_id)):
+    existing_comment = await db.get(CommentModel, comment_id)
 
     if not existing_comment:
         raise CommentNotFound()
+    if existing_comment.student_id != student_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN,
+                            detail="Only the author can delete the comment")
+    await add_to_comment_count(db, existing_comment.post_id, -1)
     try:
-        db.delete(existing_comment)
-        db.commit()
-    except Exception as e:
-        db.rollback()
+        await db.delete(existing_comment)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        logger.exception("Error deleting comment %s", comment_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error deleting comment: {str(e)}"
+            detail="Error deleting comment"
         )
 
 # vote for a comment
 
 
 @router.post("/{comment_id}/votes", response_model=StudentCommentVoteResponse)
-def add_vote_to_comment(comment_id: int, comment_vote: StudentCommentVoteBase, db: Session = Depends(get_db)):
-    # student_id is later from session
-
-    comment_exists = db.query(CommentModel).filter(
-        CommentModel.comment_id == comment_id
-    ).first()
-
-    if not comment_exists:
-        raise HTTPException(status.HTTP_404_NOT_FOUND,
-                            message=" Comment not found")
-
-    vote_exists = db.query(StudentCommentVoteModel).filter_by(
-        student_id=comment_vote. student_id, comment_id=comment_id
-    ).first()
-
-    # increment vote_count in comments table
-    if comment_vote.vote_value not in (1, -1):
+async def add_vote_to_comment(comment_id: int, comment_vote: StudentCommentVoteCreate, db: AsyncSession = Depends(get_async_db),
+                              student_id: int = Depends(get_current_student_id)):
+    if comment_vote.vote_value not in VOTE_VALUES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vote value. Must be 1 or -1."
+            detail="Invalid vote value. Must be 1, -1 or 0."
         )
-    else:
-        if comment_exists.vote_count:
-            comment_exists.vote_count += comment_vote.vote_value
-        else:
-            comment_exists.vote_count = comment_vote.vote_value
 
     try:
-        if not vote_exists:
-            # create a row in the student_comment_votes table
-            new_student_comment_vote = StudentCommentVoteModel(
-                student_id=comment_vote.student_id,
-                comment_id=comment_vote.comment_id,
-                vote_value=comment_vote.vote_value
-            )
-            db.add(new_student_comment_vote)
-            db.commit()
-            db.refresh(new_student_comment_vote)
-            return new_student_comment_vote
-        else:
-            vote_exists.vote_value = comment_vote.vote_value
-            db.commit()
-            db.refresh(vote_exists)
-            return vote_exists
+        vote = await apply_comment_vote(
+            db, comment_id, student_id, comment_vote.vote_value)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error creating vote for comment {comment_id}: {str(e)}")
 
+    if not vote:
+        raise CommentNotFound()
+    WRITES.labels("comment_vote").inc()
+    return vote
+
 
 @router.post("/{comment_id}/report", response_model=ReportResponse)
-def report_comment(comment_id: int, report: ReportBase, db: Session = Depends(get_db)):
-    comment_exists = db.query(CommentModel).filter(
-        CommentModel.comment_id == comment_id
-    ).first()
+async def report_comment(comment_id: int, report: ReportCreate, db: AsyncSession = Depends(get_async_db),
+                         student_id: int = Depends(get_current_student_id)):
+    comment_exists = await db.get(CommentModel, comment_id)
 
     if not comment_exists:
-        raise HTTPException(status.HTTP_404_NOT_FOUND,
-                            message="comment not found")
+        raise CommentNotFound()
 
     new_comment_report = ReportModel(
-        student_id=report.student_id,
-        comment_id=report.comment_id,
+        student_id=student_id,
+        comment_id=comment_id,
         entity_type="comment",
         reason=report.reason
     )
 
     try:
         db.add(new_comment_report)
-        db.commit()
-        db.refresh(new_comment_report)
+        await db.commit()
+        await db.refresh(new_comment_report)
         return new_comment_report
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error creating report for comment {comment_id}: {str(e)}")
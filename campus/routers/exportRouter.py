@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from ..auth import get_current_moderator_id
+from ..export import ExportEntity, export_query, stream_ndjson
+from ..replicas import read_sessionmaker
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+@router.get("/{entity}", response_class=StreamingResponse)
+async def export_entity(entity: ExportEntity, request: Request,
+                        since: datetime = Query(
+                            None, description="Only rows created at or after this time"),
+                        until: datetime = Query(
+                            None, description="Only rows created before this time"),
+                        group_id: int = Query(
+                            None, description="Only rows belonging to this group"),
+                        moderator_id: int = Depends(get_current_moderator_id)):
+    """
+    Stream every row of a table as newline-delimited JSON, in primary key
+    order. Whole tables include other students' data, so only moderators
+    may export them.
+    """
+    if since and until and since >= until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="since must be before until")
+
+    stmt = export_query(entity, since, until, group_id)
+    return StreamingResponse(
+        stream_ndjson(stmt, read_sessionmaker(request)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{entity.value}.ndjson"'},
+    )
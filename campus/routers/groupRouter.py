@@ -1,35 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_async_db, AsyncSessionLocal
+from ..replicas import get_read_db
 from ..models.groupModel import GroupModel
-from ..schemas.groupSchema import GroupCreate, GroupUpdate, GroupResponse
+from ..schemas.groupSchema import GroupCreate, GroupUpdate, GroupResponse, GroupPage
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..search import search
+from ..cache import cache
+from ..etags import check_etag, make_etag
+from ..config import GROUP_CACHE_TTL
+from ..trending import trending
+from ..exceptions import RankingUnavailableException
 
 router = APIRouter(prefix="/api/groups", tags=["groups"])
 
+GROUP_LIST_KEY = "groups:list"
+
+
+def group_key(group_id: int) -> str:
+    return f"groups:{group_id}"
+
+
+def group_to_dict(group: GroupModel) -> dict:
+    return GroupResponse.model_validate(group).model_dump(mode="json")
+
+
+async def invalidate_groups(group_id: int) -> None:
+    await cache.invalidate(GROUP_LIST_KEY, group_key(group_id))
+
 
 @router.get("/", response_model=List[GroupResponse], status_code=status.HTTP_200_OK)
-def get_groups(db: Session = Depends(get_db)):
+async def get_groups(request: Request, response: Response):
     """
-    Retrieve all groups from the database
+    Retrieve all groups, served from the group cache when possible.
+    The ETag is a hash of the cached list, so revalidating costs no query.
+
+    Misses are filled from the primary: a lagging replica could otherwise
+    put the list from before an invalidation back for a whole TTL.
     """
-    groups = db.query(GroupModel).all()
-    if not groups:
+    async def load_groups():
+        async with AsyncSessionLocal() as db:
+            groups = [group_to_dict(group)
+                      for group in (await db.scalars(select(GroupModel))).all()]
+        return {"version": make_etag(groups), "items": groups}
+
+    groups = await cache.get_or_load(GROUP_LIST_KEY, load_groups, GROUP_CACHE_TTL)
+    if not groups["items"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="No groups found")
-    return groups
+    check_etag(request, response, groups["version"])
+    return groups["items"]
 
 
 @router.post("/", response_model=GroupResponse, status_code=status.HTTP_201_CREATED)
-def create_group(group: GroupCreate, db: Session = Depends(get_db)):
+async def create_group(group: GroupCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new group in the database
     """
     # Check if a group with the same name already exists
-    existing_group = db.query(GroupModel).filter(
-        GroupModel.name == group.name).first()
+    existing_group = await db.scalar(select(GroupModel).where(
+        GroupModel.name == group.name))
     if existing_group:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="A group with this name already exists")
@@ -43,37 +76,38 @@ def create_group(group: GroupCreate, db: Session = Depends(get_db)):
 
     try:
         db.add(new_group)
-        db.commit()
-        db.refresh(new_group)
-        return new_group
+        await db.commit()
+        await db.refresh(new_group)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error creating group: {str(e)}")
 
+    await invalidate_groups(new_group.group_id)
+    return new_group
+
 
 @router.patch("/{group_id}", response_model=GroupResponse)
-def update_group(
+async def update_group(
     group_id: int,
     group: GroupUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update an existing group in the database
     """
     # Find the existing group
-    existing_group = db.query(GroupModel).filter(
-        GroupModel.group_id == group_id).first()
+    existing_group = await db.get(GroupModel, group_id)
     if not existing_group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Group with id {group_id} not found")
 
     # Check if name is being updated and is unique
     if group.name is not None:
-        name_conflict = db.query(GroupModel).filter(
+        name_conflict = await db.scalar(select(GroupModel).where(
             GroupModel.name == group.name,
             GroupModel.group_id != group_id
-        ).first()
+        ))
         if name_conflict:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                 detail="A group with this name already exists")
@@ -87,53 +121,86 @@ def update_group(
         existing_group.is_default = group.is_default
 
     try:
-        db.commit()
-        db.refresh(existing_group)
-        return existing_group
+        await db.commit()
+        await db.refresh(existing_group)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error updating group: {str(e)}")
 
+    await invalidate_groups(group_id)
+    return existing_group
+
 
 @router.delete("/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_group(group_id: int, db: Session = Depends(get_db)):
+async def delete_group(group_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Delete a group from the database
     """
     # Find the existing group
-    group = db.query(GroupModel).filter(
-        GroupModel.group_id == group_id).first()
+    group = await db.get(GroupModel, group_id)
     if not group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Group with id {group_id} not found")
 
     try:
-        db.delete(group)
-        db.commit()
+        await db.delete(group)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error deleting group: {str(e)}")
 
+    await invalidate_groups(group_id)
 
-@router.get("/search")
-def search_groups(
+
+@router.get("/search", response_model=GroupPage)
+async def search_groups(
     query: str = None,
-    db: Session = Depends(get_db),
-    limit: int = 20
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor returned by the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
 ):
     if not query:
         raise HTTPException(status_code=400, detail="Search query is required")
 
-    search_groups = (
-        db.query(GroupModel)
-        .filter(
-            func.lower(GroupModel.name).contains(func.lower(query)) |
-            func.lower(GroupModel.description).contains(func.lower(query))
-        )
-        .limit(limit)
-        .all()
-    )
+    search_groups, next_cursor = await search(
+        db, GroupModel, "groups_fts", (GroupModel.name, GroupModel.description),
+        query, cursor=cursor, limit=limit)
+
+    return {"items": search_groups, "next_cursor": next_cursor}
 
-    return search_groups
+
+@router.get("/trending", response_model=List[GroupResponse])
+async def get_trending_groups(
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Groups with the most recent votes and posts, most active first
+    """
+    if not trending.ready:
+        raise RankingUnavailableException()
+    group_ids = trending.top_groups(limit)
+    groups = {group.group_id: group for group in (await db.scalars(
+        select(GroupModel).where(GroupModel.group_id.in_(group_ids)))).all()}
+    return [groups[group_id] for group_id in group_ids if group_id in groups]
+
+
+@router.get("/{group_id}", response_model=GroupResponse)
+async def get_group_by_id(group_id: int):
+    """
+    Retrieve a single group, served from the group cache when possible;
+    misses are filled from the primary, like the group list
+    """
+    async def load_group():
+        async with AsyncSessionLocal() as db:
+            group = await db.get(GroupModel, group_id)
+            return group_to_dict(group) if group else None
+
+    group = await cache.get_or_load(group_key(group_id), load_group, GROUP_CACHE_TTL)
+    if not group:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Group with id {group_id} not found")
+    return group
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, status
+
+from ..database import pool_status, engine, async_engine
+from ..vote_buffer import vote_buffer
+from ..passwords import password_hasher
+from ..cache import cache
+from ..replicas import replica_set
+from ..trending import trending
+
+router = APIRouter(prefix="/api/health", tags=["health"])
+
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+def get_pool_status():
+    """
+    Report the state of the database connection pools
+    """
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine),
+    }
+
+
+@router.get("/vote-buffer", status_code=status.HTTP_200_OK)
+def get_vote_buffer_status():
+    """
+    Report the write-behind vote buffer counters
+    """
+    return vote_buffer.stats()
+
+
+@router.get("/passwords", status_code=status.HTTP_200_OK)
+def get_password_pool_status():
+    """
+    Report the password hashing process pool queue
+    """
+    return password_hasher.stats()
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+def get_cache_status():
+    """
+    Report the read-through cache hit/miss counters
+    """
+    return cache.stats()
+
+
+@router.get("/replicas", status_code=status.HTTP_200_OK)
+def get_replica_status():
+    """
+    Report lag, health and load of the read replicas
+    """
+    return replica_set.stats()
+
+
+@router.get("/trending", status_code=status.HTTP_200_OK)
+def get_trending_status():
+    """
+    Report the size and freshness of the hot ranking
+    """
+    return trending.stats()
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+
+from ..images import image_store, MEDIA_TYPES
+
+router = APIRouter(prefix="/api/images", tags=["images"])
+
+# a name is the hash of the content, so a URL never changes meaning
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+@router.get("/{name}", response_class=FileResponse)
+async def get_image(name: str):
+    """
+    Serve an uploaded image. Range requests are supported, and servers
+    that offer the ASGI pathsend extension send the file with sendfile.
+    """
+    if not await image_store.exists(name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Image not found")
+    return FileResponse(
+        image_store.path(name),
+        media_type=MEDIA_TYPES[name.rsplit(".", 1)[1]],
+        headers={"Cache-Control": IMMUTABLE_CACHE},
+    )
@@ -1,63 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from ..schemas.postSchema import PostCreate, PostUpdate, PostResponse
-from ..schemas.studentPostVoteSchema import StudentPostVoteBase, StudentPostVoteResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from typing import Optional, Literal
+from ..schemas.postSchema import PostCreate, PostUpdate, PostResponse, PostPage
+from ..schemas.commentSchema import CommentTree
+from ..schemas.studentPostVoteSchema import StudentPostVoteCreate, StudentPostVoteResponse
 from ..models.postModel import PostModel
-from ..models.studentPostVoteModel import StudentPostVoteModel
+from ..models.commentModel import CommentModel
 from ..models.reportModel import ReportModel
-from ..schemas.reportSchema import ReportBase, ReportResponse
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc
+from ..schemas.reportSchema import ReportCreate, ReportResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
-from ..database import get_db
+from ..database import get_async_db, AsyncSessionLocal
+from ..replicas import get_read_db
+from ..auth import get_current_student_id
+from ..pagination import (paginate, encode_offset_cursor, decode_offset_cursor,
+                          DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+from ..voting import apply_post_vote, VOTE_VALUES
+from ..search import search
+from ..comment_tree import load_post_comments, build_comment_tree
+from ..exceptions import CommentNotFound, RankingUnavailableException
+from ..serialization import fast_json
+from ..etags import check_collection_etag
+from ..feed import bump_group_feed
+from ..trending import trending
+from ..config import FEED_CACHE_ENABLED
+from ..metrics import WRITES
+from ..images import image_store, image_url
 
 router = APIRouter(prefix="/api/posts", tags=["posts"])
 
+MAX_TREE_DEPTH = 20
 
-@router.get("/", response_model=list[PostResponse])
-def get_posts(db: Session = Depends(get_db),
-              student_id: int = Query(
-                  None, description="ID of the student to fetch posts for"),
-              group_id: int = Query(
-                  None, description="ID of the group to fetch posts for"),
-              sort_by_votes: bool = Query(False, description="Sort posts by votes in descending order")):
-    # all posts by a student in a particular group
-    if group_id and student_id:
-        query = db.query(PostModel).filter(
-            PostModel.group_id == group_id and
-            PostModel.student_id == student_id
-        )
-    # all posts in a group
-    elif group_id:
-        query = db.query(PostModel).filter(
-            PostModel.group_id == group_id
-        )
-    # posts by a student
-    elif student_id:
-        query = db.query(PostModel).filter(
-            PostModel.student_id == student_id
-        )
-    # al posts
-    else:
-        query = db.query(PostModel).options(
-            joinedload(PostModel.students),
-            joinedload(PostModel.groups)
-        )
 
-    if sort_by_votes:
-        query = query.order_by(desc(PostModel.vote_count))
+def post_load_options():
+    # PostResponse nests the author and the group; lazy loads are not
+    # available on an AsyncSession, so every post query loads them eagerly
+    return (
+        joinedload(PostModel.students),
+        joinedload(PostModel.groups),
+    )
+
 
-    all_posts = query.all()
+async def get_post_or_none(db: AsyncSession, post_id: int):
+    return await db.scalar(
+        select(PostModel)
+        .options(*post_load_options())
+        .where(PostModel.post_id == post_id)
+        .execution_options(populate_existing=True)
+    )
 
-    if not all_posts:
+
+async def get_hot_posts(db: AsyncSession, group_id: int, cursor: str, limit: int):
+    """One page of the precomputed hot ranking, campus wide or of a group."""
+    if not trending.ready:
+        raise RankingUnavailableException()
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    post_ids = trending.top_posts(group_id, offset, limit + 1)
+    next_cursor = None
+    if len(post_ids) > limit:
+        post_ids = post_ids[:limit]
+        next_cursor = encode_offset_cursor(offset + limit)
+
+    posts = {post.post_id: post for post in (await db.scalars(
+        select(PostModel)
+        .options(*post_load_options())
+        .where(PostModel.post_id.in_(post_ids))
+    )).unique().all()}
+    missing = [post_id for post_id in post_ids if post_id not in posts]
+    if missing:
+        # a lagging replica may just not have the post yet; only drop the
+        # ones the primary confirms were deleted since the last refresh
+        async with AsyncSessionLocal() as primary:
+            still_there = set((await primary.scalars(
+                select(PostModel.post_id).where(PostModel.post_id.in_(missing))
+            )).all())
+        for post_id in missing:
+            if post_id not in still_there:
+                trending.discard(post_id)
+    return [posts[post_id] for post_id in post_ids if post_id in posts], next_cursor
+
+
+@router.get("/", response_model=PostPage)
+async def get_posts(request: Request, response: Response,
+                    db: AsyncSession = Depends(get_read_db),
+                    student_id: int = Query(
+                        None, description="ID of the student to fetch posts for"),
+                    group_id: int = Query(
+                        None, description="ID of the group to fetch posts for"),
+                    sort_by_votes: bool = Query(False, description="Sort posts by votes in descending order"),
+                    sort: Optional[Literal["new", "votes", "hot"]] = Query(
+                        None, description="new (default), votes, or hot: recent votes weighted by freshness"),
+                    cursor: Optional[str] = Query(
+                        None, description="next_cursor returned by the previous page"),
+                    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+                                       description="Maximum number of posts to return")):
+    if sort == "hot":
+        if student_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="sort=hot cannot be combined with student_id")
+        all_posts, next_cursor = await get_hot_posts(db, group_id, cursor, limit)
+        if not all_posts and not cursor:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail="No posts found")
+        return fast_json(PostPage, {"items": all_posts, "next_cursor": next_cursor})
+
+    # pollers of a group's posts revalidate against idx_posts_group_updated
+    # instead of running the page query
+    if group_id:
+        await check_collection_etag(request, response, db, PostModel,
+                                    PostModel.group_id == group_id)
+
+    query = select(PostModel).options(*post_load_options())
+    # posts in a group
+    if group_id:
+        query = query.where(PostModel.group_id == group_id)
+    # posts by a student
+    if student_id:
+        query = query.where(PostModel.student_id == student_id)
+
+    # newest first, or most voted first
+    by_votes = sort == "votes" or (sort is None and sort_by_votes)
+    sort_column = PostModel.vote_count if by_votes else PostModel.created_at
+    all_posts, next_cursor = await paginate(
+        db, query, sort_column, PostModel.post_id, cursor, limit)
+
+    if not all_posts and not cursor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="No groups found")
-    return all_posts
+                            detail="No posts found")
+    return fast_json(PostPage, {"items": all_posts, "next_cursor": next_cursor},
+                     headers=response.headers)
 
 
 @router.post("/", response_model=PostResponse)
-def create_post(post: PostCreate, db: Session = Depends(get_db)):
+async def create_post(post: PostCreate, db: AsyncSession = Depends(get_async_db),
+                      student_id: int = Depends(get_current_student_id)):
     new_post = PostModel(
-        student_id=post.student_id,
+        student_id=student_id,
         group_id=post.group_id,
         description=post.description,
         details=post.details,
@@ -66,172 +145,213 @@ def create_post(post: PostCreate, db: Session = Depends(get_db)):
 
     try:
         db.add(new_post)
-        db.commit()
-        db.refresh(new_post)
-        return new_post
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Error creating group: {str(e)}")
+                            detail=f"Error creating post: {str(e)}")
+
+    WRITES.labels("post").inc()
+    if FEED_CACHE_ENABLED:
+        await bump_group_feed(new_post.group_id)
+    return await get_post_or_none(db, new_post.post_id)
 
 
 @router.patch("/{post_id}", response_model=PostResponse)
-def update_post(post_id: int, update_post: PostUpdate, db: Session = Depends(get_db)):
-    existing_post = db.query(PostModel).filter(
-        PostModel.post_id == post_id
-    ).first()
+async def update_post(post_id: int, update_post: PostUpdate, db: AsyncSession = Depends(get_async_db),
+                      student_id: int = Depends(get_current_student_id)):
+    existing_post = await db.get(PostModel, post_id)
 
     if not existing_post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Post with id {post_id} not found")
+    if existing_post.student_id != student_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN,
+                            detail="Only the author can edit the post")
 
     update_items = update_post.model_dump(exclude_unset=True)
     for key, value in update_items.items():
         setattr(existing_post, key, value)
 
     try:
-        db.commit()
-        db.refresh(existing_post)
-        return existing_post
+        await db.commit()
+        return await get_post_or_none(db, post_id)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Update failed. Possibly duplicate email."
         )
 
 
-@router.delete("/{post_id}", response_model=PostResponse)
-def delete_post(post_id: int, db: Session = Depends(get_db)):
-    delete_post = db.query(PostModel).filter(
-        PostModel.post_id == post_id
-    ).first()
+@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_post(post_id: int, db: AsyncSession = Depends(get_async_db),
+                      student_id: int = Depends(get_current_student_id)):
+    delete_post = await db.get(PostModel, post_id)
 
     if not delete_post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Post with id {post_id} not found")
+    if delete_post.student_id != student_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN,
+                            detail="Only the author can delete the post")
 
     try:
-        db.delete(delete_post)
-        db.commit()
+        await db.delete(delete_post)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error deleting post: {str(e)}")
 
 
-@router.get("/search")
-def search_posts(
+@router.get("/search", response_model=PostPage)
+async def search_posts(
     query: str = None,
-    db: Session = Depends(get_db),
-    limit: int = 20
+    db: AsyncSession = Depends(get_read_db),
+    group_id: int = Query(None, description="Only search the posts of this group"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor returned by the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
 ):
     if not query:
         raise HTTPException(status_code=400, detail="Search query is required")
 
-    search_posts = (
-        db.query(PostModel)
-        .filter(
-            func.lower(PostModel.details).contains(func.lower(query)) |
-            func.lower(PostModel.description).contains(func.lower(query))
-        )
-        .limit(limit)
-        .all()
-    )
+    filters = (PostModel.group_id == group_id,) if group_id else ()
+    search_posts, next_cursor = await search(
+        db, PostModel, "posts_fts", (PostModel.description, PostModel.details),
+        query, filters, post_load_options(), cursor, limit)
 
-    return search_posts
+    return {"items": search_posts, "next_cursor": next_cursor}
 
 
 @router.get("/{post_id}", response_model=PostResponse)
-def get_post_by_id(post_id: int, db: Session = Depends(get_db)):
-    post_by_id = db.quer(PostModel).filter(
-        PostModel.post_id == post_id
-    ).all()
+async def get_post_by_id(post_id: int, db: AsyncSession = Depends(get_read_db)):
+    post_by_id = await get_post_or_none(db, post_id)
 
     if not post_by_id:
         raise HTTPException(status.HTTP_404_NOT_FOUND,
-                            message=f"Post by post_id {post_id} not found")
+                            detail=f"Post by post_id {post_id} not found")
 
     return post_by_id
 
 
-@router.post("/{post_id}/votes", response_model=StudentPostVoteResponse)
-def add_vote_to_post(post_id: int, post_vote: StudentPostVoteBase, db: Session = Depends(get_db)):
-    # student_id is later from session
-
-    post_exists = db.query(PostModel).filter(
-        PostModel.post_id == post_id
-    ).first()
-
-    if not post_exists:
+@router.get("/{post_id}/comments/tree", response_model=CommentTree)
+async def get_comment_tree(post_id: int, request: Request, response: Response,
+                           db: AsyncSession = Depends(get_read_db),
+                           parent_comment_id: int = Query(
+                               None, description="Only load the replies below this comment"),
+                           cursor: Optional[str] = Query(
+                               None, description="replies_cursor or next_cursor to resume from"),
+                           max_depth: int = Query(3, ge=1, le=MAX_TREE_DEPTH,
+                                                  description="Number of reply levels to load"),
+                           replies_limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+                                                      description="Maximum replies shown per comment")):
+    await check_collection_etag(request, response, db, CommentModel,
+                                CommentModel.post_id == post_id)
+    rows = await load_post_comments(db, post_id)
+    if not rows and not await db.get(PostModel, post_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND,
-                            message=" Post not found")
+                            detail=f"Post by post_id {post_id} not found")
+    if parent_comment_id and not any(row["comment_id"] == parent_comment_id for row in rows):
+        raise CommentNotFound()
 
-    vote_exists = db.query(StudentPostVoteModel).filter_by(
-        student_id=post_vote.student_id, post_id=post_id
-    ).first()
+    items, next_cursor = build_comment_tree(
+        rows, parent_comment_id, cursor, max_depth, replies_limit)
+    return {"post_id": post_id, "items": items, "next_cursor": next_cursor}
 
-    # increment vote_count in comments table
-    if post_vote.vote_value not in (1, -1):
+
+@router.post("/{post_id}/votes", response_model=StudentPostVoteResponse)
+async def add_vote_to_post(post_id: int, post_vote: StudentPostVoteCreate, db: AsyncSession = Depends(get_async_db),
+                           student_id: int = Depends(get_current_student_id)):
+    if post_vote.vote_value not in VOTE_VALUES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vote value. Must be 1 or -1."
+            detail="Invalid vote value. Must be 1, -1 or 0."
         )
-    else:
-
-        if post_exists.vote_count:
-            post_exists.vote_count += post_vote.vote_value
-        else:
-            post_exists.vote_count = post_vote.vote_value
 
     try:
-        if not vote_exists:
-            # create a row in the student_comment_votes table
-            new_student_post_vote = StudentPostVoteModel(
-                student_id=post_vote.student_id,
-                post_id=post_vote.post_id,
-                vote_value=post_vote.vote_value
-            )
-            db.add(new_student_post_vote)
-            db.commit()
-            db.refresh(new_student_post_vote)
-            db.refresh(post_exists)
-            return new_student_post_vote
-        else:
-            vote_exists.vote_value = post_vote.vote_value
-            db.commit()
-            db.refresh(vote_exists)
-            return vote_exists
+        vote = await apply_post_vote(
+            db, post_id, student_id, post_vote.vote_value)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error creating vote for post {post_id}: {str(e)}")
 
+    if not vote:
+        raise HTTPException(status.HTTP_404_NOT_FOUND,
+                            detail="Post not found")
+    WRITES.labels("post_vote").inc()
+    return vote
+
+
+@router.post("/{post_id}/image", response_model=PostResponse)
+async def upload_post_image(post_id: int, request: Request, db: AsyncSession = Depends(get_async_db),
+                            student_id: int = Depends(get_current_student_id)):
+    """
+    Attach an image to a post. Send it as the multipart field "file"; the
+    post's image becomes the URL the image is served from.
+    """
+    author_id = await db.scalar(
+        select(PostModel.student_id).where(PostModel.post_id == post_id))
+    if author_id is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND,
+                            detail="Post not found")
+    if author_id != student_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN,
+                            detail="Only the author can change the post image")
+    # hand the connection back to the pool while the body streams in
+    await db.rollback()
+
+    name = await image_store.save_upload(request.headers, request.stream())
+    url = image_url(name)
+    result = await db.execute(
+        update(PostModel)
+        .where(PostModel.post_id == post_id)
+        .values(image=url)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        # the post was deleted while the image streamed in; images are
+        # shared, so the file only goes if no other post shows it
+        await db.rollback()
+        if await db.scalar(select(PostModel.post_id).where(PostModel.image == url).limit(1)) is None:
+            await image_store.remove(name)
+        raise HTTPException(status.HTTP_404_NOT_FOUND,
+                            detail="Post not found")
+    await db.commit()
+    WRITES.labels("post_image").inc()
+
+    post = await get_post_or_none(db, post_id)
+    if post is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND,
+                            detail="Post not found")
+    return post
+
 
 # report post
 @router.post("/{post_id}/report", response_model=ReportResponse)
-def report_post(post_id: int, report: ReportBase, db: Session = Depends(get_db)):
-    post_exists = db.query(PostModel).filter(
-        PostModel.post_id == post_id
-    ).first()
+async def report_post(post_id: int, report: ReportCreate, db: AsyncSession = Depends(get_async_db),
+                      student_id: int = Depends(get_current_student_id)):
+    post_exists = await db.get(PostModel, post_id)
 
     if not post_exists:
         raise HTTPException(status.HTTP_404_NOT_FOUND,
-                            message="Post not found")
+                            detail="Post not found")
 
     new_report_post = ReportModel(
-        student_id=report.student_id,
-        post_id=report.post_id,
+        student_id=student_id,
+        post_id=post_id,
         entity_type="post",
         reason=report.reason
     )
 
     try:
         db.add(new_report_post)
-        db.commit()
-        db.refresh(new_report_post)
+        await db.commit()
+        await db.refresh(new_report_post)
         return new_report_post
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error creating report for post {post_id}: {str(e)}")
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from ..database import get_async_db
+from ..replicas import get_read_db
+from ..auth import get_current_moderator_id
+from ..config import MAX_REPORT_BATCH
+from ..moderation import claim_reports, close_reports, report_counts, queue_query, utcnow
+from ..schemas.reportSchema import (ReportResponse, ReportClaim, ReportBatchUpdate,
+                                    ReportBatchResult, ReportCounts)
+
+# the queue is for moderators only; students file reports on the post and
+# comment routes
+router = APIRouter(prefix="/api/reports", tags=["reports"],
+                   dependencies=[Depends(get_current_moderator_id)])
+
+
+@router.get("/queue", response_model=List[ReportResponse], status_code=status.HTTP_200_OK)
+async def get_queue(limit: int = Query(20, ge=1, le=MAX_REPORT_BATCH),
+                    db: AsyncSession = Depends(get_read_db)):
+    """
+    Oldest pending reports nobody is working on, without claiming them
+    """
+    return (await db.scalars(queue_query(utcnow(), limit))).all()
+
+
+@router.post("/queue/claim", response_model=List[ReportResponse], status_code=status.HTTP_200_OK)
+async def claim_queue(claim: ReportClaim, db: AsyncSession = Depends(get_async_db),
+                      moderator_id: int = Depends(get_current_moderator_id)):
+    """
+    Claim a batch of pending reports for the authenticated moderator.
+    Concurrent claims never hand out the same report twice.
+    """
+    return await claim_reports(db, moderator_id, claim.limit)
+
+
+@router.post("/resolve", response_model=ReportBatchResult, status_code=status.HTTP_200_OK)
+async def resolve_reports(update: ReportBatchUpdate, db: AsyncSession = Depends(get_async_db),
+                          moderator_id: int = Depends(get_current_moderator_id)):
+    """
+    Resolve or dismiss many reports at once. Only reports claimed by the
+    authenticated moderator are closed; others, and reports that are no
+    longer pending, are left untouched
+    """
+    updated = await close_reports(db, moderator_id, update.report_ids, update.status)
+    return {"updated": updated}
+
+
+@router.get("/counts", response_model=ReportCounts, status_code=status.HTTP_200_OK)
+async def get_report_counts(limit: int = Query(20, ge=1, le=MAX_REPORT_BATCH),
+                            db: AsyncSession = Depends(get_read_db)):
+    """
+    Most reported posts and comments among the pending reports
+    """
+    return await report_counts(db, limit)
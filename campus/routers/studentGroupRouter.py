@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
-from ..database import get_db
-
-from ..schemas.studentGroupSchema import StudentGroupResponse, StudentGroupBase
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, get_async_db
+from ..memberships import add_memberships, remove_memberships
+from ..serialization import fast_json
+
+from ..schemas.studentGroupSchema import (
+    StudentGroupResponse, StudentGroupBase, BulkMembershipCreate, BulkMembershipRemove,
+    BulkMembershipCreateResult, BulkMembershipRemoveResult)
 from ..models.studentGroupModel import StudentGroupModel
 from ..models.studentModel import StudentModel
 from ..models.groupModel import GroupModel
@@ -15,14 +20,15 @@ def get_student_groups(student_id: int = Query(None, description="student_id to
     if student_id:
         existing_student_groups = db.query(StudentGroupModel).filter(
             StudentGroupModel.student_id == student_id
-        ).options(joinedload(GroupModel)).all()
+        ).options(joinedload(StudentGroupModel.students), joinedload(StudentGroupModel.groups)).all()
     else:
-        existing_student_groups = db.query(StudentGroupModel).all()
+        existing_student_groups = db.query(StudentGroupModel).options(
+            joinedload(StudentGroupModel.students), joinedload(StudentGroupModel.groups)).all()
     if not existing_student_groups:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="No student groups found")
 
-    return existing_student_groups
+    return fast_json(list[StudentGroupResponse], existing_student_groups)
 
 
 @router.post("/", response_model=StudentGroupResponse)
@@ -44,6 +50,25 @@ def create_student_group(student_group: StudentGroupBase, db: Session = Depends(
                             detail=f"Error creating student_group: {str(e)}")
 
 
+@router.post("/bulk", response_model=BulkMembershipCreateResult)
+async def bulk_add_students_to_groups(request: BulkMembershipCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Add many (student_id, group_id) memberships in one request; existing
+    memberships and unknown students or groups are skipped
+    """
+    pairs = [(pair.student_id, pair.group_id) for pair in request.memberships]
+    return await add_memberships(db, pairs, request.is_subscribed)
+
+
+@router.post("/bulk/remove", response_model=BulkMembershipRemoveResult)
+async def bulk_remove_students_from_groups(request: BulkMembershipRemove, db: AsyncSession = Depends(get_async_db)):
+    """
+    Remove many (student_id, group_id) memberships in one request
+    """
+    pairs = [(pair.student_id, pair.group_id) for pair in request.memberships]
+    return await remove_memberships(db, pairs)
+
+
 @router.patch("/{student_group_id}", response_model=StudentGroupResponse)
 def update_student_group(student_group_id: int, student_group: StudentGroupBase, db: Session = Depends(get_db)):
     existing_student_group = db.query(StudentGroupModel).filter(
@@ -1,92 +1,166 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from ..database import get_db
+from ..database import get_async_db
+from ..replicas import get_read_db
 from ..models.studentModel import StudentModel
-from ..schemas.studentSchema import StudentCreate, StudentUpdate,  StudentResponse
-from ..exceptions import StudentNotFoundException, InvalidCredentialsException
+from ..passwords import password_hasher
+from ..auth import issue_token, get_current_student_id
+from ..student_import import import_format, import_students
+from ..config import ACCESS_TOKEN_TTL, FEED_CACHE_ENABLED
+from ..serialization import fast_json, ORJSONResponse
+from ..feed import get_feed, get_cached_feed
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..schemas.postSchema import PostPage
+from .postRouter import post_load_options
+from ..schemas.studentSchema import StudentCreate, StudentUpdate,  StudentResponse, TokenResponse, StudentImportResult
+from ..exceptions import StudentNotFoundException, InvalidCredentialsException, UnsupportedImportFormatException
 
 router = APIRouter(prefix="/api/students", tags=["students"])
 
 
 @router.get("/", response_model=list[StudentResponse])
-def get_all_students(db: Session = Depends(get_db)):
-    students = db.query(StudentModel).all()
-    return students
+async def get_all_students(db: AsyncSession = Depends(get_read_db)):
+    students = await db.scalars(select(StudentModel))
+    return fast_json(list[StudentResponse], students.all())
 
 
 @router.post("/", response_model=StudentResponse, status_code=201)
-def create_student(student: StudentCreate, db: Session = Depends(get_db)):
+async def create_student(student: StudentCreate, db: AsyncSession = Depends(get_async_db)):
+    # hash before opening a transaction so no connection is held meanwhile
+    hashed_password = await password_hasher.hash(student.password)
     try:
         db_student = StudentModel(
             name=student.name,
-            email=student.email
+            email=student.email,
+            password=hashed_password
         )
-        db_student.set_password(student.password)
 
         db.add(db_student)
-        db.commit()
-        db.refresh(db_student)
+        await db.commit()
+        await db.refresh(db_student)
         return db_student
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="A student with this email already exists"
         )
 
 
-@router.post("/verify", response_model=StudentResponse)
-def verify_student(student: StudentCreate, db: Session = Depends(get_db)):
-    existing_student = (
-        db.query(StudentModel)
-        .filter(
+@router.post("/bulk", response_model=StudentImportResult)
+async def bulk_create_students(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Import students from a streamed CSV (header: name,email,password) or
+    NDJSON upload. Rows are validated, hashed and inserted in batches;
+    rows that fail are reported by line number and the rest still go in.
+    """
+    fmt = import_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise UnsupportedImportFormatException()
+    return await import_students(db, request.stream(), fmt)
+
+
+async def authenticate_student(db: AsyncSession, student: StudentCreate) -> StudentModel:
+    existing_student = await db.scalar(
+        select(StudentModel)
+        .where(
             (StudentModel.name == student.name) |
             (StudentModel.email == student.email)
         )
-        .first()
     )
 
     if not existing_student:
         raise StudentNotFoundException()
 
-    if not existing_student.check_password(student.password):
+    # release the connection while bcrypt runs
+    await db.commit()
+    if not await password_hasher.verify(student.password, existing_student.password):
         raise InvalidCredentialsException()
 
     return existing_student
 
 
+@router.post("/verify", response_model=StudentResponse)
+async def verify_student(student: StudentCreate, db: AsyncSession = Depends(get_async_db)):
+    return await authenticate_student(db, student)
+
+
+@router.post("/token", response_model=TokenResponse)
+async def create_token(student: StudentCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Verify the credentials once and issue a signed access token, to be sent
+    as "Authorization: Bearer <token>" on later requests
+    """
+    existing_student = await authenticate_student(db, student)
+    return {
+        "access_token": issue_token(existing_student.student_id),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL,
+        "student": existing_student,
+    }
+
+
+@router.get("/{student_id}/feed", response_model=PostPage)
+async def get_student_feed(student_id: int, db: AsyncSession = Depends(get_read_db),
+                           cursor: Optional[str] = Query(
+                               None, description="next_cursor returned by the previous page"),
+                           limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+                                              description="Maximum number of posts to return")):
+    """
+    Newest posts from every group the student is subscribed to
+    """
+    if FEED_CACHE_ENABLED:
+        page = await get_cached_feed(student_id, post_load_options(), cursor, limit)
+    else:
+        page = await get_feed(db, student_id, post_load_options(), cursor, limit)
+
+    if not page["items"] and not cursor and not await db.get(StudentModel, student_id):
+        raise StudentNotFoundException()
+
+    if FEED_CACHE_ENABLED:
+        return ORJSONResponse(page)
+    return fast_json(PostPage, page)
+
+
 @router.patch("/{student_id}", response_model=StudentResponse)
-def update_student(
+async def update_student(
     student_id: int,
     student_update: StudentUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    current_student_id: int = Depends(get_current_student_id)
 ):
-    # Find the existing student
-    db_student = db.query(StudentModel).filter(
-        StudentModel.student_id == student_id).first()
-
-    if not db_student:
-        raise StudentNotFoundException()
+    # students only change their own profile (and password)
+    if current_student_id != student_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN,
+                            detail="Students can only update their own profile")
 
     # Update fields only if they are provided
     update_data = student_update.model_dump(exclude_unset=True)
 
     # Handle password update separately
     if 'password' in update_data:
-        db_student.set_password(update_data.pop('password'))
+        update_data['password'] = await password_hasher.hash(update_data['password'])
+
+    # Find the existing student
+    db_student = await db.get(StudentModel, student_id)
+
+    if not db_student:
+        raise StudentNotFoundException()
 
     # Update other fields
     for key, value in update_data.items():
         setattr(db_student, key, value)
 
     try:
-        db.commit()
-        db.refresh(db_student)
+        await db.commit()
+        await db.refresh(db_student)
         return db_student
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Update failed. Possibly duplicate email."
@@ -94,24 +168,28 @@ def update_student(
 
 
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_student(
+async def delete_student(
     student_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    current_student_id: int = Depends(get_current_student_id)
 ):
+    if current_student_id != student_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN,
+                            detail="Students can only delete their own account")
+
     # Find the existing student
-    db_student = db.query(StudentModel).filter(
-        StudentModel.student_id == student_id).first()
+    db_student = await db.get(StudentModel, student_id)
 
     if not db_student:
         raise StudentNotFoundException()
 
     try:
-        db.delete(db_student)
-        db.commit()
+        await db.delete(db_student)
+        await db.commit()
         # Returns no content (204) on successful deletion
         return None
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting student: {str(e)}"
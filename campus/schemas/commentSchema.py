@@ -15,7 +15,8 @@ class CommentBase(BaseModel):
 
 
 class CommentCreate(CommentBase):
-    pass
+    student_id: Optional[int] = Field(
+        None, description="Ignored, the author is the authenticated student")
 
 
 class CommentUpdate(BaseModel):
@@ -34,3 +35,34 @@ class CommentResponse(CommentBase):
 
     class Config:
         orm_data = True
+
+
+class CommentPage(BaseModel):
+    items: list[CommentResponse]
+    next_cursor: Optional[str] = Field(
+        None, description="cursor of the next page, null on the last page")
+
+
+class CommentTreeNode(BaseModel):
+    comment_id: int
+    student_id: int
+    post_id: int
+    parent_comment_id: Optional[int] = None
+    content: str
+    vote_count: int
+    created_at: datetime
+    updated_at: datetime
+    reply_count: int = Field(..., description="number of direct replies")
+    replies: list["CommentTreeNode"] = Field(
+        default_factory=list, description="replies sorted by votes")
+    has_more_replies: bool = Field(
+        False, description="replies were cut off by the depth or replies limit")
+    replies_cursor: Optional[str] = Field(
+        None, description="cursor to load the remaining replies of this comment")
+
+
+class CommentTree(BaseModel):
+    post_id: int
+    items: list[CommentTreeNode]
+    next_cursor: Optional[str] = Field(
+        None, description="cursor of the next top-level comments")
@@ -26,3 +26,9 @@ class GroupResponse(Group):
 
     class Config:
         from_attributes = True  # Updated from orm_mode
+
+
+class GroupPage(BaseModel):
+    items: list[GroupResponse]
+    next_cursor: Optional[str] = Field(
+        None, description="cursor of the next page, null on the last page")
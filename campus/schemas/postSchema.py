@@ -17,7 +17,8 @@ class PostBase(BaseModel):
 
 
 class PostCreate(PostBase):
-    pass
+    student_id: Optional[int] = Field(
+        None, description="Ignored, the author is the authenticated student")
 
 
 class PostUpdate(BaseModel):
@@ -30,6 +31,7 @@ class PostUpdate(BaseModel):
 
 class PostResponse(PostBase):
     post_id: int
+    comment_count: int = Field(0, description="number of comments on the post")
     created_at: datetime
     updated_at: datetime
 
@@ -39,3 +41,9 @@ class PostResponse(PostBase):
 
     class Config:
         orm_mode = True
+
+
+class PostPage(BaseModel):
+    items: list[PostResponse]
+    next_cursor: Optional[str] = Field(
+        None, description="cursor of the next page, null on the last page")
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Literal
 from ..models.reportModel import ReportModel
+from ..config import MAX_REPORT_BATCH
 from datetime import datetime
 
 
@@ -19,10 +20,46 @@ class ReportBase(BaseModel):
         None, description="status of the report - pending, solved")
 
 
+class ReportCreate(ReportBase):
+    student_id: Optional[int] = Field(
+        None, description="Ignored, the reporter is the authenticated student")
+
+
 class ReportResponse(ReportBase):
     report_id: int
+    claimed_by: Optional[int] = None
+    claimed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         orm_mode = True
+
+
+class ReportClaim(BaseModel):
+    limit: int = Field(20, ge=1, le=MAX_REPORT_BATCH,
+                       description="number of reports to claim")
+
+
+class ReportBatchUpdate(BaseModel):
+    report_ids: list[int] = Field(..., min_length=1, max_length=MAX_REPORT_BATCH)
+    status: Literal["resolved", "dismissed"]
+
+
+class ReportBatchResult(BaseModel):
+    updated: int = Field(..., description="pending reports claimed by the caller that were closed")
+
+
+class ReportedPost(BaseModel):
+    post_id: int
+    report_count: int
+
+
+class ReportedComment(BaseModel):
+    comment_id: int
+    report_count: int
+
+
+class ReportCounts(BaseModel):
+    posts: list[ReportedPost]
+    comments: list[ReportedComment]
@@ -6,7 +6,14 @@ from datetime import datetime
 class StudentCommentVoteBase(BaseModel):
     student_id: int = Field(..., description="student_id for comment vote")
     comment_id: int = Field(..., description="comment_id for comment vote")
-    vote_value: int = Field(..., description="vote value for comment vote")
+    vote_value: int = Field(..., description="1 upvote, -1 downvote, 0 retracts the vote")
+
+
+class StudentCommentVoteCreate(StudentCommentVoteBase):
+    student_id: Optional[int] = Field(
+        None, description="Ignored, the voter is the authenticated student")
+    comment_id: Optional[int] = Field(
+        None, description="Ignored, the comment is taken from the path")
 
 
 class StudentCommentVoteResponse(StudentCommentVoteBase):
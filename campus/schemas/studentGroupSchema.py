@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Optional
 from ..schemas.studentSchema import StudentResponse
 from ..schemas.groupSchema import GroupResponse
+from ..config import BULK_MEMBERSHIP_MAX_PAIRS
 
 
 class StudentGroupBase(BaseModel):
@@ -24,3 +25,33 @@ class StudentGroupResponse(StudentGroupBase):
 
     class Config:
         orm_mode = True
+
+
+class MembershipPair(BaseModel):
+    student_id: int
+    group_id: int
+
+
+class BulkMembershipCreate(BaseModel):
+    memberships: list[MembershipPair] = Field(
+        ..., min_length=1, max_length=BULK_MEMBERSHIP_MAX_PAIRS)
+    is_subscribed: bool = True
+
+
+class BulkMembershipRemove(BaseModel):
+    memberships: list[MembershipPair] = Field(
+        ..., min_length=1, max_length=BULK_MEMBERSHIP_MAX_PAIRS)
+
+
+class BulkMembershipCreateResult(BaseModel):
+    added: int
+    already_members: int
+    missing_students: list[int] = Field(
+        ..., description="student ids that do not exist, their pairs were skipped")
+    missing_groups: list[int] = Field(
+        ..., description="group ids that do not exist, their pairs were skipped")
+
+
+class BulkMembershipRemoveResult(BaseModel):
+    removed: int
+    not_members: int
@@ -6,7 +6,14 @@ from datetime import datetime
 class StudentPostVoteBase(BaseModel):
     student_id: int = Field(..., description="student_id for post vote")
     post_id: int = Field(..., description="post_id for post vote")
-    vote_value: int = Field(..., description="vote value for post vote")
+    vote_value: int = Field(..., description="1 upvote, -1 downvote, 0 retracts the vote")
+
+
+class StudentPostVoteCreate(StudentPostVoteBase):
+    student_id: Optional[int] = Field(
+        None, description="Ignored, the voter is the authenticated student")
+    post_id: Optional[int] = Field(
+        None, description="Ignored, the post is taken from the path")
 
 
 class StudentPostVoteResponse(StudentPostVoteBase):
@@ -63,3 +63,27 @@ class StudentResponse(StudentBase):
 
     class Config:
         from_attributes = True  # Updated from orm_mode
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int = Field(..., description="seconds until the token expires")
+    student: StudentResponse
+
+
+class StudentImportError(BaseModel):
+    line: int = Field(..., description="line of the upload, the CSV header is line 1")
+    email: Optional[str] = None
+    detail: str
+
+
+class StudentImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: list[StudentImportError]
+    errors_truncated: bool = Field(
+        False, description="true when more rows failed than are listed")
+    stopped_at_line: Optional[int] = Field(
+        None, description="set when the import was cut short: this line and "
+                          "everything after it were not imported")
@@ -0,0 +1,122 @@
+from sqlalchemy import event, select, table, column, text, func, or_
+from sqlalchemy.dialects import mysql
+
+from .database import Base
+from .pagination import encode_offset_cursor, decode_offset_cursor
+
+# relevance-ranked results are paged by offset, so cap how deep they go
+MAX_SEARCH_DEPTH = 500
+
+# SQLite stand-in for the MySQL FULLTEXT indexes: external-content FTS5
+# tables kept in sync by triggers, as table -> (rowid column, indexed
+# columns). The update triggers only fire when the indexed columns change,
+# so vote_count updates do not reindex rows. The search migration builds
+# the same DDL from here.
+SQLITE_FTS = {
+    "posts": ("post_id", ("description", "details")),
+    "groups": ("group_id", ("name", "description")),
+}
+
+
+def sqlite_fts_ddl(table_name: str, key: str, columns) -> list[str]:
+    """The FTS5 table of one table, its sync triggers, and its initial build."""
+    fts = f"{table_name}_fts"
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    delete_old = (f"INSERT INTO {fts}({fts}, rowid, {cols}) "
+                  f"VALUES ('delete', old.{key}, {old_values}); ")
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{key}, {new_values}); "
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+        f"content='{table_name}', content_rowid='{key}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} "
+        f"BEGIN {insert_new}END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} "
+        f"BEGIN {delete_old}END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table_name} "
+        f"BEGIN {delete_old}{insert_new}END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+SQLITE_FTS_DDL = tuple(ddl for table_name, (key, columns) in SQLITE_FTS.items()
+                       for ddl in sqlite_fts_ddl(table_name, key, columns))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_sqlite_search_index(target, connection, **kw):
+    """Create the FTS5 tables whenever the schema is built with create_all."""
+    if connection.dialect.name == "sqlite":
+        for ddl in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(ddl)
+
+
+def fts5_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word is quoted so user input
+    cannot inject FTS syntax, and the last word matches as a prefix so
+    results keep up while the user is typing.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_query(dialect_name: str, model, fts_table: str, columns, query: str,
+                 filters=(), options=()):
+    """
+    Relevance-ordered full-text search statement for a dialect, or None
+    when the query has no searchable terms.
+
+    Uses MATCH ... AGAINST on the FULLTEXT index in MySQL and the FTS5
+    table on SQLite; other databases fall back to a LIKE scan.
+    """
+    id_column = model.__mapper__.primary_key[0]
+    stmt = select(model).options(*options).where(*filters)
+    if dialect_name == "mysql":
+        score = mysql.match(*columns, against=query).in_natural_language_mode()
+        stmt = stmt.where(score > 0).order_by(score.desc(), id_column.desc())
+    elif dialect_name == "sqlite":
+        match = fts5_query(query)
+        if not match:
+            return None
+        fts = table(fts_table, column("rowid"))
+        stmt = (
+            stmt.join(fts, fts.c.rowid == id_column)
+            .where(text(f"{fts_table} MATCH :fts_match").bindparams(fts_match=match))
+            # bm25 is lower for better matches
+            .order_by(text(f"bm25({fts_table})"), id_column.desc())
+        )
+    else:
+        stmt = stmt.where(or_(*(
+            func.lower(col).contains(func.lower(query)) for col in columns
+        ))).order_by(id_column.desc())
+    return stmt
+
+
+async def search(db, model, fts_table: str, columns, query: str,
+                 filters=(), options=(), cursor: str = None,
+                 limit: int = 20):
+    """
+    Relevance-ranked full-text search over the given columns of a model.
+    Returns the rows of the page and the cursor of the next one.
+    """
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    if offset >= MAX_SEARCH_DEPTH:
+        return [], None
+    limit = min(limit, MAX_SEARCH_DEPTH - offset)
+
+    stmt = search_query(db.get_bind().dialect.name, model, fts_table, columns,
+                        query, filters, options)
+    if stmt is None:
+        return [], None
+    rows = (await db.scalars(stmt.offset(offset).limit(limit + 1))).unique().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if offset + limit < MAX_SEARCH_DEPTH:
+            next_cursor = encode_offset_cursor(offset + limit)
+    return rows, next_cursor
@@ -0,0 +1,243 @@
+import codecs
+import csv
+import heapq
+import json
+
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import (BULK_IMPORT_BATCH_SIZE, BULK_IMPORT_MAX_ERRORS,
+                     BULK_IMPORT_MAX_LINE_LENGTH)
+from .exceptions import PasswordQueueFullException
+from .models.studentModel import StudentModel
+from .passwords import password_hasher
+from .memberships import enroll_in_default_groups
+from .schemas.studentSchema import StudentCreate
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson",
+                "application/jsonl", "application/x-jsonlines"}
+
+
+def import_format(content_type: str):
+    """Map a Content-Type header to "csv", "ndjson" or None."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CSV_TYPES:
+        return "csv"
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks, max_length: int = BULK_IMPORT_MAX_LINE_LENGTH):
+    """
+    Decode a byte stream into (line_number, line) without buffering it.
+
+    A line longer than max_length characters is dropped as it streams in
+    and yielded as (line_number, None), so one runaway line can not grow
+    the buffer without bound.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    overlong = False
+    line_number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            line = line.rstrip("\r")
+            if overlong or len(line) > max_length:
+                overlong = False
+                yield line_number, None
+            else:
+                yield line_number, line
+        if len(pending) > max_length:
+            overlong, pending = True, ""
+    pending = (pending + decoder.decode(b"", final=True)).rstrip("\r")
+    if overlong or len(pending) > max_length:
+        yield line_number + 1, None
+    elif pending:
+        yield line_number + 1, pending
+
+
+async def iter_records(chunks, fmt: str):
+    """
+    Yield (line_number, record, error) for every non-blank line.
+
+    CSV needs a header row with name, email and password columns; each
+    record has to fit on one line, which holds for these fields.
+    """
+    header = None
+    async for line_number, line in iter_lines(chunks):
+        if line is None:
+            yield line_number, None, \
+                f"Line is longer than {BULK_IMPORT_MAX_LINE_LENGTH} characters"
+            continue
+        if not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, record, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            continue
+        yield line_number, dict(zip(header, values)), None
+
+
+def validation_message(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    field = ".".join(str(part) for part in error["loc"])
+    return f"{field}: {error['msg']}" if field else error["msg"]
+
+
+class ImportReport:
+    """
+    Running totals of one import; keeps the max_errors failed rows with the
+    lowest line numbers, since batches report their rows out of order.
+    """
+
+    def __init__(self, max_errors: int = BULK_IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.created = 0
+        self.error_count = 0
+        self.stopped_at_line = None
+        # max-heap on line number, so the highest kept line is dropped first
+        self._errors = []
+
+    def fail(self, line: int, email, detail: str) -> None:
+        self.error_count += 1
+        entry = (-line, self.error_count, email, detail)
+        if len(self._errors) < self.max_errors:
+            heapq.heappush(self._errors, entry)
+        elif self.max_errors:
+            heapq.heappushpop(self._errors, entry)
+
+    def stop(self, line: int, detail: str) -> None:
+        """Record that the rows from this line on were not imported."""
+        self.stopped_at_line = line
+        self.fail(line, None, detail)
+
+    def result(self) -> dict:
+        errors = [{"line": -line, "email": email, "detail": detail}
+                  for line, _, email, detail in sorted(self._errors, reverse=True)]
+        return {
+            "created": self.created,
+            "failed": self.error_count,
+            "errors": errors,
+            "errors_truncated": self.error_count > len(errors),
+            "stopped_at_line": self.stopped_at_line,
+        }
+
+
+async def insert_batch(db: AsyncSession, batch: list, report: ImportReport) -> None:
+    """
+    Hash and insert one batch of (line, StudentCreate) rows.
+
+    Emails that already exist are reported up front; the rest go out as a
+    single multi-row INSERT, committed together with their enrollment in
+    the default groups. If a concurrent request wins a race for an email
+    the batch is retried row by row so only that row fails.
+    """
+    emails = [student.email for _, student in batch]
+    existing = set((await db.scalars(
+        select(StudentModel.email).where(StudentModel.email.in_(emails))
+    )).all())
+    # release the connection while the batch is hashed
+    await db.commit()
+
+    rows, seen = [], set()
+    for line, student in batch:
+        if student.email in existing or student.email in seen:
+            report.fail(line, student.email,
+                        "A student with this email already exists")
+            continue
+        seen.add(student.email)
+        rows.append((line, student))
+    if not rows:
+        return
+
+    hashed_passwords = await password_hasher.hash_many(
+        [student.password for _, student in rows])
+    values = [
+        {"name": student.name, "email": student.email, "password": hashed}
+        for (_, student), hashed in zip(rows, hashed_passwords)
+    ]
+
+    try:
+        await db.execute(insert(StudentModel), values)
+        await enroll_in_default_groups(db, [value["email"] for value in values])
+        await db.commit()
+        report.created += len(values)
+        return
+    except IntegrityError:
+        await db.rollback()
+
+    for (line, _), value in zip(rows, values):
+        try:
+            await db.execute(insert(StudentModel).values(**value))
+            await enroll_in_default_groups(db, [value["email"]])
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            report.fail(line, value["email"],
+                        "A student with this email already exists")
+            continue
+        report.created += 1
+
+
+async def import_students(db: AsyncSession, chunks, fmt: str,
+                          batch_size: int = BULK_IMPORT_BATCH_SIZE) -> dict:
+    """
+    Stream an upload into the students table batch by batch.
+
+    Only the current batch and the capped error list are held in memory,
+    whatever the size of the upload.
+
+    Batches commit as they go. If the password pool turns a batch away,
+    the import stops there and the report says from which line to resend.
+    """
+    report = ImportReport()
+    batch = []
+
+    async def flush() -> bool:
+        try:
+            await insert_batch(db, batch, report)
+        except PasswordQueueFullException:
+            await db.rollback()
+            report.stop(batch[0][0], "Password hashing is busy; this line and "
+                                     "the rest of the upload were not imported")
+            return False
+        batch.clear()
+        return True
+
+    async for line, record, error in iter_records(chunks, fmt):
+        if error:
+            report.fail(line, None, error)
+            continue
+        try:
+            student = StudentCreate(**{key: record.get(key)
+                                       for key in ("name", "email", "password")})
+        except ValidationError as exc:
+            email = record.get("email")
+            report.fail(line, email if isinstance(email, str) else None,
+                        validation_message(exc))
+            continue
+        batch.append((line, student))
+        if len(batch) >= batch_size and not await flush():
+            return report.result()
+    if batch:
+        await flush()
+    return report.result()
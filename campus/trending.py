@@ -0,0 +1,247 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, or_, cast, text, Integer
+
+from .config import (TRENDING_REFRESH_INTERVAL, TRENDING_WINDOW_DAYS,
+                     HOT_SCORE_DECAY, TRENDING_GROUP_HALF_LIFE,
+                     VOTE_BUFFER_FLUSH_INTERVAL)
+from .database import AsyncSessionLocal
+from .models.postModel import PostModel
+from .models.studentPostVoteModel import StudentPostVoteModel
+
+logger = logging.getLogger(__name__)
+
+HOT_EPOCH = datetime(2024, 1, 1)
+# a new post counts as this many votes towards its group's activity
+NEW_POST_WEIGHT = 3.0
+
+
+def hot_score(vote_count: int, created_at: datetime) -> float:
+    """
+    Reddit style hot score: the order of magnitude of the votes plus the
+    age, so every HOT_SCORE_DECAY seconds of freshness is worth ten times
+    the votes. The score never changes unless the votes do, which is what
+    lets the ranking be maintained incrementally.
+    """
+    order = math.log10(max(abs(vote_count), 1))
+    sign = (vote_count > 0) - (vote_count < 0)
+    return sign * order + (created_at - HOT_EPOCH).total_seconds() / HOT_SCORE_DECAY
+
+
+def minutes_before(dialect_name: str, column, now: datetime):
+    """Whole minutes from a timestamp column to now, rounded down."""
+    if dialect_name == "mysql":
+        return func.timestampdiff(text("MINUTE"), column, now)
+    return cast((func.julianday(now) - func.julianday(column)) * 1440, Integer)
+
+
+class Ranking:
+    """Post ids kept sorted by descending score; bisect keeps it O(log n) to find."""
+
+    def __init__(self):
+        self._keys = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key) -> None:
+        bisect.insort(self._keys, key)
+
+    def remove(self, key) -> None:
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+    def page(self, offset: int, limit: int) -> list:
+        return [-post_id for _, post_id in self._keys[offset:offset + limit]]
+
+
+class Trending:
+    """
+    In-process hot ranking of recent posts (campus wide and per group) and
+    decayed activity scores of groups.
+
+    A background task refreshes both every refresh_interval seconds from
+    the votes and posts written since the previous refresh, so a refresh
+    only touches what changed. Posts older than the window drop out; at
+    HOT_SCORE_DECAY's scale they could not outrank a fresh post anyway.
+    """
+
+    def __init__(self, session_factory, refresh_interval: float,
+                 window: timedelta, group_half_life: float):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.window = window
+        self.group_half_life = group_half_life
+        self.refreshes = 0
+        self.failed_refreshes = 0
+        self._watermark = None
+        self._posts = {}
+        self._expiry = []
+        self._all = Ranking()
+        self._groups = {}
+        self._group_scores = {}
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def ready(self) -> bool:
+        return self._watermark is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                self.failed_refreshes += 1
+                logger.exception("Trending refresh failed, will retry")
+            await asyncio.sleep(self.refresh_interval)
+
+    def top_posts(self, group_id: int = None, offset: int = 0,
+                  limit: int = 20) -> list:
+        """Post ids of one page of the hot ranking."""
+        ranking = self._all if group_id is None else self._groups.get(group_id)
+        if ranking is None:
+            return []
+        return ranking.page(offset, limit)
+
+    def top_groups(self, limit: int = 20) -> list:
+        """Group ids with the highest decayed activity."""
+        return heapq.nlargest(limit, self._group_scores,
+                              key=self._group_scores.__getitem__)
+
+    def set_post(self, post_id: int, group_id: int, score: float,
+                 created_at: datetime) -> None:
+        if post_id not in self._posts:
+            heapq.heappush(self._expiry, (created_at, post_id))
+        self.discard(post_id)
+        key = (-score, -post_id)
+        self._posts[post_id] = (key, group_id)
+        self._all.add(key)
+        self._groups.setdefault(group_id, Ranking()).add(key)
+
+    def discard(self, post_id: int) -> None:
+        entry = self._posts.pop(post_id, None)
+        if entry is None:
+            return
+        key, group_id = entry
+        self._all.remove(key)
+        ranking = self._groups[group_id]
+        ranking.remove(key)
+        if not ranking:
+            del self._groups[group_id]
+
+    def _decay(self, now: datetime, at: datetime) -> float:
+        return 0.5 ** ((now - at).total_seconds() / self.group_half_life)
+
+    async def refresh(self) -> None:
+        """
+        Fold the votes and posts since the last refresh into the rankings.
+
+        Writes land with second resolution timestamps, so each refresh
+        covers (watermark, db now - 1s]. Posts are re-scored from their
+        current vote_count, which is idempotent; their window reaches a
+        little further back so counts still sitting in the vote buffer get
+        picked up on the next pass.
+        """
+        async with self.session_factory() as db:
+            now = (await db.scalar(select(func.now())))
+            now = now.replace(microsecond=0) - timedelta(seconds=1)
+            cutoff = now - self.window
+            since = self._watermark or cutoff
+            rescore_since = since - timedelta(seconds=VOTE_BUFFER_FLUSH_INTERVAL + 1)
+
+            vote_window = (StudentPostVoteModel.updated_at > since,
+                           StudentPostVoteModel.updated_at <= now)
+            voted_posts = (
+                select(StudentPostVoteModel.post_id)
+                .where(StudentPostVoteModel.updated_at > rescore_since,
+                       StudentPostVoteModel.updated_at <= now)
+            )
+            posts = (await db.execute(
+                select(PostModel.post_id, PostModel.group_id,
+                       PostModel.vote_count, PostModel.created_at)
+                .where(PostModel.created_at > cutoff,
+                       PostModel.created_at <= now,
+                       or_(PostModel.created_at > rescore_since,
+                           PostModel.post_id.in_(voted_posts)))
+            )).all()
+            # the first refresh covers the whole window, so votes are
+            # counted per group and minute in the database, not loaded
+            recent_votes = (
+                select(PostModel.group_id,
+                       minutes_before(db.get_bind().dialect.name,
+                                      StudentPostVoteModel.updated_at, now)
+                       .label("minutes_ago"))
+                .join(PostModel, PostModel.post_id == StudentPostVoteModel.post_id)
+                .where(*vote_window)
+                .subquery()
+            )
+            votes = (await db.execute(
+                select(recent_votes.c.group_id, recent_votes.c.minutes_ago, func.count())
+                .group_by(recent_votes.c.group_id, recent_votes.c.minutes_ago)
+            )).all()
+
+        # no awaits from here on: readers never see a half applied refresh
+        for post_id, group_id, vote_count, created_at in posts:
+            self.set_post(post_id, group_id,
+                          hot_score(vote_count or 0, created_at), created_at)
+        while self._expiry and self._expiry[0][0] <= cutoff:
+            self.discard(heapq.heappop(self._expiry)[1])
+
+        if self._watermark is not None:
+            factor = self._decay(now, self._watermark)
+            self._group_scores = {group_id: score * factor
+                                  for group_id, score in self._group_scores.items()
+                                  if score * factor > 1e-3}
+        for group_id, minutes_ago, vote_count in votes:
+            # every vote of the minute decays from the middle of it
+            voted_at = now - timedelta(minutes=minutes_ago + 0.5)
+            self._group_scores[group_id] = (
+                self._group_scores.get(group_id, 0.0)
+                + vote_count * self._decay(now, voted_at))
+        for post_id, group_id, _, created_at in posts:
+            if created_at > since:
+                self._group_scores[group_id] = (
+                    self._group_scores.get(group_id, 0.0)
+                    + NEW_POST_WEIGHT * self._decay(now, created_at))
+
+        self._watermark = now
+        self.refreshes += 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "ranked_posts": len(self._posts),
+            "ranked_groups": len(self._group_scores),
+            "refreshes": self.refreshes,
+            "failed_refreshes": self.failed_refreshes,
+            "refresh_interval": self.refresh_interval,
+        }
+
+
+trending = Trending(AsyncSessionLocal, TRENDING_REFRESH_INTERVAL,
+                    timedelta(days=TRENDING_WINDOW_DAYS), TRENDING_GROUP_HALF_LIFE)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from sqlalchemy import update, bindparam
+
+from .config import VOTE_BUFFER_FLUSH_INTERVAL, VOTE_BUFFER_MAX_PENDING
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class VoteBuffer:
+    """
+    In-process write-behind buffer for posts/comments vote_count.
+
+    Deltas for the same row are merged in memory and written back with one
+    batched UPDATE per table every flush_interval seconds, or sooner once
+    max_pending rows are waiting. The individual vote rows are still
+    written by the request; only the counter update is deferred.
+    """
+
+    def __init__(self, session_factory, flush_interval: float,
+                 max_pending: int):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self._pending = defaultdict(lambda: defaultdict(int))
+        # rows in _pending, kept up to date so add() stays O(1)
+        self._pending_rows = 0
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def pending_count(self) -> int:
+        return self._pending_rows
+
+    def _merge(self, target_model, target_id: int, delta: int) -> None:
+        deltas = self._pending[target_model]
+        if target_id not in deltas:
+            self._pending_rows += 1
+        deltas[target_id] += delta
+
+    def add(self, target_model, target_id: int, delta: int) -> None:
+        if not delta:
+            return
+        self._merge(target_model, target_id, delta)
+        if self._pending_rows >= self.max_pending:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            # bind the loop primitives to the loop serving the app
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and drain whatever is still pending."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Vote buffer flush failed, will retry")
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            batches, self._pending = self._pending, defaultdict(
+                lambda: defaultdict(int))
+            self._pending_rows = 0
+            if not batches:
+                return
+            written = 0
+            try:
+                async with self.session_factory() as db:
+                    for target_model, deltas in batches.items():
+                        table = target_model.__table__
+                        key_column = target_model.__mapper__.primary_key[0]
+                        # sorted ids keep lock order stable between workers
+                        params = [{"b_id": target_id, "b_delta": delta}
+                                  for target_id, delta in sorted(deltas.items())
+                                  if delta]
+                        if not params:
+                            continue
+                        await db.execute(
+                            update(table)
+                            .where(table.c[key_column.name] == bindparam("b_id"))
+                            .values(vote_count=table.c.vote_count +
+                                    bindparam("b_delta")),
+                            params
+                        )
+                        written += len(params)
+                    await db.commit()
+                self.flushed_rows += written
+            except Exception:
+                # put the deltas back so the next flush retries them
+                self.failed_flushes += 1
+                for target_model, deltas in batches.items():
+                    for target_id, delta in deltas.items():
+                        self._merge(target_model, target_id, delta)
+                raise
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending_rows": self.pending_count(),
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "flush_interval": self.flush_interval,
+            "max_pending": self.max_pending,
+        }
+
+
+vote_buffer = VoteBuffer(AsyncSessionLocal, VOTE_BUFFER_FLUSH_INTERVAL,
+                         VOTE_BUFFER_MAX_PENDING)
@@ -0,0 +1,138 @@
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models.postModel import PostModel
+from .models.commentModel import CommentModel
+from .models.studentPostVoteModel import StudentPostVoteModel
+from .models.studentCommentVoteModel import StudentCommentVoteModel
+from .vote_buffer import vote_buffer
+
+# 1 for upvote, -1 for downvote, 0 retracts a previous vote
+VOTE_VALUES = (1, -1, 0)
+# times a buffered vote is retried after losing a race with the same
+# student's vote on the same target
+VOTE_WRITE_ATTEMPTS = 3
+
+
+def upsert_vote(dialect_name: str, vote_model, values: dict, conflict_columns):
+    """Single INSERT that overwrites vote_value when the vote already exists."""
+    if dialect_name == "mysql":
+        stmt = mysql.insert(vote_model).values(**values)
+        return stmt.on_duplicate_key_update(
+            vote_value=stmt.inserted.vote_value,
+            updated_at=func.now()
+        )
+    stmt = sqlite.insert(vote_model).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={"vote_value": stmt.excluded.vote_value,
+              "updated_at": func.now()}
+    )
+
+
+async def write_vote(db: AsyncSession, vote_model, vote_filter, values: dict) -> int:
+    """
+    Write a vote without a locking read, and return how much it moves
+    the target's count.
+
+    On InnoDB, SELECT ... FOR UPDATE of a vote that does not exist yet
+    takes a gap lock, and two first votes whose gap locks overlap deadlock
+    on their inserts. Instead the previous value is read plainly and the
+    write only goes through if it still holds: an UPDATE that must find
+    that value, or an INSERT the unique key turns away when another first
+    vote got in. A lost race rolls back, for a fresh snapshot, and retries.
+    """
+    vote_value = values["vote_value"]
+    for _ in range(VOTE_WRITE_ATTEMPTS):
+        previous_value = await db.scalar(select(vote_model.vote_value).where(*vote_filter))
+        if previous_value is None:
+            try:
+                await db.execute(insert(vote_model).values(**values))
+                return vote_value
+            except IntegrityError:
+                pass
+        else:
+            result = await db.execute(
+                update(vote_model)
+                .where(*vote_filter, vote_model.vote_value == previous_value)
+                .values(vote_value=vote_value, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                return vote_value - previous_value
+        await db.rollback()
+    raise RuntimeError("the vote kept changing concurrently, try again")
+
+
+async def apply_vote(db: AsyncSession, target_model, target_key: str,
+                     vote_model, target_id: int, student_id: int,
+                     vote_value: int):
+    """
+    Record a student's vote and move the target's vote_count by the delta.
+
+    The delta (new value minus the student's previous vote) is computed and
+    applied inside the database, so concurrent votes cannot lose updates
+    and changing or retracting a vote only moves the count by the
+    difference. With the vote buffer running, the delta is merged in memory
+    and written back by the buffer instead. Returns the vote row, or None if
+    the target does not exist.
+    """
+    target_column = getattr(target_model, target_key)
+    vote_target_column = getattr(vote_model, target_key)
+    vote_filter = (vote_model.student_id == student_id,
+                   vote_target_column == target_id)
+    values = {"student_id": student_id, target_key: target_id,
+              "vote_value": vote_value}
+
+    if vote_buffer.running:
+        # write-behind: no lock on the hot post/comment row, the delta is
+        # handed to the buffer once the vote row is committed
+        target_exists = await db.scalar(
+            select(target_column).where(target_column == target_id))
+        if target_exists is None:
+            return None
+        delta = await write_vote(db, vote_model, vote_filter, values)
+    else:
+        previous_value = (
+            select(vote_model.vote_value).where(*vote_filter).scalar_subquery()
+        )
+        # row-locks the target first, which also serialises competing votes
+        # from the same student before the upsert below
+        result = await db.execute(
+            update(target_model)
+            .where(target_column == target_id)
+            .values(vote_count=target_model.vote_count + vote_value -
+                    func.coalesce(previous_value, 0))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await db.rollback()
+            return None
+        await db.execute(upsert_vote(
+            db.get_bind().dialect.name, vote_model, values, ["student_id", target_key]))
+
+    vote = await db.scalar(
+        select(vote_model)
+        .where(*vote_filter)
+        .execution_options(populate_existing=True)
+    )
+    await db.commit()
+
+    if vote_buffer.running:
+        vote_buffer.add(target_model, target_id, delta)
+    return vote
+
+
+async def apply_post_vote(db: AsyncSession, post_id: int, student_id: int,
+                          vote_value: int):
+    return await apply_vote(db, PostModel, "post_id", StudentPostVoteModel,
+                            post_id, student_id, vote_value)
+
+
+async def apply_comment_vote(db: AsyncSession, comment_id: int,
+                             student_id: int, vote_value: int):
+    return await apply_vote(db, CommentModel, "comment_id",
+                            StudentCommentVoteModel, comment_id, student_id,
+                            vote_value)
@@ -1,4 +1,5 @@
 from logging.config import fileConfig
+from campus.config import DATABASE_URL
 from campus.database import Base
 from campus.models.studentModel import StudentModel
 from campus.models.commentModel import CommentModel
@@ -16,6 +17,10 @@ from alembic import context
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
+# use the same connection settings as the application, unless the caller
+# (e.g. the test suite) already pointed alembic at another database
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,46 @@
+"""indexes for the unfiltered post and comment listings
+
+Revision ID: 4f7a2c9e81b3
+Revises: d84f1b6e2a05
+Create Date: 2026-10-19 10:12:37.520914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7a2c9e81b3'
+down_revision: Union[str, None] = 'd84f1b6e2a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (table, columns); keyset pagination of GET /api/posts and
+# GET /api/comments without a group/post filter, newest or most voted first
+INDEXES = {
+    'idx_posts_created': ('posts', ['created_at', 'post_id']),
+    'idx_posts_votes': ('posts', ['vote_count', 'post_id']),
+    'idx_comments_created': ('comments', ['created_at', 'comment_id']),
+    'idx_comments_votes': ('comments', ['vote_count', 'comment_id']),
+}
+
+
+def upgrade() -> None:
+    for name, (table, columns) in INDEXES.items():
+        if op.get_context().dialect.name == 'mysql':
+            op.execute(
+                f"CREATE INDEX {name} ON {table} ({', '.join(columns)}) "
+                "ALGORITHM=INPLACE LOCK=NONE"
+            )
+        else:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, (table, _) in reversed(INDEXES.items()):
+        if op.get_context().dialect.name == 'mysql':
+            op.execute(f"DROP INDEX {name} ON {table} ALGORITHM=INPLACE LOCK=NONE")
+        else:
+            op.drop_index(name, table_name=table)
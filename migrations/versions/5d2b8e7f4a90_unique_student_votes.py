@@ -0,0 +1,57 @@
+"""unique student votes and recomputed vote counts
+
+Revision ID: 5d2b8e7f4a90
+Revises: c41f0a9e2d17
+Create Date: 2026-10-18 11:03:17.455120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b8e7f4a90'
+down_revision: Union[str, None] = 'c41f0a9e2d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep only the latest vote of each student on each post/comment; the
+    # derived table works around MySQL's "can't specify target table" rule
+    op.execute(
+        "DELETE FROM student_post_votes WHERE student_post_vote_id NOT IN ("
+        "SELECT keep_id FROM (SELECT MAX(student_post_vote_id) AS keep_id "
+        "FROM student_post_votes GROUP BY student_id, post_id) AS latest)"
+    )
+    op.execute(
+        "DELETE FROM student_comment_votes WHERE student_comment_vote_id NOT IN ("
+        "SELECT keep_id FROM (SELECT MAX(student_comment_vote_id) AS keep_id "
+        "FROM student_comment_votes GROUP BY student_id, comment_id) AS latest)"
+    )
+    # batch mode rebuilds the tables on SQLite, which cannot add constraints
+    with op.batch_alter_table('student_post_votes') as batch_op:
+        batch_op.create_unique_constraint('uq_student_post_vote',
+                                          ['student_id', 'post_id'])
+    with op.batch_alter_table('student_comment_votes') as batch_op:
+        batch_op.create_unique_constraint('uq_student_comment_vote',
+                                          ['student_id', 'comment_id'])
+
+    # counts drifted under the old read-modify-write code, rebuild them
+    op.execute(
+        "UPDATE posts SET vote_count = COALESCE((SELECT SUM(v.vote_value) "
+        "FROM student_post_votes v WHERE v.post_id = posts.post_id), 0)"
+    )
+    op.execute(
+        "UPDATE comments SET vote_count = COALESCE((SELECT SUM(v.vote_value) "
+        "FROM student_comment_votes v WHERE v.comment_id = comments.comment_id), 0)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('student_comment_votes') as batch_op:
+        batch_op.drop_constraint('uq_student_comment_vote', type_='unique')
+    with op.batch_alter_table('student_post_votes') as batch_op:
+        batch_op.drop_constraint('uq_student_post_vote', type_='unique')
@@ -0,0 +1,48 @@
+"""full-text search indexes for posts and groups
+
+Revision ID: 9a6c3f15be42
+Revises: 5d2b8e7f4a90
+Create Date: 2026-10-18 11:41:52.093764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from campus.search import SQLITE_FTS, SQLITE_FTS_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a6c3f15be42'
+down_revision: Union[str, None] = '5d2b8e7f4a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the SQLite FTS5 tables and their triggers are built by the same DDL that
+# create_all runs, see campus.search
+
+
+def upgrade() -> None:
+    dialect_name = op.get_context().dialect.name
+    if dialect_name == 'mysql':
+        op.create_index('ft_posts_text', 'posts', ['description', 'details'],
+                        mysql_prefix='FULLTEXT')
+        op.create_index('ft_groups_text', 'groups', ['name', 'description'],
+                        mysql_prefix='FULLTEXT')
+    elif dialect_name == 'sqlite':
+        for ddl in SQLITE_FTS_DDL:
+            op.execute(ddl)
+
+
+def downgrade() -> None:
+    dialect_name = op.get_context().dialect.name
+    if dialect_name == 'mysql':
+        op.drop_index('ft_groups_text', table_name='groups')
+        op.drop_index('ft_posts_text', table_name='posts')
+    elif dialect_name == 'sqlite':
+        for table_name in SQLITE_FTS:
+            fts = f"{table_name}_fts"
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
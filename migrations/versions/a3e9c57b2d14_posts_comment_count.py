@@ -0,0 +1,44 @@
+"""denormalized comment_count on posts
+
+Revision ID: a3e9c57b2d14
+Revises: f2c8a4d61e93
+Create Date: 2026-10-18 18:20:33.902417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e9c57b2d14'
+down_revision: Union[str, None] = 'f2c8a4d61e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# posts recounted per transaction during the backfill
+BACKFILL_CHUNK = 1000
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(),
+                                      nullable=False, server_default='0'))
+
+    bind = op.get_bind()
+    max_post_id = bind.execute(sa.text("SELECT MAX(post_id) FROM posts")).scalar() or 0
+    # commit every chunk so the backfill never holds locks on the whole
+    # table; comments created meanwhile are counted by the app already
+    with op.get_context().autocommit_block():
+        for start in range(1, max_post_id + 1, BACKFILL_CHUNK):
+            bind.execute(sa.text(
+                "UPDATE posts SET comment_count = (SELECT COUNT(*) FROM comments "
+                "WHERE comments.post_id = posts.post_id) "
+                "WHERE post_id BETWEEN :start AND :end"
+            ), {"start": start, "end": start + BACKFILL_CHUNK - 1})
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('comment_count')
@@ -0,0 +1,32 @@
+"""claim columns for the report moderation queue
+
+Revision ID: b6d2f08e3c71
+Revises: a3e9c57b2d14
+Create Date: 2026-10-18 18:47:12.640385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2f08e3c71'
+down_revision: Union[str, None] = 'a3e9c57b2d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.add_column(sa.Column('claimed_by', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+    # reports without a status predate the default
+    op.execute("UPDATE reports SET status = 'pending' WHERE status IS NULL")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('claimed_at')
+        batch_op.drop_column('claimed_by')
@@ -19,6 +19,11 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        # SQLite cannot drop a primary key column; rename it in a rebuilt table
+        with op.batch_alter_table('student_post_votes', recreate='always') as batch_op:
+            batch_op.alter_column('post_vote_id', new_column_name='student_post_vote_id')
+        return
     # ### commands auto generated by Alembic - please adjust! ###
     op.add_column('student_post_votes', sa.Column('student_post_vote_id', sa.Integer(), autoincrement=True, nullable=False))
     op.drop_column('student_post_votes', 'post_vote_id')
@@ -26,6 +31,10 @@ def upgrade() -> None:
 
 
 def downgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        with op.batch_alter_table('student_post_votes', recreate='always') as batch_op:
+            batch_op.alter_column('student_post_vote_id', new_column_name='post_vote_id')
+        return
     # ### commands auto generated by Alembic - please adjust! ###
     op.add_column('student_post_votes', sa.Column('post_vote_id', mysql.INTEGER(), autoincrement=True, nullable=False))
     op.drop_column('student_post_votes', 'student_post_vote_id')
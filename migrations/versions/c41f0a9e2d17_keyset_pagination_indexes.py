@@ -0,0 +1,53 @@
+"""keyset pagination indexes and non-null vote_count
+
+Revision ID: c41f0a9e2d17
+Revises: 8e8ec4ba040d
+Create Date: 2026-10-18 10:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f0a9e2d17'
+down_revision: Union[str, None] = '8e8ec4ba040d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keyset cursors compare on vote_count, so it can no longer be NULL
+    op.execute("UPDATE posts SET vote_count = 0 WHERE vote_count IS NULL")
+    op.execute("UPDATE comments SET vote_count = 0 WHERE vote_count IS NULL")
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.alter_column('vote_count', existing_type=sa.Integer(),
+                              nullable=False, server_default='0')
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.alter_column('vote_count', existing_type=sa.Integer(),
+                              nullable=False, server_default='0')
+
+    op.create_index('idx_posts_group_created', 'posts',
+                    ['group_id', 'created_at', 'post_id'], unique=False)
+    op.create_index('idx_posts_group_votes', 'posts',
+                    ['group_id', 'vote_count', 'post_id'], unique=False)
+    op.create_index('idx_comments_post_created', 'comments',
+                    ['post_id', 'created_at', 'comment_id'], unique=False)
+    op.create_index('idx_comments_post_votes', 'comments',
+                    ['post_id', 'vote_count', 'comment_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_comments_post_votes', table_name='comments')
+    op.drop_index('idx_comments_post_created', table_name='comments')
+    op.drop_index('idx_posts_group_votes', table_name='posts')
+    op.drop_index('idx_posts_group_created', table_name='posts')
+
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.alter_column('vote_count', existing_type=sa.Integer(),
+                              nullable=True, server_default=None)
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.alter_column('vote_count', existing_type=sa.Integer(),
+                              nullable=True, server_default=None)
@@ -0,0 +1,45 @@
+"""indexes behind the ETags of post and comment lists
+
+Revision ID: d84f1b6e2a05
+Revises: b6d2f08e3c71
+Create Date: 2026-10-18 19:32:44.108273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84f1b6e2a05'
+down_revision: Union[str, None] = 'b6d2f08e3c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (table, columns); count and max(updated_at) of a group's posts or
+# a post's comments come from the index alone (InnoDB secondary indexes
+# carry the primary key, which covers max(id) as well)
+INDEXES = {
+    'idx_posts_group_updated': ('posts', ['group_id', 'updated_at']),
+    'idx_comments_post_updated': ('comments', ['post_id', 'updated_at']),
+}
+
+
+def upgrade() -> None:
+    for name, (table, columns) in INDEXES.items():
+        if op.get_context().dialect.name == 'mysql':
+            op.execute(
+                f"CREATE INDEX {name} ON {table} ({', '.join(columns)}) "
+                "ALGORITHM=INPLACE LOCK=NONE"
+            )
+        else:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, (table, _) in reversed(INDEXES.items()):
+        if op.get_context().dialect.name == 'mysql':
+            op.execute(f"DROP INDEX {name} ON {table} ALGORITHM=INPLACE LOCK=NONE")
+        else:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,36 @@
+"""unique student group membership
+
+Revision ID: e7b3d91c6a58
+Revises: 9a6c3f15be42
+Create Date: 2026-10-18 17:12:40.318562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d91c6a58'
+down_revision: Union[str, None] = '9a6c3f15be42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep the oldest row of each duplicated membership
+    op.execute(
+        "DELETE FROM student_groups WHERE student_group_id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(student_group_id) AS keep_id "
+        "FROM student_groups GROUP BY student_id, group_id) AS first_rows)"
+    )
+    # batch mode rebuilds the table on SQLite, which cannot add constraints
+    with op.batch_alter_table('student_groups') as batch_op:
+        batch_op.create_unique_constraint('uq_student_group',
+                                          ['student_id', 'group_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('student_groups') as batch_op:
+        batch_op.drop_constraint('uq_student_group', type_='unique')
@@ -0,0 +1,65 @@
+"""indexes for the hot query paths
+
+Revision ID: f2c8a4d61e93
+Revises: e7b3d91c6a58
+Create Date: 2026-10-18 17:41:06.527190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a4d61e93'
+down_revision: Union[str, None] = 'e7b3d91c6a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (table, columns)
+INDEXES = {
+    # author pages, newest first (replaces the single column idx_student_id)
+    'idx_posts_student_created': ('posts', ['student_id', 'created_at', 'post_id']),
+    'idx_comments_student_created': ('comments', ['student_id', 'created_at', 'comment_id']),
+    # vote totals and exports by target; the unique (student_id, target)
+    # constraints only serve lookups that start from the student
+    'idx_student_post_votes_post': ('student_post_votes', ['post_id', 'student_id']),
+    'idx_student_comment_votes_comment': ('student_comment_votes', ['comment_id', 'student_id']),
+    # members of a group; uq_student_group serves the student side
+    'idx_student_groups_group': ('student_groups', ['group_id', 'student_id']),
+    # moderation queue, oldest reports of a status first
+    'idx_reports_status_created': ('reports', ['status', 'created_at', 'report_id']),
+}
+
+
+def create_index(name: str, table: str, columns: list) -> None:
+    if op.get_context().dialect.name == 'mysql':
+        # build without blocking reads or writes on the table
+        op.execute(
+            f"CREATE INDEX {name} ON {table} ({', '.join(columns)}) "
+            "ALGORITHM=INPLACE LOCK=NONE"
+        )
+    else:
+        op.create_index(name, table, columns, unique=False)
+
+
+def drop_index(name: str, table: str) -> None:
+    if op.get_context().dialect.name == 'mysql':
+        op.execute(f"DROP INDEX {name} ON {table} ALGORITHM=INPLACE LOCK=NONE")
+    else:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    for name, (table, columns) in INDEXES.items():
+        create_index(name, table, columns)
+    # idx_posts_student_created leads with student_id, so it also backs
+    # the foreign key
+    drop_index('idx_student_id', 'posts')
+
+
+def downgrade() -> None:
+    create_index('idx_student_id', 'posts', ['student_id'])
+    for name, (table, _) in reversed(INDEXES.items()):
+        drop_index(name, table)
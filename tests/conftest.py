@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+# settings are read when campus is first imported, so point the app at a
+# throwaway SQLite database and image store before any test imports it
+_tmp = tempfile.mkdtemp(prefix="campus-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/campus.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+os.environ["IMAGE_STORE_DIR"] = os.path.join(_tmp, "images")
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_WORKERS"] = "1"
+os.environ["TRENDING_ENABLED"] = "false"
+# Bob (student 2 in the seed fixture) moderates
+os.environ["MODERATOR_IDS"] = "2"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from campus.main import app
+from campus.auth import issue_token
+from campus.replicas import get_read_db
+from campus.database import Base, engine, SessionLocal
+from campus.models.studentModel import StudentModel
+from campus.models.groupModel import GroupModel
+from campus.models.postModel import PostModel
+from campus.models.commentModel import CommentModel
+from campus.models.studentGroupModel import StudentGroupModel  # noqa: F401
+from campus.models.studentPostVoteModel import StudentPostVoteModel  # noqa: F401
+from campus.models.studentCommentVoteModel import StudentCommentVoteModel  # noqa: F401
+from campus.models.reportModel import ReportModel  # noqa: F401
+
+
+@pytest.fixture
+def db():
+    """A fresh schema per test, and a sync session to seed it."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def seed(db):
+    """Two students, a group and a few posts (ids 1..3) by student 1."""
+    db.add_all([
+        StudentModel(name="Alice", email="alice@example.com", password="x"),
+        StudentModel(name="Bob", email="bob@example.com", password="x"),
+        GroupModel(name="general", description="general chat"),
+    ])
+    db.commit()
+    db.add_all([PostModel(student_id=1, group_id=1, description=f"post {i}")
+                for i in range(1, 4)])
+    db.commit()
+    db.add(CommentModel(student_id=2, post_id=1, content="first"))
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def auth():
+    """Authorization headers for a student id."""
+    return lambda student_id: {"Authorization": f"Bearer {issue_token(student_id)}"}
+
+
+@pytest.fixture
+def lagging_replica(tmp_path):
+    """GET handlers read from an empty copy of the schema, as if it lagged."""
+    url = f"sqlite:///{tmp_path}/replica.db"
+    Base.metadata.create_all(create_engine(url))
+    replica = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    sessions = async_sessionmaker(replica, expire_on_commit=False)
+
+    async def get_replica_db():
+        async with sessions() as db:
+            yield db
+    app.dependency_overrides[get_read_db] = get_replica_db
+    yield
+    app.dependency_overrides.pop(get_read_db)
@@ -0,0 +1,100 @@
+import asyncio
+
+from campus.cache import Cache, MemoryBackend
+
+
+class BrokenBackend(MemoryBackend):
+    name = "broken"
+
+    async def get(self, key: str):
+        raise ConnectionError("cache is down")
+
+    async def set(self, key: str, value, ttl: float) -> None:
+        raise ConnectionError("cache is down")
+
+
+def counting_loader(*values):
+    """Loader returning the values in turn, and recording each call."""
+    calls = []
+
+    async def load():
+        calls.append(len(calls))
+        return values[len(calls) - 1]
+    return load, calls
+
+
+def test_hits_and_misses_are_counted():
+    cache = Cache(MemoryBackend())
+    load, calls = counting_loader("a")
+
+    async def main():
+        assert await cache.get("key") is None
+        assert await cache.get_or_load("key", load, 60) == "a"
+        assert await cache.get_or_load("key", load, 60) == "a"
+        assert await cache.get("key") == "a"
+    asyncio.run(main())
+
+    assert calls == [0]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["errors"]) == (2, 2, 0)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_invalidate_forces_a_reload():
+    cache = Cache(MemoryBackend())
+    load, calls = counting_loader("old", "new")
+
+    async def main():
+        assert await cache.get_or_load("key", load, 60) == "old"
+        await cache.invalidate("key", "unknown")
+        assert await cache.get_or_load("key", load, 60) == "new"
+        assert await cache.get_or_load("key", load, 60) == "new"
+    asyncio.run(main())
+    assert calls == [0, 1]
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    cache = Cache(MemoryBackend())
+
+    async def stale_load():
+        # a write commits and invalidates while this load is in flight
+        await cache.invalidate("key")
+        return "stale"
+
+    async def main():
+        assert await cache.get_or_load("key", stale_load, 60) == "stale"
+        return await cache.get("key")
+    assert asyncio.run(main()) is None
+
+
+def test_invalidation_during_the_write_removes_the_value():
+    backend = MemoryBackend()
+    cache = Cache(backend)
+    write = backend.set
+
+    async def set_then_invalidate(key, value, ttl):
+        await write(key, value, ttl)
+        if key == "key":
+            backend.set = write
+            await cache.invalidate("key")
+    backend.set = set_then_invalidate
+
+    async def main():
+        assert await cache.get_or_load("key", counting_loader("stale")[0], 60) == "stale"
+        return await cache.get("key")
+    assert asyncio.run(main()) is None
+
+
+def test_backend_errors_are_misses():
+    cache = Cache(BrokenBackend())
+    load, calls = counting_loader("a", "b")
+
+    async def main():
+        assert await cache.get_or_load("key", load, 60) == "a"
+        assert await cache.get_or_load("key", load, 60) == "b"
+    asyncio.run(main())
+
+    assert calls == [0, 1]
+    stats = cache.stats()
+    assert stats["hits"] == 0 and stats["misses"] == 2
+    assert stats["errors"] > 0
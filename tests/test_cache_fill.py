@@ -0,0 +1,17 @@
+from campus.models.studentGroupModel import StudentGroupModel
+
+
+def test_group_cache_is_filled_from_the_primary(client, seed, lagging_replica):
+    response = client.get("/api/groups/")
+    assert response.status_code == 200
+    assert [group["name"] for group in response.json()] == ["general"]
+    assert client.get("/api/groups/1").json()["name"] == "general"
+
+
+def test_feed_cache_is_filled_from_the_primary(client, seed, lagging_replica, monkeypatch):
+    monkeypatch.setattr("campus.routers.studentRouter.FEED_CACHE_ENABLED", True)
+    seed.add(StudentGroupModel(student_id=1, group_id=1, is_subscribed=True))
+    seed.commit()
+    response = client.get("/api/students/1/feed")
+    assert response.status_code == 200
+    assert [post["post_id"] for post in response.json()["items"]] == [3, 2, 1]
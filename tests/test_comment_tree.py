@@ -0,0 +1,90 @@
+from campus.comment_tree import build_comment_tree
+from campus.models.commentModel import CommentModel
+
+
+def row(comment_id: int, parent_comment_id: int = None, vote_count: int = 0) -> dict:
+    return {"comment_id": comment_id, "student_id": 1, "post_id": 1,
+            "parent_comment_id": parent_comment_id, "content": f"comment {comment_id}",
+            "vote_count": vote_count, "created_at": None, "updated_at": None}
+
+
+def in_sibling_order(*rows) -> list:
+    """Rows as load_post_comments returns them: most votes, then newest first."""
+    return sorted(rows, key=lambda r: (r["vote_count"], r["comment_id"]), reverse=True)
+
+
+def ids(items) -> list:
+    return [item["comment_id"] for item in items]
+
+
+# 1 -> 2 -> 3 -> 4, and 5 with replies 6..9
+THREAD = in_sibling_order(row(1, vote_count=5), row(2, 1), row(3, 2), row(4, 3),
+                          row(5), row(6, 5, 3), row(7, 5, 1), row(8, 5, 1), row(9, 5))
+
+
+def test_siblings_keep_the_vote_order():
+    items, next_cursor = build_comment_tree(THREAD)
+    assert ids(items) == [1, 5]
+    assert ids(items[1]["replies"]) == [6, 8, 7, 9]
+    assert items[1]["reply_count"] == 4
+    assert next_cursor is None
+
+
+def test_depth_limit_cuts_the_tree():
+    items, _ = build_comment_tree(THREAD, max_depth=2)
+    second = items[0]["replies"][0]
+    assert second["comment_id"] == 2
+    assert second["replies"] == [] and second["reply_count"] == 1
+    assert second["has_more_replies"] and second["replies_cursor"] is None
+
+    items, _ = build_comment_tree(THREAD, max_depth=3)
+    assert ids(items[0]["replies"][0]["replies"]) == [3]
+
+
+def test_replies_cursor_resumes_the_replies():
+    items, _ = build_comment_tree(THREAD, replies_limit=2)
+    parent = items[1]
+    assert ids(parent["replies"]) == [6, 8]
+    assert parent["has_more_replies"]
+
+    rest, next_cursor = build_comment_tree(
+        THREAD, parent["comment_id"], parent["replies_cursor"], replies_limit=2)
+    assert ids(rest) == [7, 9]
+    assert next_cursor is None
+
+
+def test_top_level_pages():
+    first, cursor = build_comment_tree(THREAD, replies_limit=1)
+    assert ids(first) == [1]
+    second, cursor = build_comment_tree(THREAD, cursor=cursor, replies_limit=1)
+    assert ids(second) == [5]
+    assert cursor is None
+
+
+def test_replies_to_deleted_comments_move_to_the_top():
+    items, _ = build_comment_tree(in_sibling_order(row(1), row(3, 2)))
+    assert ids(items) == [3, 1]
+
+
+def test_tree_endpoint(client, seed):
+    seed.add_all([CommentModel(student_id=1, post_id=1, content="popular", vote_count=4),
+                  CommentModel(student_id=1, post_id=1, parent_comment_id=1, content="reply")])
+    seed.commit()
+
+    response = client.get("/api/posts/1/comments/tree")
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert ids(items) == [2, 1]
+    assert ids(items[1]["replies"]) == [3]
+
+    response = client.get("/api/posts/1/comments/tree", params={"parent_comment_id": 1})
+    assert ids(response.json()["items"]) == [3]
+
+
+def test_tree_of_missing_post_or_comment_is_404(client, seed):
+    assert client.get("/api/posts/99/comments/tree").status_code == 404
+    assert client.get("/api/posts/1/comments/tree",
+                      params={"parent_comment_id": 99}).status_code == 404
+    response = client.get("/api/posts/2/comments/tree")
+    assert response.status_code == 200
+    assert response.json()["items"] == []
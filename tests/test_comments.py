@@ -0,0 +1,39 @@
+from campus.models.commentModel import CommentModel
+from campus.models.postModel import PostModel
+
+
+def comment_count(db, post_id: int) -> int:
+    db.expire_all()
+    return db.get(PostModel, post_id).comment_count
+
+
+def test_comment_needs_a_post_id(client, seed, auth):
+    response = client.post("/api/comments/", json={"content": "hi"}, headers=auth(2))
+    assert response.status_code == 422
+
+
+def test_comment_on_a_missing_post_is_404_and_writes_nothing(client, seed, auth):
+    response = client.post("/api/comments/", json={"post_id": 99, "content": "hi"},
+                           headers=auth(2))
+    assert response.status_code == 404
+    seed.expire_all()
+    assert seed.query(CommentModel).count() == 1
+
+
+def test_comment_counts_follow_creates_and_moves(client, seed, auth):
+    response = client.post("/api/comments/", json={"post_id": 2, "content": "hi"},
+                           headers=auth(2))
+    assert response.status_code == 200
+    comment_id = response.json()["comment_id"]
+    assert response.json()["student_id"] == 2
+    assert comment_count(seed, 2) == 1
+
+    response = client.patch(f"/api/comments/{comment_id}",
+                            json={"post_id": 99, "content": "moved"}, headers=auth(2))
+    assert response.status_code == 404
+    assert comment_count(seed, 2) == 1
+
+    response = client.patch(f"/api/comments/{comment_id}",
+                            json={"post_id": 3, "content": "moved"}, headers=auth(2))
+    assert response.status_code == 200
+    assert (comment_count(seed, 2), comment_count(seed, 3)) == (0, 1)
@@ -0,0 +1,18 @@
+import json
+
+
+def test_export_needs_a_token(client, seed):
+    assert client.get("/api/export/posts").status_code == 401
+
+
+def test_export_is_for_moderators_only(client, seed, auth):
+    response = client.get("/api/export/student_post_votes", headers=auth(1))
+    assert response.status_code == 403
+
+
+def test_moderator_exports_a_table(client, seed, auth):
+    response = client.get("/api/export/posts", headers=auth(2))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["post_id"] for row in rows] == [1, 2, 3]
@@ -0,0 +1,82 @@
+import pytest
+
+from campus.cache import Cache, MemoryBackend
+from campus.models.groupModel import GroupModel
+from campus.models.postModel import PostModel
+from campus.models.studentGroupModel import StudentGroupModel
+
+
+@pytest.fixture
+def subscribed(seed):
+    """Alice follows group 1, and is only a member of group 2 with post 4."""
+    seed.add(GroupModel(name="sports", description="games"))
+    seed.add_all([StudentGroupModel(student_id=1, group_id=1, is_subscribed=True),
+                  StudentGroupModel(student_id=1, group_id=2, is_subscribed=False)])
+    seed.add(PostModel(student_id=2, group_id=2, description="muted"))
+    seed.commit()
+    return seed
+
+
+@pytest.fixture
+def feed_cache(monkeypatch):
+    monkeypatch.setattr("campus.routers.studentRouter.FEED_CACHE_ENABLED", True)
+    monkeypatch.setattr("campus.routers.postRouter.FEED_CACHE_ENABLED", True)
+    monkeypatch.setattr("campus.feed.cache", Cache(MemoryBackend()))
+
+
+def feed(client, **params) -> dict:
+    response = client.get("/api/students/1/feed", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def ids(page) -> list:
+    return [post["post_id"] for post in page["items"]]
+
+
+def test_feed_has_only_subscribed_groups(client, subscribed):
+    page = feed(client)
+    assert ids(page) == [3, 2, 1]
+    assert page["next_cursor"] is None
+
+
+def test_feed_pages_by_keyset(client, subscribed):
+    first = feed(client, limit=2)
+    assert ids(first) == [3, 2]
+    # a post arriving between pages neither shifts nor repeats the next one
+    subscribed.add(PostModel(student_id=2, group_id=1, description="late"))
+    subscribed.commit()
+    second = feed(client, limit=2, cursor=first["next_cursor"])
+    assert ids(second) == [1]
+    assert second["next_cursor"] is None
+
+
+def test_cached_feed_is_dropped_on_a_new_post(client, subscribed, feed_cache, auth):
+    assert ids(feed(client)) == [3, 2, 1]
+    # written behind the API's back, so the cached page is still served
+    subscribed.add(PostModel(student_id=2, group_id=1, description="unseen"))
+    subscribed.commit()
+    assert ids(feed(client)) == [3, 2, 1]
+
+    response = client.post("/api/posts/", headers=auth(2),
+                           json={"group_id": 1, "description": "fresh"})
+    assert response.status_code == 200
+    assert ids(feed(client)) == [6, 5, 3, 2, 1]
+
+
+def test_new_post_elsewhere_keeps_the_cached_feed(client, subscribed, feed_cache, auth):
+    assert ids(feed(client)) == [3, 2, 1]
+    subscribed.add(PostModel(student_id=2, group_id=1, description="unseen"))
+    subscribed.commit()
+    client.post("/api/posts/", headers=auth(2), json={"group_id": 2, "description": "muted"})
+    assert ids(feed(client)) == [3, 2, 1]
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_feed_of_unknown_student_is_404(client, seed, monkeypatch, cached):
+    monkeypatch.setattr("campus.routers.studentRouter.FEED_CACHE_ENABLED", cached)
+    assert client.get("/api/students/99/feed").status_code == 404
+    # a student without subscriptions just has an empty feed
+    response = client.get("/api/students/2/feed")
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from campus.database import AsyncSessionLocal, async_engine
+from campus.models.groupModel import GroupModel
+from campus.models.postModel import PostModel
+from campus.models.studentPostVoteModel import StudentPostVoteModel
+from campus.trending import Trending
+
+
+def refresh(trending: Trending) -> None:
+    async def main():
+        try:
+            await trending.refresh()
+        finally:
+            await async_engine.dispose()
+    asyncio.run(main())
+
+
+@pytest.fixture
+def trending(monkeypatch):
+    """A fresh ranking in place of the app's, refreshed by hand."""
+    ranking = Trending(AsyncSessionLocal, 60, timedelta(days=7), 3600)
+    monkeypatch.setattr("campus.routers.postRouter.trending", ranking)
+    monkeypatch.setattr("campus.routers.groupRouter.trending", ranking)
+    return ranking
+
+
+@pytest.fixture
+def ranked(seed, trending):
+    """Posts 1..3 from an hour ago with 100, 0 and 10 votes, then ranked."""
+    an_hour_ago = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1)
+    for post_id, votes in ((1, 100), (2, 0), (3, 10)):
+        post = seed.get(PostModel, post_id)
+        post.vote_count, post.created_at = votes, an_hour_ago
+    seed.commit()
+    refresh(trending)
+    return trending
+
+
+def hot_ids(response) -> list:
+    assert response.status_code == 200
+    return [post["post_id"] for post in response.json()["items"]]
+
+
+def test_hot_is_unavailable_before_the_first_refresh(client, seed, trending):
+    assert client.get("/api/posts/", params={"sort": "hot"}).status_code == 503
+
+
+def test_hot_orders_by_votes_at_equal_age(client, ranked):
+    assert hot_ids(client.get("/api/posts/", params={"sort": "hot"})) == [1, 3, 2]
+    assert hot_ids(client.get("/api/posts/", params={"sort": "hot", "group_id": 1})) == [1, 3, 2]
+
+
+def test_hot_pages_follow_the_ranking(client, ranked):
+    first = client.get("/api/posts/", params={"sort": "hot", "limit": 2})
+    assert hot_ids(first) == [1, 3]
+    cursor = first.json()["next_cursor"]
+    second = client.get("/api/posts/", params={"sort": "hot", "limit": 2, "cursor": cursor})
+    assert hot_ids(second) == [2]
+    assert second.json()["next_cursor"] is None
+
+
+def test_newer_post_outranks_older_votes(client, seed, ranked):
+    seed.add(PostModel(student_id=1, group_id=1, description="fresh", vote_count=100))
+    seed.commit()
+    # a refresh only takes in writes from before the current second
+    time.sleep(1.1)
+    refresh(ranked)
+    assert hot_ids(client.get("/api/posts/", params={"sort": "hot"})) == [4, 1, 3, 2]
+
+
+def test_replica_miss_keeps_the_post_ranked(client, ranked, lagging_replica):
+    # the replica has none of the posts yet
+    assert client.get("/api/posts/", params={"sort": "hot"}).status_code == 404
+    assert ranked.top_posts() == [1, 3, 2]
+
+
+def test_post_deleted_on_the_primary_drops_out(client, seed, ranked, lagging_replica):
+    seed.delete(seed.get(PostModel, 3))
+    seed.commit()
+    client.get("/api/posts/", params={"sort": "hot"})
+    assert ranked.top_posts() == [1, 2]
+
+
+def test_group_activity_counts_decayed_votes(seed, trending):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for post_id in (1, 2, 3):
+        seed.get(PostModel, post_id).created_at = now - timedelta(minutes=30)
+    seed.add(GroupModel(name="quiet", description="old posts"))
+    seed.commit()
+    # outside the window, so only their votes count towards the group
+    old_posts = [PostModel(student_id=1, group_id=2, description=f"old {i}",
+                           created_at=now - timedelta(days=8)) for i in range(10)]
+    seed.add_all(old_posts)
+    seed.commit()
+    seed.add_all([StudentPostVoteModel(student_id=student_id, post_id=post.post_id,
+                                       vote_value=1, updated_at=now - timedelta(hours=2))
+                  for post in old_posts for student_id in (1, 2)])
+    seed.commit()
+    refresh(trending)
+
+    # 20 votes from two half-lives ago; three new posts, 3 votes' worth
+    # each, from half a half-life ago
+    assert trending._group_scores[2] == pytest.approx(20 * 0.5 ** 2, rel=0.02)
+    assert trending._group_scores[1] == pytest.approx(9 * 0.5 ** 0.5, rel=0.02)
+    assert trending.top_groups() == [1, 2]
+    assert trending.top_posts(group_id=2) == []
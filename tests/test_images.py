@@ -0,0 +1,126 @@
+import hashlib
+
+import pytest
+
+from campus.images import image_store
+from campus.models.postModel import PostModel
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_store, "root", tmp_path)
+    return tmp_path
+
+
+def upload(client, post_id, data, headers, filename="photo.png"):
+    return client.post(f"/api/posts/{post_id}/image", headers=headers,
+                       files={"file": (filename, data, "application/octet-stream")})
+
+
+def stored_files(store) -> list:
+    return sorted(path.name for path in store.rglob("*") if path.is_file())
+
+
+def test_upload_is_stored_under_its_hash(client, seed, auth, store):
+    response = upload(client, 1, PNG, auth(1))
+    assert response.status_code == 200
+    name = f"{hashlib.sha256(PNG).hexdigest()}.png"
+    assert response.json()["image"] == f"/api/images/{name}"
+    assert stored_files(store) == [name]
+    assert (store / name[:2] / name).read_bytes() == PNG
+
+
+def test_same_image_is_stored_once(client, seed, auth, store):
+    first = upload(client, 1, PNG, auth(1)).json()["image"]
+    second = upload(client, 2, PNG, auth(1), filename="copy.png").json()["image"]
+    assert first == second
+    assert len(stored_files(store)) == 1
+
+
+def test_image_is_served_with_ranges(client, seed, auth, store):
+    url = upload(client, 1, PNG, auth(1)).json()["image"]
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+    partial = client.get(url, headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == PNG[:8]
+
+
+def test_oversized_upload_is_413_and_leaves_nothing(client, seed, auth, store, monkeypatch):
+    monkeypatch.setattr(image_store, "max_bytes", 100)
+    response = upload(client, 1, PNG, auth(1))
+    assert response.status_code == 413
+    assert stored_files(store) == []
+
+
+def test_oversized_content_length_is_refused_up_front(client, seed, auth, store, monkeypatch):
+    monkeypatch.setattr(image_store, "max_bytes", 100)
+    response = upload(client, 1, PNG * 20, auth(1))
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("data", [b"%PDF-1.7 not an image at all", b"GIF8"])
+def test_unsupported_format_is_415(client, seed, auth, store, data):
+    response = upload(client, 1, data, auth(1))
+    assert response.status_code == 415
+    assert stored_files(store) == []
+
+
+def test_upload_must_be_multipart(client, seed, auth, store):
+    response = client.post("/api/posts/1/image", content=PNG,
+                           headers={**auth(1), "Content-Type": "image/png"})
+    assert response.status_code == 415
+
+
+def test_missing_file_field_is_400(client, seed, auth, store):
+    response = client.post("/api/posts/1/image", headers=auth(1),
+                           files={"other": ("photo.png", PNG, "image/png")})
+    assert response.status_code == 400
+
+
+def test_only_the_author_uploads(client, seed, auth, store):
+    assert upload(client, 1, PNG, auth(2)).status_code == 403
+    assert upload(client, 99, PNG, auth(1)).status_code == 404
+    assert stored_files(store) == []
+
+
+def test_unknown_image_names_are_404(client, store):
+    assert client.get("/api/images/../../etc/passwd").status_code == 404
+    assert client.get(f"/api/images/{'0' * 64}.png").status_code == 404
+
+
+@pytest.fixture
+def delete_during_upload(seed, monkeypatch):
+    """Makes the next uploads delete a post once stored, before it is updated."""
+    save_upload = image_store.save_upload
+
+    def arm(post_id: int):
+        async def save_then_delete(*args, **kwargs):
+            name = await save_upload(*args, **kwargs)
+            seed.delete(seed.get(PostModel, post_id))
+            seed.commit()
+            return name
+        monkeypatch.setattr(image_store, "save_upload", save_then_delete)
+    return arm
+
+
+def test_upload_to_a_post_deleted_meanwhile_is_404(client, seed, auth, store,
+                                                   delete_during_upload):
+    delete_during_upload(2)
+    assert upload(client, 2, PNG, auth(1)).status_code == 404
+    assert stored_files(store) == []
+
+
+def test_shared_image_of_a_deleted_post_is_kept(client, seed, auth, store,
+                                                delete_during_upload):
+    url = upload(client, 1, PNG, auth(1)).json()["image"]
+    delete_during_upload(2)
+    assert upload(client, 2, PNG, auth(1)).status_code == 404
+    assert client.get(url).status_code == 200
@@ -0,0 +1,65 @@
+import pytest
+
+from campus.models.groupModel import GroupModel
+from campus.models.studentGroupModel import StudentGroupModel
+
+
+@pytest.fixture
+def groups(seed):
+    """Group 2 next to the seed's group 1, and Alice already in group 1."""
+    seed.add(GroupModel(name="sports", description="games"))
+    seed.add(StudentGroupModel(student_id=1, group_id=1, is_subscribed=True))
+    seed.commit()
+    return seed
+
+
+def members(db) -> dict:
+    db.expire_all()
+    return {(row.student_id, row.group_id): row.is_subscribed
+            for row in db.query(StudentGroupModel).all()}
+
+
+def pairs(*pairs) -> list:
+    return [{"student_id": student_id, "group_id": group_id}
+            for student_id, group_id in pairs]
+
+
+def test_bulk_add_skips_members_duplicates_and_unknown_ids(client, groups):
+    body = {"memberships": pairs((1, 1), (2, 1), (2, 1), (2, 2), (9, 1), (1, 7)),
+            "is_subscribed": False}
+    response = client.post("/api/studentGroup/bulk", json=body)
+    assert response.status_code == 200
+    assert response.json() == {"added": 2, "already_members": 1,
+                               "missing_students": [9], "missing_groups": [7]}
+    # the existing membership keeps its subscription
+    assert members(groups) == {(1, 1): True, (2, 1): False, (2, 2): False}
+
+    response = client.post("/api/studentGroup/bulk", json=body)
+    assert response.json()["added"] == 0
+    assert response.json()["already_members"] == 3
+
+
+def test_bulk_remove_counts_only_existing_pairs(client, groups):
+    client.post("/api/studentGroup/bulk", json={"memberships": pairs((2, 1), (1, 2))})
+    body = {"memberships": pairs((1, 1), (1, 1), (2, 2), (9, 9))}
+    response = client.post("/api/studentGroup/bulk/remove", json=body)
+    assert response.status_code == 200
+    assert response.json() == {"removed": 1, "not_members": 2}
+    # pairs are matched as pairs, not as every student with every group
+    assert set(members(groups)) == {(2, 1), (1, 2)}
+
+
+@pytest.mark.parametrize("path", ["/api/studentGroup/bulk", "/api/studentGroup/bulk/remove"])
+def test_bulk_needs_pairs(client, seed, path):
+    assert client.post(path, json={"memberships": []}).status_code == 422
+
+
+def test_import_enrolls_in_default_groups(client, seed):
+    seed.add(GroupModel(name="welcome", description="for everyone", is_default=True))
+    seed.commit()
+    body = "name,email,password\nCarol,carol@example.com,secret-123\n"
+    response = client.post("/api/students/bulk", content=body,
+                           headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert members(seed) == {(3, 2): True}
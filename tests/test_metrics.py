@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from campus.database import engine
+from campus.metrics import MetricsMiddleware
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def requests(route: str, status: str, method: str = "GET") -> float:
+    return sample("campus_http_request_duration_seconds_count",
+                  method=method, route=route, status=status)
+
+
+def test_latency_is_labelled_by_route_template(client, seed):
+    before = requests("/api/posts/{post_id}", "200")
+    missing = requests("/api/posts/{post_id}", "404")
+    unmatched = requests("unmatched", "404")
+    client.get("/api/posts/1")
+    client.get("/api/posts/2")
+    client.get("/api/posts/99")
+    client.get("/no/such/path")
+    assert requests("/api/posts/{post_id}", "200") == before + 2
+    assert requests("/api/posts/{post_id}", "404") == missing + 1
+    assert requests("unmatched", "404") == unmatched + 1
+
+
+async def report_in_flight(scope, receive, send):
+    """ASGI app answering with the in-flight gauge, or failing on /fail."""
+    if scope["path"] == "/fail":
+        raise RuntimeError("handler failed")
+    body = str(sample("campus_http_requests_in_flight")).encode()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+def test_in_flight_gauge_covers_the_request():
+    idle = sample("campus_http_requests_in_flight")
+    failed = requests("unmatched", "500")
+    client = TestClient(MetricsMiddleware(report_in_flight), raise_server_exceptions=False)
+    assert float(client.get("/").text) == idle + 1
+    assert client.get("/fail").status_code == 500
+    assert sample("campus_http_requests_in_flight") == idle
+    assert requests("unmatched", "500") == failed + 1
+
+
+def test_queries_and_pool_checkouts_are_timed(client, seed):
+    queries = sample("campus_db_query_duration_seconds_count", engine="async")
+    checkouts = sample("campus_db_pool_checkout_wait_seconds_count", engine="async")
+    client.get("/api/posts/1")
+    assert sample("campus_db_query_duration_seconds_count", engine="async") > queries
+    assert sample("campus_db_pool_checkout_wait_seconds_count", engine="async") > checkouts
+    # every connection went back to the pool
+    assert sample("campus_db_pool_checked_out", engine="async") == 0
+    assert sample("campus_db_pool_connections", engine="async") >= 1
+
+
+def test_failed_statement_does_not_leak_its_start_time(db):
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1"))
+        assert isinstance(conn.info["metrics_start_time"], float)
+
+
+def test_writes_are_counted_by_entity(client, seed, auth):
+    posts = sample("campus_writes_total", entity="post")
+    votes = sample("campus_writes_total", entity="post_vote")
+    client.post("/api/posts/", headers=auth(2), json={"group_id": 1, "description": "new"})
+    client.post("/api/posts/1/votes", headers=auth(2), json={"vote_value": 1})
+    assert sample("campus_writes_total", entity="post") == posts + 1
+    assert sample("campus_writes_total", entity="post_vote") == votes + 1
+
+
+def test_metrics_endpoint(client, seed):
+    client.get("/api/posts/1")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in ["campus_http_request_duration_seconds_bucket",
+                 "campus_http_requests_in_flight", "campus_db_query_duration_seconds_bucket",
+                 "campus_db_pool_checkout_wait_seconds_bucket", "campus_db_pool_checked_out",
+                 "campus_db_pool_connections", "campus_writes_total"]:
+        assert name in response.text
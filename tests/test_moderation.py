@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from campus.database import AsyncSessionLocal, async_engine
+from campus.models.reportModel import ReportModel
+from campus.moderation import claim_reports
+
+
+@pytest.fixture
+def reports(seed, monkeypatch):
+    """Eight pending reports on post 1, and students 2 and 3 as moderators."""
+    monkeypatch.setattr("campus.auth.MODERATOR_IDS", frozenset({2, 3}))
+    seed.add_all([ReportModel(student_id=1, post_id=1, entity_type="post",
+                              reason=f"report {i}", status="pending")
+                  for i in range(8)])
+    seed.commit()
+    return seed
+
+
+def claimed_ids(response) -> list:
+    assert response.status_code == 200
+    return [report["report_id"] for report in response.json()]
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("GET", "/api/reports/queue", None),
+    ("GET", "/api/reports/counts", None),
+    ("POST", "/api/reports/queue/claim", {"limit": 1}),
+    ("POST", "/api/reports/resolve", {"report_ids": [1], "status": "resolved"}),
+])
+def test_report_endpoints_are_for_moderators(client, reports, auth, method, path, body):
+    assert client.request(method, path, json=body).status_code == 401
+    assert client.request(method, path, json=body, headers=auth(1)).status_code == 403
+    assert client.request(method, path, json=body, headers=auth(2)).status_code == 200
+
+
+def test_claims_hand_out_disjoint_batches(client, reports, auth):
+    first = claimed_ids(client.post("/api/reports/queue/claim", json={"limit": 3},
+                                    headers=auth(2)))
+    second = claimed_ids(client.post("/api/reports/queue/claim", json={"limit": 10},
+                                     headers=auth(3)))
+    assert first == [1, 2, 3]
+    assert second == [4, 5, 6, 7, 8]
+    assert claimed_ids(client.get("/api/reports/queue", headers=auth(2))) == []
+
+
+def test_concurrent_claims_are_disjoint(reports):
+    async def claim(moderator_id):
+        async with AsyncSessionLocal() as db:
+            return [report.report_id for report in await claim_reports(db, moderator_id, 2)]
+
+    async def main():
+        try:
+            return await asyncio.gather(*(claim(moderator_id) for moderator_id in (2, 3, 2, 3)))
+        finally:
+            await async_engine.dispose()
+    batches = asyncio.run(main())
+
+    claimed = [report_id for batch in batches for report_id in batch]
+    assert sorted(claimed) == list(range(1, 9))
+
+
+def test_moderators_only_close_their_own_claims(client, reports, auth):
+    client.post("/api/reports/queue/claim", json={"limit": 2}, headers=auth(2))
+    client.post("/api/reports/queue/claim", json={"limit": 2}, headers=auth(3))
+
+    response = client.post("/api/reports/resolve", headers=auth(3),
+                           json={"report_ids": [1, 2, 3, 4, 5], "status": "resolved"})
+    assert response.json() == {"updated": 2}
+
+    reports.expire_all()
+    statuses = {report.report_id: report.status for report in reports.query(ReportModel)}
+    assert [report_id for report_id, status in sorted(statuses.items())
+            if status == "resolved"] == [3, 4]
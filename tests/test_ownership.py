@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("PATCH", "/api/posts/1", {"description": "edited"}),
+    ("DELETE", "/api/posts/1", None),
+    ("PATCH", "/api/comments/1", {"content": "edited"}),
+    ("DELETE", "/api/comments/1", None),
+])
+def test_writes_need_a_token(client, seed, method, path, body):
+    response = client.request(method, path, json=body)
+    assert response.status_code == 401
+
+
+def test_only_the_author_edits_or_deletes_a_post(client, seed, auth):
+    response = client.patch("/api/posts/1", json={"description": "edited"}, headers=auth(2))
+    assert response.status_code == 403
+    response = client.delete("/api/posts/1", headers=auth(2))
+    assert response.status_code == 403
+
+    response = client.patch("/api/posts/1", json={"description": "edited"}, headers=auth(1))
+    assert response.status_code == 200
+    assert response.json()["description"] == "edited"
+    response = client.delete("/api/posts/2", headers=auth(1))
+    assert response.status_code == 204
+
+
+def test_only_the_author_edits_or_deletes_a_comment(client, seed, auth):
+    response = client.patch("/api/comments/1", json={"content": "edited"}, headers=auth(1))
+    assert response.status_code == 403
+    response = client.delete("/api/comments/1", headers=auth(1))
+    assert response.status_code == 403
+
+    response = client.patch("/api/comments/1", json={"content": "edited"}, headers=auth(2))
+    assert response.status_code == 200
+    assert response.json()["content"] == "edited"
+    response = client.delete("/api/comments/1", headers=auth(2))
+    assert response.status_code == 200
+
+
+def test_missing_rows_are_404_not_403(client, seed, auth):
+    assert client.delete("/api/posts/99", headers=auth(2)).status_code == 404
+    assert client.delete("/api/comments/99", headers=auth(1)).status_code == 404
+
+
+def test_students_only_change_their_own_account(client, seed, auth):
+    update = {"password": "n3w-secret!"}
+    assert client.patch("/api/students/1", json=update).status_code == 401
+    assert client.patch("/api/students/1", json=update, headers=auth(2)).status_code == 403
+    assert client.delete("/api/students/1").status_code == 401
+    assert client.delete("/api/students/1", headers=auth(2)).status_code == 403
+
+    response = client.patch("/api/students/2", json={"name": "Bobby"}, headers=auth(2))
+    assert response.status_code == 200
+    assert response.json()["name"] == "Bobby"
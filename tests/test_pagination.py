@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from campus.exceptions import InvalidCursorException
+from campus.models.postModel import PostModel
+from campus.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(*payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("vote_count", 7, 42)
+    assert decode_cursor(cursor, PostModel.vote_count) == (7, 42)
+
+
+@pytest.mark.parametrize("column, cursor", [
+    (PostModel.vote_count, raw_cursor("vote_count", "zzz", 5)),
+    (PostModel.vote_count, raw_cursor("vote_count", 1.5, 5)),
+    (PostModel.vote_count, raw_cursor("vote_count", True, 5)),
+    (PostModel.vote_count, raw_cursor("vote_count", 3, "5")),
+    (PostModel.vote_count, raw_cursor("created_at", 3, 5)),
+    (PostModel.created_at, raw_cursor("created_at", 3, 5)),
+    (PostModel.created_at, "not a cursor"),
+])
+def test_malformed_cursor_is_rejected(column, cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, column)
+
+
+def test_list_endpoint_answers_400_for_a_mistyped_cursor(client, seed):
+    response = client.get("/api/posts/", params={
+        "sort_by_votes": True, "cursor": raw_cursor("vote_count", "zzz", 5)})
+    assert response.status_code == 400
+
+
+def walk(client, path, **params) -> list:
+    """Ids of every page of a listing, following next_cursor one row at a time."""
+    ids, cursor = [], None
+    for _ in range(20):
+        page = client.get(path, params={**params, "limit": 1,
+                                        **({"cursor": cursor} if cursor else {})}).json()
+        ids += [item.get("post_id") or item.get("comment_id") for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+    raise AssertionError(f"pagination did not end: {ids}")
+
+
+def test_pages_never_repeat_rows(client, seed):
+    # the seeded rows share one created_at second, so the id breaks the ties
+    assert walk(client, "/api/posts/") == [3, 2, 1]
+    assert walk(client, "/api/posts/", group_id=1) == [3, 2, 1]
+    assert walk(client, "/api/posts/", sort_by_votes=True) == [3, 2, 1]
+    assert walk(client, "/api/comments/") == [1]
+
+
+def test_pages_cross_second_boundaries(client, seed):
+    # posts from earlier seconds, one of them with microseconds
+    seed.get(PostModel, 1).created_at = datetime(2024, 5, 1, 12, 0, 0)
+    seed.get(PostModel, 2).created_at = datetime(2024, 5, 1, 12, 0, 0, 250000)
+    seed.commit()
+    assert walk(client, "/api/posts/") == [3, 2, 1]
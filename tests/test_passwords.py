@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from campus.exceptions import PasswordQueueFullException
+from campus.models.studentModel import StudentModel
+from campus.passwords import PasswordHasher, check_password, hash_password, password_hasher
+
+CAROL = {"name": "Carol", "email": "carol@example.com", "password": "s3cret-pass"}
+
+
+def test_hashes_use_the_configured_work_factor():
+    hashed = hash_password("s3cret-pass", rounds=4)
+    assert hashed.startswith("$2b$04$")
+    assert check_password("s3cret-pass", hashed)
+    assert not check_password("wrong-pass1!", hashed)
+
+
+def test_pool_hashes_and_verifies_in_worker_processes():
+    hasher = PasswordHasher(workers=2, max_pending=8)
+
+    async def main():
+        hashed = await hasher.hash_many(["first-1!", "second-2!", "third-3!"])
+        checks = [await hasher.verify(raw, hashed[index])
+                  for index, raw in enumerate(["first-1!", "second-2!", "wrong-3!"])]
+        return hashed, checks
+    try:
+        hashed, checks = asyncio.run(main())
+    finally:
+        hasher.shutdown()
+
+    assert len(set(hashed)) == 3
+    assert checks == [True, True, False]
+    assert hasher.pending == 0
+    assert hasher._executor is None
+
+
+def test_full_queue_fails_fast_and_keeps_the_count():
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    with pytest.raises(PasswordQueueFullException):
+        asyncio.run(hasher.hash("s3cret-pass"))
+    assert hasher.pending == 0
+    assert hasher._executor is None
+
+
+def test_signup_then_token(client, db):
+    response = client.post("/api/students/", json=CAROL)
+    assert response.status_code == 201
+    db.expire_all()
+    stored = db.get(StudentModel, response.json()["student_id"]).password
+    assert stored != CAROL["password"] and check_password(CAROL["password"], stored)
+
+    assert client.post("/api/students/token", json=CAROL).status_code == 200
+    wrong = {**CAROL, "password": "wr0ng-pass!"}
+    assert client.post("/api/students/token", json=wrong).status_code == 401
+
+
+def test_busy_hasher_is_503(client, db, monkeypatch):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post("/api/students/", json=CAROL)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,176 @@
+import re
+import sqlite3
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+
+from campus.database import engine, async_engine
+from campus.models.commentModel import CommentModel
+from campus.models.reportModel import ReportModel
+from campus.models.studentGroupModel import StudentGroupModel
+
+ROOT = Path(__file__).resolve().parents[1]
+LARGE_TABLES = ("posts", "comments", "student_post_votes",
+                "student_comment_votes", "student_groups", "reports")
+# INSERT ... VALUES has no plan to check
+PLANNED = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+@pytest.fixture(scope="module")
+def migrated(tmp_path_factory):
+    """A database built by the migrations, not by create_all."""
+    path = tmp_path_factory.mktemp("plans") / "migrated.db"
+    config = Config(ROOT / "alembic.ini")
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, "head")
+    connection = sqlite3.connect(path)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def executed(client, seed):
+    """Every statement the app sends to the database, with its parameters."""
+    seed.add_all([
+        CommentModel(student_id=1, post_id=1, parent_comment_id=1, content="reply"),
+        StudentGroupModel(student_id=1, group_id=1, is_subscribed=True),
+        ReportModel(student_id=1, post_id=2, entity_type="post", reason="spam"),
+    ])
+    seed.commit()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(PLANNED):
+            statements.append((statement, parameters[0] if executemany else parameters))
+    binds = (engine, async_engine.sync_engine)
+    for bind in binds:
+        event.listen(bind, "before_cursor_execute", record)
+    yield statements
+    for bind in binds:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+def query_plan(connection, statement: str, parameters) -> list:
+    return [row[3] for row in
+            connection.execute("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+
+def assert_indexed(plan: list, may_sort: bool = False, may_scan: bool = False) -> None:
+    """
+    Large tables are only searched through an index, or walked in index
+    order (a LIMITed page stops early), and never sorted per query unless
+    the order can not come from an index at all.
+    """
+    for step in plan:
+        assert may_sort or "USE TEMP B-TREE FOR ORDER BY" not in step, plan
+        scan = re.fullmatch(r"SCAN (\w+?)(_\d+)?", step)
+        assert may_scan or not (scan and scan.group(1) in LARGE_TABLES), plan
+
+
+def get(path: str, student_id: int = None):
+    return "GET", path, None, student_id
+
+
+def post(path: str, body: dict = None, student_id: int = None):
+    return "POST", path, body, student_id
+
+
+def next_page(path: str):
+    """The second page of a listing, resumed from the first page's cursor."""
+    return "NEXT", path, None, None
+
+
+MEMBERSHIPS = {"memberships": [{"student_id": 2, "group_id": 1},
+                               {"student_id": 9, "group_id": 1}]}
+
+# every read and write path, driven through the routers so the cases are
+# the statements actually sent, not copies of them
+ROUTES = {
+    "posts_newest": get("/api/posts/"),
+    "posts_most_voted": get("/api/posts/?sort=votes"),
+    "posts_next_page": next_page("/api/posts/?limit=1"),
+    "posts_most_voted_next_page": next_page("/api/posts/?sort=votes&limit=1"),
+    "posts_of_group": get("/api/posts/?group_id=1"),
+    "posts_of_group_most_voted": get("/api/posts/?group_id=1&sort=votes"),
+    "posts_of_group_next_page": next_page("/api/posts/?group_id=1&limit=1"),
+    "posts_of_student": get("/api/posts/?student_id=1"),
+    "post": get("/api/posts/1"),
+    "search_posts": get("/api/posts/search?query=post"),
+    "comments_newest": get("/api/comments/"),
+    "comments_most_voted": get("/api/comments/?sort_by_votes=true"),
+    "comments_next_page": next_page("/api/comments/?limit=1"),
+    "comments_of_post": get("/api/comments/?post_id=1"),
+    "comments_of_post_most_voted": get("/api/comments/?post_id=1&sort_by_votes=true"),
+    "comments_of_student": get("/api/comments/?student_id=2"),
+    "comment_tree": get("/api/posts/1/comments/tree"),
+    "feed": get("/api/students/1/feed"),
+    "search_groups": get("/api/groups/search?query=general"),
+    "vote_on_post": post("/api/posts/1/votes", {"vote_value": 1}, 2),
+    "vote_on_comment": post("/api/comments/1/votes", {"vote_value": -1}, 1),
+    "report_post": post("/api/posts/1/report", {"reason": "spam"}, 2),
+    "report_queue": get("/api/reports/queue", 2),
+    "report_claim": post("/api/reports/queue/claim", {"limit": 5}, 2),
+    "report_resolve": post("/api/reports/resolve",
+                           {"report_ids": [1], "status": "resolved"}, 2),
+    "report_counts": get("/api/reports/counts", 2),
+    "memberships_of_student": get("/api/studentGroup/?student_id=1"),
+    "memberships_all": get("/api/studentGroup/"),
+    "membership_add": post("/api/studentGroup/1/students/2"),
+    "memberships_bulk_add": post("/api/studentGroup/bulk", MEMBERSHIPS),
+    "memberships_bulk_remove": post("/api/studentGroup/bulk/remove", MEMBERSHIPS),
+    "membership_remove": ("DELETE", "/api/studentGroup/1/students/1", None, None),
+    "export_posts_of_group": get("/api/export/posts?group_id=1", 2),
+    "export_comments_of_group": get("/api/export/comments?group_id=1", 2),
+    "export_reports_of_group": get("/api/export/reports?group_id=1", 2),
+    "export_posts": get("/api/export/posts", 2),
+}
+
+
+# routes whose matches are sorted by design, and why
+SORTED = {
+    # the feed merges the pages of several groups by created_at
+    "feed",
+    # matches are ordered by their FTS rank, computed per query
+    "search_posts", "search_groups",
+    # the most reported rows are ordered by a count computed per query
+    "report_counts",
+    # a group's comments are found per post, then put in primary key order
+    "export_comments_of_group",
+}
+
+# routes that read a whole table by design
+SCANNED = {
+    # lists every membership there is
+    "memberships_all",
+    # streams the whole table in primary key order
+    "export_posts",
+    # the foreign keys of reports are only indexed on MySQL, where InnoDB
+    # creates the indexes itself
+    "export_reports_of_group",
+}
+
+
+@pytest.mark.parametrize("name", ROUTES)
+def test_route_queries_use_an_index(migrated, client, auth, executed, name):
+    method, path, body, student_id = ROUTES[name]
+    headers = auth(student_id) if student_id else None
+    if method == "NEXT":
+        cursor = client.get(path).json()["next_cursor"]
+        assert cursor
+        executed.clear()
+        response = client.get(f"{path}&cursor={cursor}")
+    else:
+        response = client.request(method, path, json=body, headers=headers)
+    assert response.status_code < 400, response.text
+    assert executed
+
+    for statement, parameters in executed:
+        plan = query_plan(migrated, statement, parameters)
+        try:
+            assert_indexed(plan, name in SORTED, name in SCANNED)
+        except AssertionError:
+            pytest.fail(f"{statement}\n{plan}")
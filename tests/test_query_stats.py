@@ -0,0 +1,79 @@
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from campus.database import AsyncSessionLocal, async_engine, engine
+from campus.main import app
+from campus.query_stats import (QueryStatsMiddleware, current_stats, fingerprint,
+                                install_query_events, remove_query_events,
+                                _before_cursor_execute)
+
+
+async def run_queries(scope, receive, send):
+    """ASGI app running as many SELECTs as the path says, /3 runs three."""
+    async with AsyncSessionLocal() as db:
+        for _ in range(int(scope["path"].strip("/"))):
+            await db.execute(text("SELECT 1"))
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+@pytest.fixture
+def timed_client():
+    install_query_events(async_engine.sync_engine)
+    try:
+        yield TestClient(QueryStatsMiddleware(run_queries, header=True))
+    finally:
+        remove_query_events(async_engine.sync_engine)
+
+
+def timing(response) -> tuple:
+    match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries"',
+                         response.headers["server-timing"])
+    return float(match.group(1)), int(match.group(2))
+
+
+def test_every_request_counts_its_own_queries(timed_client):
+    duration, count = timing(timed_client.get("/3"))
+    assert count == 3 and duration > 0
+    assert timing(timed_client.get("/1"))[1] == 1
+    assert timing(timed_client.get("/0")) == (0.0, 0)
+    assert current_stats.get() is None
+
+
+def test_installing_twice_counts_once(timed_client):
+    install_query_events(async_engine.sync_engine)
+    assert timing(timed_client.get("/2"))[1] == 2
+
+
+def test_budget_overruns_are_logged(timed_client, monkeypatch, caplog):
+    monkeypatch.setattr("campus.query_stats.QUERY_COUNT_BUDGET", 4)
+    # alembic's fileConfig, run by the migration tests, disables it
+    monkeypatch.setattr(logging.getLogger("campus.query_stats"), "disabled", False)
+    with caplog.at_level(logging.WARNING, logger="campus.query_stats"):
+        timed_client.get("/4")
+        assert not caplog.records
+        timed_client.get("/6")
+    [record] = caplog.records
+    assert "ran 6 queries" in record.getMessage()
+    assert "SELECT 1" in record.getMessage()
+
+
+def test_app_removes_its_hooks_on_shutdown():
+    with TestClient(app):
+        assert event.contains(engine, "before_cursor_execute", _before_cursor_execute)
+        assert event.contains(async_engine.sync_engine, "before_cursor_execute",
+                              _before_cursor_execute)
+    assert not event.contains(engine, "before_cursor_execute", _before_cursor_execute)
+    assert not event.contains(async_engine.sync_engine, "before_cursor_execute",
+                              _before_cursor_execute)
+
+
+def test_fingerprints_ignore_list_lengths():
+    assert fingerprint("SELECT * FROM posts WHERE post_id IN (?, ?, ?)") == \
+        fingerprint("SELECT *\n  FROM posts WHERE post_id IN (?)")
+    assert fingerprint("INSERT INTO t (a) VALUES (?), (?), (?)") == \
+        "INSERT INTO t (a) VALUES (?)"
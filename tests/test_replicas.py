@@ -0,0 +1,98 @@
+import asyncio
+
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from campus.database import AsyncSessionLocal
+from campus.metrics import REGISTRY
+from campus.replicas import (PIN_COOKIE, ReadYourWritesMiddleware, ReplicaSet,
+                             read_sessionmaker)
+
+
+def checkout_wait_labels() -> set:
+    return {sample.labels["engine"]
+            for metric in REGISTRY.collect()
+            if metric.name == "campus_db_pool_checkout_wait_seconds"
+            for sample in metric.samples}
+
+
+def test_each_replica_reports_pool_waits_under_its_own_label(tmp_path):
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path}/replica{number}.db"
+                              for number in range(2)],
+                             "round_robin", max_lag=5, check_interval=5)
+    assert [replica.label for replica in replica_set.replicas] == ["replica0", "replica1"]
+
+    async def main():
+        for replica in replica_set.replicas:
+            await replica.measure_lag()
+            # dispose() rebuilds the pool; the label has to survive it
+            await replica.engine.dispose()
+            await replica.measure_lag()
+            await replica.engine.dispose()
+    asyncio.run(main())
+
+    assert {"replica0", "replica1"} <= checkout_wait_labels()
+
+
+def sqlite_replicas(tmp_path, count: int = 1) -> ReplicaSet:
+    return ReplicaSet([f"sqlite:///{tmp_path}/replica{number}.db" for number in range(count)],
+                      "round_robin", max_lag=5, check_interval=5)
+
+
+def check(replica_set: ReplicaSet) -> None:
+    async def main():
+        try:
+            await replica_set.check()
+        finally:
+            for replica in replica_set.replicas:
+                await replica.engine.dispose()
+    asyncio.run(main())
+
+
+def test_replicas_are_unused_until_their_first_check(tmp_path):
+    replica_set = sqlite_replicas(tmp_path, 2)
+    assert replica_set.choose() is None
+    assert replica_set.primary_fallbacks == 1
+
+    check(replica_set)
+    assert [replica_set.choose() for _ in range(3)] == [*replica_set.replicas, replica_set.replicas[0]]
+
+
+def test_unreachable_replica_is_skipped(tmp_path):
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path}/missing/replica.db"],
+                             "round_robin", max_lag=5, check_interval=5)
+    check(replica_set)
+    assert replica_set.replicas[0].lag is None
+    assert replica_set.choose() is None
+
+
+def read_request(cookie: str = None) -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_only_pinned_clients_read_from_the_primary(tmp_path, monkeypatch):
+    replica_set = sqlite_replicas(tmp_path)
+    check(replica_set)
+    monkeypatch.setattr("campus.replicas.replica_set", replica_set)
+    replica = replica_set.replicas[0]
+
+    assert read_sessionmaker(read_request(f"{PIN_COOKIE}=1")) is AsyncSessionLocal
+    # without the cookie a client is not pinned, even right after a write
+    assert read_sessionmaker(read_request()) is replica.sessionmaker
+
+
+async def respond(scope, receive, send):
+    """ASGI app answering with the status in the path, /201 is a 201."""
+    await send({"type": "http.response.start", "status": int(scope["path"].strip("/")),
+                "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def test_successful_writes_set_the_pin_cookie():
+    client = TestClient(ReadYourWritesMiddleware(respond, window=7))
+    response = client.post("/201")
+    assert f"{PIN_COOKIE}=1" in response.headers["set-cookie"]
+    assert "Max-Age=7" in response.headers["set-cookie"]
+    assert "set-cookie" not in client.post("/409").headers
+    assert "set-cookie" not in client.get("/200").headers
@@ -0,0 +1,75 @@
+import pytest
+
+from campus.models.postModel import PostModel
+from campus.search import fts5_query
+
+
+@pytest.fixture
+def posts(seed):
+    """Posts 4..6 with search text; posts 1..3 only say "post N"."""
+    seed.add_all([
+        PostModel(student_id=1, group_id=1, description="exam notes",
+                  details="exam dates and exam rooms"),
+        PostModel(student_id=1, group_id=1, description="lunch",
+                  details="anyone up for lunch after the exam tomorrow"),
+        PostModel(student_id=1, group_id=1, description="examples",
+                  details="worked examples for the notes"),
+    ])
+    seed.commit()
+    return seed
+
+
+def found(client, query: str) -> list:
+    response = client.get("/api/posts/search", params={"query": query})
+    assert response.status_code == 200, response.text
+    return [post["post_id"] for post in response.json()["items"]]
+
+
+def test_better_matches_rank_first(client, posts):
+    assert found(client, "exam notes") == [4]
+    assert found(client, "exam")[0] == 4
+
+
+def test_last_word_matches_as_a_prefix(client, posts):
+    assert sorted(found(client, "exa")) == [4, 5, 6]
+    assert found(client, "examp") == [6]
+    # only the word being typed is a prefix
+    assert found(client, "exa notes") == []
+
+
+@pytest.mark.parametrize("query", [
+    '"', '"exam', "exam*", "exam OR lunch", "NEAR(exam lunch)", "-exam",
+    "description:exam", "exam AND", "(", "^exam", "'; DROP TABLE posts; --",
+])
+def test_fts_syntax_is_searched_as_text(client, posts, query):
+    found(client, query)
+    assert posts.query(PostModel).count() == 6
+
+
+def test_blank_queries(client, posts):
+    assert client.get("/api/posts/search", params={"query": ""}).status_code == 400
+    assert found(client, "   ") == []
+    assert fts5_query('say "hi"') == '"say" """hi"""*'
+
+
+def test_index_follows_updates_and_deletes(client, posts, auth):
+    response = client.patch("/api/posts/5", json={"description": "dinner",
+                                                  "details": "pizza"},
+                            headers=auth(1))
+    assert response.status_code == 200
+    assert found(client, "pizza") == [5]
+    assert 5 not in found(client, "lunch")
+
+    # vote counts do not fire the update trigger, and do not break the index
+    assert client.post("/api/posts/5/votes", json={"vote_value": 1},
+                       headers=auth(2)).status_code == 200
+    assert found(client, "pizza") == [5]
+
+    assert client.delete("/api/posts/6", headers=auth(1)).status_code == 204
+    assert found(client, "examples") == []
+
+
+def test_groups_are_searched_too(client, seed):
+    response = client.get("/api/groups/search", params={"query": "gen"})
+    assert response.status_code == 200
+    assert [group["name"] for group in response.json()["items"]] == ["general"]
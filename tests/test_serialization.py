@@ -0,0 +1,72 @@
+from datetime import datetime
+from functools import partial
+
+import orjson
+import pytest
+from sqlalchemy import update
+
+from campus.models.postModel import PostModel
+from campus.models.studentGroupModel import StudentGroupModel
+from campus.schemas.postSchema import PostPage
+from campus.schemas.studentSchema import StudentResponse
+from campus.serialization import ORJSONResponse, fast_json, type_adapter
+
+ROUTERS = ["postRouter", "commentRouter", "studentRouter", "studentGroupRouter"]
+LISTS = ["/api/posts/?group_id=1", "/api/posts/?sort=votes&limit=2",
+         "/api/comments/?post_id=1", "/api/students/", "/api/studentGroup/"]
+
+
+@pytest.fixture
+def members(seed):
+    seed.add(StudentGroupModel(student_id=1, group_id=1, is_subscribed=True))
+    seed.commit()
+    return seed
+
+
+@pytest.mark.parametrize("path", LISTS)
+def test_fast_path_matches_fastapi(client, members, monkeypatch, path):
+    fast = client.get(path)
+    assert fast.status_code == 200
+    assert fast.headers["content-type"] == "application/json"
+
+    # the same endpoints through FastAPI's own response_model serialisation
+    for router in ROUTERS:
+        monkeypatch.setattr(f"campus.routers.{router}.fast_json",
+                            partial(fast_json, enabled=False))
+    slow = client.get(path)
+    assert slow.status_code == 200
+    assert fast.json() == slow.json()
+
+
+def test_response_headers_are_kept(client, seed):
+    # only collections settled for a second are tagged
+    seed.execute(update(PostModel).values(updated_at=datetime(2024, 5, 1)))
+    seed.commit()
+    response = client.get("/api/posts/", params={"group_id": 1})
+    assert response.headers["etag"]
+    assert client.get("/api/posts/", params={"group_id": 1},
+                      headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_rows_are_validated_against_the_schema():
+    class Row:
+        student_id, name, email = 7, "Carol", "carol@example.com"
+        created_at = updated_at = datetime(2024, 5, 1, 12, 30)
+        password = "never sent"
+
+    response = fast_json(list[StudentResponse], [Row()], headers={"X-Test": "1"})
+    assert isinstance(response, ORJSONResponse)
+    assert response.headers["x-test"] == "1"
+    [student] = orjson.loads(response.body)
+    assert student["created_at"] == "2024-05-01T12:30:00"
+    assert "password" not in student
+
+
+def test_disabled_hands_the_data_back():
+    data = {"items": [], "next_cursor": None}
+    assert fast_json(PostPage, data, enabled=False) is data
+
+
+def test_one_adapter_per_schema():
+    assert type_adapter(PostPage) is type_adapter(PostPage)
+    assert type_adapter(list[StudentResponse]) is type_adapter(list[StudentResponse])
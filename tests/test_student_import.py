@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from campus.database import AsyncSessionLocal, async_engine
+from campus.exceptions import PasswordQueueFullException
+from campus.models.studentModel import StudentModel
+from campus.passwords import password_hasher
+from campus.student_import import ImportReport, iter_lines, import_students
+
+PASSWORD = "secret-123"
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def run_import(body: bytes, batch_size: int = 2, chunk_size: int = 7) -> dict:
+    async def main():
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        try:
+            async with AsyncSessionLocal() as db:
+                return await import_students(db, stream(*chunks), "csv", batch_size)
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+def csv_body(*rows) -> bytes:
+    return ("name,email,password\n" + "".join(f"{row}\n" for row in rows)).encode()
+
+
+@pytest.fixture
+def fast_hash(monkeypatch):
+    calls = []
+
+    async def hash_many(passwords):
+        calls.append(len(passwords))
+        return [f"hashed:{password}" for password in passwords]
+    monkeypatch.setattr(password_hasher, "hash_many", hash_many)
+    return calls
+
+
+def collect(chunks, max_length):
+    async def main():
+        return [item async for item in iter_lines(stream(*chunks), max_length)]
+    return asyncio.run(main())
+
+
+def test_overlong_lines_are_reported_not_buffered():
+    chunks = [b"ok\n" + b"x" * 6, b"x" * 6, b"xx\nfine\r\n", b"y" * 11]
+    assert collect(chunks, 10) == [(1, "ok"), (2, None), (3, "fine"), (4, None)]
+
+
+def test_overlong_csv_row_is_a_line_error(seed, fast_hash):
+    body = csv_body(f"Carol,carol@example.com,{PASSWORD}",
+                    "Dave," + "d" * 9000 + f"@example.com,{PASSWORD}")
+    result = run_import(body)
+    assert result["created"] == 1
+    assert [error["line"] for error in result["errors"]] == [3]
+    assert "longer than" in result["errors"][0]["detail"]
+
+
+def test_errors_are_sorted_by_line(seed, fast_hash):
+    # the duplicate on line 3 is only found when its batch is inserted,
+    # after the validation error on line 4 was reported
+    body = csv_body(f"Carol,carol@example.com,{PASSWORD}",
+                    f"Alice,alice@example.com,{PASSWORD}",
+                    "Dave,not-an-email,short",
+                    f"Erin,erin@example.com,{PASSWORD}")
+    result = run_import(body)
+    assert result["created"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+    assert result["stopped_at_line"] is None
+
+
+def test_error_cap_keeps_the_lowest_lines():
+    report = ImportReport(max_errors=2)
+    for line in (9, 4, 7, 2):
+        report.fail(line, None, "bad")
+    result = report.result()
+    assert [error["line"] for error in result["errors"]] == [2, 4]
+    assert result["failed"] == 4 and result["errors_truncated"]
+
+
+def test_busy_password_pool_returns_a_partial_report(seed, monkeypatch):
+    calls = []
+
+    async def hash_many(passwords):
+        calls.append(len(passwords))
+        if len(calls) == 2:
+            raise PasswordQueueFullException()
+        return [f"hashed:{password}" for password in passwords]
+    monkeypatch.setattr(password_hasher, "hash_many", hash_many)
+
+    body = csv_body(*(f"Student {name},{name}@example.com,{PASSWORD}"
+                      for name in ("Carol", "Dave", "Erin", "Frank", "Grace")))
+    result = run_import(body)
+
+    assert result["created"] == 2
+    assert result["stopped_at_line"] == 4
+    assert result["errors"][-1]["line"] == 4
+    assert len(calls) == 2
+    seed.expire_all()
+    assert seed.query(StudentModel).count() == 4
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from campus.database import AsyncSessionLocal, async_engine
+from campus.models.commentModel import CommentModel
+from campus.models.postModel import PostModel
+from campus.vote_buffer import VoteBuffer
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            # pooled aiosqlite connections belong to this loop
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+class FailingSession:
+    """Session whose UPDATEs run but whose commit fails."""
+
+    async def __aenter__(self):
+        self.session = AsyncSessionLocal()
+        self.session.commit = self.fail
+        return self.session
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def fail(self):
+        raise RuntimeError("commit failed")
+
+
+def test_pending_count_tracks_distinct_rows():
+    buffer = VoteBuffer(AsyncSessionLocal, 60, 3)
+    buffer.add(PostModel, 1, 1)
+    buffer.add(PostModel, 1, 1)
+    buffer.add(CommentModel, 1, -1)
+    buffer.add(PostModel, 2, 0)
+    assert buffer.pending_count() == 2
+    assert not buffer._wake.is_set()
+    buffer.add(PostModel, 2, 1)
+    assert buffer.pending_count() == 3
+    assert buffer._wake.is_set()
+
+
+def test_flush_writes_counts_and_resets_pending(seed):
+    buffer = VoteBuffer(AsyncSessionLocal, 60, 100)
+    buffer.add(PostModel, 1, 2)
+    buffer.add(PostModel, 2, -1)
+    buffer.add(CommentModel, 1, 1)
+    run(buffer.flush())
+
+    assert buffer.pending_count() == 0
+    assert buffer.flushed_rows == 3
+    seed.expire_all()
+    assert seed.get(PostModel, 1).vote_count == 2
+    assert seed.get(PostModel, 2).vote_count == -1
+    assert seed.get(CommentModel, 1).vote_count == 1
+
+
+def test_failed_commit_keeps_deltas_and_counts_nothing(seed):
+    buffer = VoteBuffer(FailingSession, 60, 100)
+    buffer.add(PostModel, 1, 2)
+    buffer.add(PostModel, 2, -1)
+    with pytest.raises(RuntimeError):
+        run(buffer.flush())
+    buffer.add(PostModel, 1, 1)
+
+    assert buffer.flushed_rows == 0
+    assert buffer.failed_flushes == 1
+    assert buffer.pending_count() == 2
+    assert buffer._pending[PostModel] == {1: 3, 2: -1}
+    seed.expire_all()
+    assert seed.get(PostModel, 1).vote_count == 0
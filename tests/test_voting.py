@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from campus.database import AsyncSessionLocal, async_engine
+from campus.models.commentModel import CommentModel
+from campus.models.postModel import PostModel
+from campus.models.studentCommentVoteModel import StudentCommentVoteModel
+from campus.models.studentModel import StudentModel
+from campus.models.studentPostVoteModel import StudentPostVoteModel
+from campus.vote_buffer import VoteBuffer
+from campus.voting import apply_comment_vote, apply_post_vote
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+async def vote(apply, target_id: int, student_id: int, vote_value: int):
+    async with AsyncSessionLocal() as db:
+        return await apply(db, target_id, student_id, vote_value)
+
+
+async def votes(apply, target_id: int, *steps):
+    """Apply (student_id, vote_value) steps in order, one session each."""
+    return [await vote(apply, target_id, student_id, vote_value)
+            for student_id, vote_value in steps]
+
+
+def post_state(seed, post_id: int = 1):
+    seed.expire_all()
+    rows = seed.query(StudentPostVoteModel).filter_by(post_id=post_id).all()
+    return seed.get(PostModel, post_id).vote_count, \
+        {row.student_id: row.vote_value for row in rows}
+
+
+def test_new_vote_counts_once(seed):
+    result = run(vote(apply_post_vote, 1, 2, 1))
+    assert (result.student_id, result.post_id, result.vote_value) == (2, 1, 1)
+    assert post_state(seed) == (1, {2: 1})
+
+
+def test_changed_vote_moves_the_count_by_the_difference(seed):
+    run(votes(apply_post_vote, 1, (1, 1), (2, 1), (2, -1)))
+    assert post_state(seed) == (0, {1: 1, 2: -1})
+
+
+def test_retracted_vote_keeps_a_zero_row(seed):
+    run(votes(apply_post_vote, 1, (2, -1), (2, 0)))
+    assert post_state(seed) == (0, {2: 0})
+
+
+def test_repeated_vote_is_not_counted_twice(seed):
+    run(votes(apply_post_vote, 1, (2, 1), (2, 1), (2, 1)))
+    assert post_state(seed) == (1, {2: 1})
+
+
+def test_comment_votes_count_the_same_way(seed):
+    run(votes(apply_comment_vote, 1, (1, 1), (1, -1), (2, -1)))
+    seed.expire_all()
+    assert seed.get(CommentModel, 1).vote_count == -2
+    assert seed.query(StudentCommentVoteModel).count() == 2
+
+
+def test_vote_on_a_missing_target_is_none(seed):
+    assert run(vote(apply_post_vote, 99, 2, 1)) is None
+    assert run(vote(apply_comment_vote, 99, 2, 1)) is None
+    assert seed.query(StudentPostVoteModel).count() == 0
+
+
+def test_concurrent_votes_leave_one_row_per_student(seed):
+    values = [1, -1, 0, 1, -1, 1, 1, 0, -1, 1]
+
+    async def race():
+        await asyncio.gather(*(vote(apply_post_vote, 1, student_id, value)
+                               for value in values for student_id in (1, 2)))
+    run(race())
+
+    count, rows = post_state(seed)
+    assert seed.query(StudentPostVoteModel).count() == 2
+    assert count == sum(rows.values())
+
+
+def test_duplicate_vote_rows_are_rejected(seed):
+    seed.add(StudentPostVoteModel(student_id=2, post_id=1, vote_value=1))
+    seed.commit()
+    seed.add(StudentPostVoteModel(student_id=2, post_id=1, vote_value=-1))
+    with pytest.raises(IntegrityError):
+        seed.commit()
+
+
+@pytest.fixture
+def buffered(monkeypatch):
+    """Votes go through a running vote buffer, which is never flushed."""
+    buffer = VoteBuffer(AsyncSessionLocal, 60, 1000)
+    monkeypatch.setattr(buffer, "_task", object())
+    monkeypatch.setattr("campus.voting.vote_buffer", buffer)
+    return buffer
+
+
+def test_buffered_votes_hand_the_delta_to_the_buffer(seed, buffered):
+    run(votes(apply_post_vote, 1, (1, 1), (2, 1), (2, -1), (2, -1), (1, 0)))
+    assert buffered._pending[PostModel] == {1: -1}
+    # the count itself waits for the flush
+    assert post_state(seed) == (0, {1: 0, 2: -1})
+
+
+def test_concurrent_buffered_votes_add_up(seed, buffered):
+    seed.add_all([StudentModel(name=name, email=f"{name.lower()}@example.com", password="x")
+                  for name in ("Carol", "Dave", "Erin", "Frank")])
+    seed.commit()
+
+    async def race():
+        # every student double-clicks, with a change of mind
+        await asyncio.gather(*(vote(apply_post_vote, 1, student_id, value)
+                               for student_id in range(1, 7) for value in (1, -1)))
+    run(race())
+
+    _, rows = post_state(seed)
+    assert len(rows) == 6
+    assert buffered._pending[PostModel][1] == sum(rows.values())